@@ -1,45 +1,182 @@
 # classes/analysis.py
 import numpy as np
+from core.statistics import (RunningStats, QuantileSketch, TimeWeightedStat,
+                             confidence_interval, mser_truncation)
+
+# Các phân vị được báo cáo cho wait time và system time
+PERCENTILES = (50, 90, 99)
+
+
+def precision_metric_names(stations):
+    """Các metric dùng được cho dừng tuần tự (TARGET_PRECISION, --precision)."""
+    return ['system_time'] + [f'wait_time.{station}' for station in stations]
+
+
+def validate_precision_targets(targets, stations):
+    """
+    Kiểm tra TARGET_PRECISION: tên metric hợp lệ và độ chính xác > 0.
+
+    Raises:
+        ValueError: Kèm danh sách metric hợp lệ
+    """
+    valid = precision_metric_names(stations)
+    unknown = [metric for metric in targets if metric not in valid]
+    if unknown:
+        raise ValueError(f"Metric độ chính xác không hợp lệ: {', '.join(unknown)}. "
+                         f"Chọn một trong: {', '.join(valid)}")
+    for metric, target in targets.items():
+        if not target > 0:
+            raise ValueError(f"Độ chính xác tương đối của {metric} phải > 0 (nhận {target})")
+
+
+# Các trường số liệu thô được chuyển sang batch khi đóng một cửa sổ thời gian
+BATCH_FIELDS = (
+    'total_arrivals', 'total_exits', 'total_balked', 'total_reneged',
+    'wait_times', 'system_times', 'wait_stats', 'wait_sketches',
+    'system_time_stats', 'system_time_sketch',
+    'blocking_events', 'reneging_events', 'total_attempts_per_station',
+)
+
+# Các thống kê theo thời gian được chụp lại cuối mỗi batch (để cắt warm-up)
+LEVEL_FIELDS = ('queue_length_stats', 'in_system_stats', 'busy_server_stats')
 
 class Analysis:
     """
-    Tách biệt logic thu thập và xử lý số liệu ra khỏi mô phỏng. 
+    Tách biệt logic thu thập và xử lý số liệu ra khỏi mô phỏng.
+
+    Hai chế độ thu thập:
+    - streaming=False (mặc định): Lưu toàn bộ mẫu thô (list), phân vị chính xác
+    - streaming=True: Chỉ lưu bộ tích lũy Welford + sketch phân vị cho mỗi quầy,
+      bộ nhớ O(số quầy) thay vì O(số khách). Gộp được giữa các replications.
+
+    Khi bật batch (enable_batches), số liệu được chia theo cửa sổ thời gian
+    độ rộng W: mỗi cửa sổ là một Analysis con. Cuối mô phỏng, MSER trên chuỗi
+    trung bình batch của system time chọn điểm cắt warm-up, các batch trước
+    điểm cắt bị bỏ.
     """
-    def __init__(self):
+    def __init__(self, streaming=False):
+        self.streaming = streaming
+
         # --- Bộ đếm (Counters) ---
         self.total_arrivals = 0      # [cite: 163]
         self.total_exits = 0         # [cite: 164]
-        
+
         # Khách bỏ đi vì không gian K đầy (Balking) [cite: 166, 222]
-        self.total_balked = 0        
-        
-        # Khách bỏ đi vì chờ quá lâu (Reneging) 
-        self.total_reneged = 0       
-        
-        # --- Dữ liệu thô (Raw Data) ---
+        self.total_balked = 0
+
+        # Khách bỏ đi vì chờ quá lâu (Reneging)
+        self.total_reneged = 0
+
+        # --- Dữ liệu thô (Raw Data) - chỉ dùng khi streaming=False ---
         # {'Meat': [t1, t2], 'Seafood': [t3, ...]}
         self.wait_times = {}         # [cite: 167]
         self.system_times = []       # List thời gian khách ở trong hệ thống [cite: 168]
-        
+
+        # --- Bộ tích lũy dạng dòng - chỉ dùng khi streaming=True ---
+        # {'Meat': RunningStats, ...} và {'Meat': QuantileSketch, ...}
+        self.wait_stats = {}
+        self.wait_sketches = {}
+        self.system_time_stats = RunningStats()
+        self.system_time_sketch = QuantileSketch()
+
         # {'Meat': 5, 'Seafood': 2} (số lần bị chặn)
         self.blocking_events = {}    # [cite: 169]
         self.reneging_events = {}
-        
+
+        # --- Thống kê theo thời gian (do queue model của quầy cập nhật) ---
+        # {'Meat': TimeWeightedStat}: số khách đang chờ server, số khách tại quầy
+        # (đang chờ + đang được phục vụ) và số server bận - như nhau ở mọi kỷ luật
+        self.queue_length_stats = {}
+        self.in_system_stats = {}
+        self.busy_server_stats = {}
+        self.servers_per_station = {}   # {'Meat': c}
+
         # --- Thống kê đã tính (Calculated Statistics) ---
         self.avg_wait_time_per_station = {}
         self.avg_system_time = 0.0
+        self.p95_wait_time = 0.0     # Phân vị 95% thời gian chờ (gộp mọi quầy)
+        # {'Meat': {50: .., 90: .., 99: ..}} và {50: .., 90: .., 99: ..}
+        self.wait_percentiles_per_station = {}
+        self.system_time_percentiles = {}
         self.blocking_probability_per_station = {}
         self.reneging_probability_per_station = {}
         self.total_attempts_per_station = {} # Cần để tính xác suất
+        self.mean_in_system_per_station = {}    # L: Số khách trung bình tại quầy
+        self.mean_queue_length_per_station = {} # Lq: Số khách trung bình đang chờ
+        self.utilization_per_station = {}       # Mức sử dụng server (0..1)
+        self.in_system_histogram_per_station = {}  # {'Meat': {n: tỷ lệ thời gian}}
+
+        # --- Batch theo thời gian và warm-up ---
+        self.batch_width = None         # Độ rộng cửa sổ (phút), None = không chia batch
+        self.detect_warmup = False      # True → cắt warm-up bằng MSER khi tính thống kê
+        self.batches = []               # List Analysis con, mỗi cái là 1 cửa sổ thời gian
+        self.batch_end_times = []       # Thời điểm kết thúc của từng batch
+        self._level_checkpoints = []    # Ảnh chụp TimeWeightedStat cuối mỗi batch
+        self.batch_means = {}           # {'system_time': [..], 'wait_time.Meat': [..]}
+        self.warmup_time = 0.0          # Điểm cắt warm-up (thống kê chỉ tính từ đây)
+        self.warmup_batches = 0         # Số batch đã bỏ
+        self.warmup_discarded = 0       # Số khách (mẫu system time) trong các batch đã bỏ
+        self.warmup_fraction = 0.0      # Tỷ lệ thời gian mô phỏng đã bỏ
+
+        # --- Dừng tuần tự (sequential stopping) ---
+        self.simulated_time = 0.0       # Thời gian mô phỏng thực tế đã chạy
+        self.precision = {}             # {metric: {'mean', 'half_width', 'relative', 'target'}}
+        self.converged = None           # None = không chạy chế độ dừng tuần tự
 
     def add_station(self, station_name):
         """Đăng ký station để theo dõi số liệu."""
         if station_name not in self.wait_times:
             self.wait_times[station_name] = []
+            self.wait_stats[station_name] = RunningStats()
+            self.wait_sketches[station_name] = QuantileSketch()
             self.blocking_events[station_name] = 0
             self.total_attempts_per_station[station_name] = 0
             self.reneging_events[station_name] = 0
 
+    def add_level_trackers(self, station_name, queue_length, in_system, busy_servers,
+                           num_servers):
+        """
+        Đăng ký các TimeWeightedStat của quầy: queue_length (số khách đang chờ
+        server), in_system (số khách tại quầy) và busy_servers (số server bận).
+        Chúng được cập nhật trực tiếp bởi queue model mỗi khi mức thay đổi.
+        """
+        self.queue_length_stats[station_name] = queue_length
+        self.in_system_stats[station_name] = in_system
+        self.busy_server_stats[station_name] = busy_servers
+        self.servers_per_station[station_name] = num_servers
+
+    def enable_batches(self, width, detect_warmup=True):
+        """
+        Bật chế độ chia số liệu theo cửa sổ thời gian độ rộng width (phút).
+        BuffetSystem gọi close_batch() ở cuối mỗi cửa sổ.
+        """
+        self.batch_width = width
+        self.detect_warmup = detect_warmup
+
+    def close_batch(self, now):
+        """
+        Đóng cửa sổ hiện tại tại thời điểm now: chuyển số liệu thô sang một
+        Analysis con (đổi tham chiếu, O(số quầy)) rồi bắt đầu cửa sổ mới rỗng.
+        Các TimeWeightedStat được chốt tới now và chụp lại (area, time_in_state)
+        để sau này trừ ra phần trước điểm cắt.
+        """
+        fresh = Analysis(streaming=self.streaming)
+        for station in self.wait_times:
+            fresh.add_station(station)
+        batch = Analysis(streaming=self.streaming)
+        for field in BATCH_FIELDS:
+            setattr(batch, field, getattr(self, field))
+            setattr(self, field, getattr(fresh, field))
+        self.batches.append(batch)
+        self.batch_end_times.append(now)
+
+        checkpoint = {}
+        for field in LEVEL_FIELDS:
+            for station, stat in getattr(self, field).items():
+                stat.close(now)
+                checkpoint[field, station] = (stat.area, dict(stat.time_in_state))
+        self._level_checkpoints.append(checkpoint)
+
     def record_arrival(self):
         """[cite: 171]"""
         self.total_arrivals += 1
@@ -47,7 +184,11 @@ class Analysis:
     def record_exit(self, system_time):
         """[cite: 172]"""
         self.total_exits += 1
-        self.system_times.append(system_time)
+        if self.streaming:
+            self.system_time_stats.add(system_time)
+            self.system_time_sketch.add(system_time)
+        else:
+            self.system_times.append(system_time)
 
     def record_attempt(self, station_name):
         """Ghi nhận khi khách *cố gắng* vào một quầy."""
@@ -55,7 +196,11 @@ class Analysis:
 
     def record_wait_time(self, station_name, wait):
         """[cite: 173]"""
-        self.wait_times[station_name].append(wait)
+        if self.streaming:
+            self.wait_stats[station_name].add(wait)
+            self.wait_sketches[station_name].add(wait)
+        else:
+            self.wait_times[station_name].append(wait)
 
     def record_blocking_event(self, station_name):
         """Ghi nhận khi khách bị chặn (Balking)[cite: 174, 222]."""
@@ -76,21 +221,210 @@ class Analysis:
         self.reneging_events[station_name] += 1
         self.total_reneged += 1
 
+    def wait_record_count(self, station_name):
+        """Số mẫu wait time đã ghi nhận tại một quầy (cả hai chế độ)."""
+        if self.streaming:
+            stats = self.wait_stats.get(station_name)
+            return stats.count if stats else 0
+        return len(self.wait_times.get(station_name, []))
+
+    def merge(self, other):
+        """
+        Gộp số liệu của một Analysis khác (ví dụ từ replication khác) vào đây.
+        Hai Analysis phải cùng chế độ streaming.
+        """
+        if other.streaming != self.streaming:
+            raise ValueError("Không thể gộp Analysis khác chế độ streaming")
+
+        self.total_arrivals += other.total_arrivals
+        self.total_exits += other.total_exits
+        self.total_balked += other.total_balked
+        self.total_reneged += other.total_reneged
+
+        for station in other.wait_times:
+            self.add_station(station)
+            self.wait_times[station].extend(other.wait_times[station])
+            self.wait_stats[station].merge(other.wait_stats[station])
+            self.wait_sketches[station].merge(other.wait_sketches[station])
+        self.system_times.extend(other.system_times)
+        self.system_time_stats.merge(other.system_time_stats)
+        self.system_time_sketch.merge(other.system_time_sketch)
+
+        for station in other.in_system_stats:
+            if station not in self.in_system_stats:
+                self.add_level_trackers(station, TimeWeightedStat(), TimeWeightedStat(),
+                                        TimeWeightedStat(), other.servers_per_station[station])
+            self.queue_length_stats[station].merge(other.queue_length_stats[station])
+            self.in_system_stats[station].merge(other.in_system_stats[station])
+            self.busy_server_stats[station].merge(other.busy_server_stats[station])
+
+        for target, source in ((self.blocking_events, other.blocking_events),
+                               (self.reneging_events, other.reneging_events),
+                               (self.total_attempts_per_station,
+                                other.total_attempts_per_station)):
+            for station, count in source.items():
+                target[station] = target.get(station, 0) + count
+        return self
+
+    def _batch_stat(self, batch, station=None):
+        """
+        (trung bình, số mẫu) của system time (station=None) hoặc wait time tại
+        quầy trong 1 batch. Batch rỗng → (None, 0).
+        """
+        if self.streaming:
+            stats = batch.system_time_stats if station is None else batch.wait_stats[station]
+            return (stats.mean if stats.count else None), stats.count
+        values = batch.system_times if station is None else batch.wait_times[station]
+        return (float(np.mean(values)) if values else None), len(values)
+
+    def _batch_series(self):
+        """Chuỗi (trung bình, số mẫu) theo batch của system time và wait time từng quầy."""
+        series = {'system_time': [self._batch_stat(b) for b in self.batches]}
+        for station in self.wait_times:
+            series[f'wait_time.{station}'] = [self._batch_stat(b, station) for b in self.batches]
+        return series
+
+    def _warmup_cut(self, series):
+        """
+        Số batch cần bỏ: MSER trên chuỗi chính system time (bỏ qua batch rỗng).
+        Không lấy điểm cắt lớn nhất của mọi chuỗi: chỉ một quầy dao động mạnh
+        (ví dụ wait time quầy gần bão hòa) cũng đủ đẩy điểm cắt đi rất xa và
+        bỏ oan phần lớn số liệu. Chuỗi system time rỗng (chưa khách nào ra về)
+        → dùng chuỗi wait time gộp mọi quầy. Trả về 0 nếu không bật detect_warmup.
+        """
+        if not self.detect_warmup:
+            return 0
+        values = series['system_time']
+        if all(mean is None for mean, _ in values):
+            values = self._pooled_wait_series(series)
+        index = [i for i, (mean, _) in enumerate(values) if mean is not None]
+        if not index:
+            return 0
+        return index[mser_truncation([values[i][0] for i in index])]
+
+    @staticmethod
+    def _pooled_wait_series(series):
+        """Chuỗi (trung bình, số mẫu) theo batch của wait time gộp mọi quầy."""
+        waits = [values for name, values in series.items() if name != 'system_time']
+        pooled = []
+        for batch in zip(*waits):
+            count = sum(c for _, c in batch)
+            pooled.append((sum(m * c for m, c in batch if c) / count if count else None, count))
+        return pooled
+
+    def batch_means_interval(self, metric, confidence=0.95, num_batches=20):
+        """
+        Khoảng tin cậy theo phương pháp batch means cho metric
+        ('system_time' hoặc 'wait_time.<quầy>') từ các batch đã đóng.
+
+        Các cửa sổ sau điểm cắt warm-up được gom thành num_batches nhóm liên
+        tiếp bằng nhau (phần dư bỏ ở đầu); trung bình mỗi nhóm có trọng số
+        theo số mẫu. Nhóm lớn → trung bình nhóm gần độc lập → CI theo t hợp lệ.
+        Chưa đủ cửa sổ → half_width = nan.
+        """
+        series = self._batch_series()
+        windows = series[metric][self._warmup_cut(series):]
+        size = len(windows) // num_batches
+        if size == 0:
+            return confidence_interval([], confidence)
+
+        windows = windows[len(windows) - size * num_batches:]
+        group_means = []
+        for g in range(num_batches):
+            group = windows[g * size:(g + 1) * size]
+            count = sum(c for _, c in group)
+            if count == 0:
+                continue
+            group_means.append(sum(m * c for m, c in group if c) / count)
+        return confidence_interval(group_means, confidence)
+
+    def check_precision(self, targets, confidence=0.95):
+        """
+        Kiểm tra độ chính xác tương đối (half_width / |mean|) của từng metric.
+
+        Args:
+            targets: {metric: độ chính xác tương đối yêu cầu}, ví dụ {'system_time': 0.02}
+
+        Returns:
+            True nếu mọi metric đã đạt; kết quả chi tiết lưu ở self.precision
+        """
+        self.precision = {}
+        converged = True
+        for metric, target in targets.items():
+            interval = self.batch_means_interval(metric, confidence)
+            mean = interval['mean']
+            relative = (interval['half_width'] / abs(mean)
+                        if interval['n'] > 1 and mean else float('inf'))
+            self.precision[metric] = {
+                'mean': mean,
+                'half_width': interval['half_width'],
+                'relative': relative,
+                'target': target,
+            }
+            if not relative <= target:
+                converged = False
+        return converged
+
+    def apply_batches(self):
+        """
+        Gộp các batch đã đóng thành số liệu cuối cùng, bỏ warm-up nếu bật.
+        Batch cuối cùng phải được đóng (close_batch) khi kết thúc mô phỏng.
+
+        LUỒNG:
+        1. Tính chuỗi trung bình batch (system time + wait time mỗi quầy)
+        2. MSER trên chuỗi system time (bỏ batch rỗng) → điểm cắt
+        3. Gộp các batch sau điểm cắt vào số liệu chính
+        4. Trừ ảnh chụp tích phân tại điểm cắt khỏi TimeWeightedStat
+        """
+        if not self.batches:
+            return
+
+        # ========== BƯỚC 1-2: Chọn điểm cắt ==========
+        series = self._batch_series()
+        cut = self._warmup_cut(series)
+
+        # ========== BƯỚC 3: Gộp batch còn lại ==========
+        kept = self.batches[cut:]
+        for batch in kept:
+            self.merge(batch)
+
+        # ========== BƯỚC 4: Cắt thống kê theo thời gian ==========
+        if cut > 0:
+            start = self.batch_end_times[cut - 1]
+            checkpoint = self._level_checkpoints[cut - 1]
+            for (field, station), (area, time_in_state) in checkpoint.items():
+                stats = getattr(self, field)
+                full = stats[station]
+                truncated = TimeWeightedStat(level=full.level, start_time=start)
+                truncated.last_time = full.last_time
+                truncated.area = full.area - area
+                truncated.time_in_state = {
+                    level: t - time_in_state.get(level, 0.0)
+                    for level, t in full.time_in_state.items()
+                }
+                stats[station] = truncated
+
+        self.warmup_batches = cut
+        self.warmup_time = self.batch_end_times[cut - 1] if cut > 0 else 0.0
+        self.warmup_discarded = sum(count for _, count in series['system_time'][:cut])
+        end = self.batch_end_times[-1]
+        self.warmup_fraction = self.warmup_time / end if end else 0.0
+        self.batch_means = {name: [mean for mean, _ in values[cut:]]
+                            for name, values in series.items()}
+        # Batch đã gộp xong, giải phóng bộ nhớ (chỉ giữ chuỗi trung bình)
+        self.batches = []
+        self._level_checkpoints = []
+
     def calculate_statistics(self):
         """
         Tính toán các chỉ số có ý nghĩa từ dữ liệu thô. [cite: 248, 249]
         """
-        if self.system_times:
-            self.avg_system_time = np.mean(self.system_times)
+        self.apply_batches()
+        if self.streaming:
+            self._calculate_streaming_statistics()
         else:
-            self.avg_system_time = 0.0
+            self._calculate_sample_statistics()
 
-        for station, times in self.wait_times.items():
-            if times:
-                self.avg_wait_time_per_station[station] = np.mean(times)
-            else:
-                self.avg_wait_time_per_station[station] = 0.0
-        
         for station, blocked_count in self.blocking_events.items():
             attempts = self.total_attempts_per_station.get(station, 0)
             if attempts > 0:
@@ -105,6 +439,95 @@ class Analysis:
             else:
                 self.reneging_probability_per_station[station] = 0.0
 
+        for station, in_system in self.in_system_stats.items():
+            busy = self.busy_server_stats[station].mean
+            self.mean_in_system_per_station[station] = in_system.mean
+            self.mean_queue_length_per_station[station] = self.queue_length_stats[station].mean
+            servers = self.servers_per_station[station]
+            self.utilization_per_station[station] = busy / servers if servers else 0.0
+            self.in_system_histogram_per_station[station] = in_system.histogram()
+
+    def _calculate_sample_statistics(self):
+        """Trung bình và phân vị chính xác từ mẫu thô."""
+        if self.system_times:
+            self.avg_system_time = np.mean(self.system_times)
+            self.system_time_percentiles = dict(zip(
+                PERCENTILES, np.percentile(self.system_times, PERCENTILES).tolist()
+            ))
+        else:
+            self.avg_system_time = 0.0
+            self.system_time_percentiles = {p: 0.0 for p in PERCENTILES}
+
+        for station, times in self.wait_times.items():
+            if times:
+                self.avg_wait_time_per_station[station] = np.mean(times)
+                self.wait_percentiles_per_station[station] = dict(zip(
+                    PERCENTILES, np.percentile(times, PERCENTILES).tolist()
+                ))
+            else:
+                self.avg_wait_time_per_station[station] = 0.0
+                self.wait_percentiles_per_station[station] = {p: 0.0 for p in PERCENTILES}
+
+        all_waits = [w for times in self.wait_times.values() for w in times]
+        self.p95_wait_time = float(np.percentile(all_waits, 95)) if all_waits else 0.0
+
+    def _calculate_streaming_statistics(self):
+        """Trung bình (Welford) và phân vị (sketch) từ bộ tích lũy dạng dòng."""
+        self.avg_system_time = self.system_time_stats.mean
+        self.system_time_percentiles = {
+            p: self.system_time_sketch.quantile(p / 100) for p in PERCENTILES
+        }
+
+        all_waits = QuantileSketch()
+        for station, stats in self.wait_stats.items():
+            sketch = self.wait_sketches[station]
+            self.avg_wait_time_per_station[station] = stats.mean
+            self.wait_percentiles_per_station[station] = {
+                p: sketch.quantile(p / 100) for p in PERCENTILES
+            }
+            all_waits.merge(sketch)
+        self.p95_wait_time = all_waits.quantile(0.95)
+
+    def summary(self):
+        """
+        Trả về các chỉ số đã tính dưới dạng dict phẳng {tên_chỉ_số: giá_trị}.
+        Dùng để gộp kết quả nhiều lần chạy (replications) hoặc ghi ra bảng.
+        Cần gọi calculate_statistics() trước.
+        """
+        result = {
+            'total_arrivals': self.total_arrivals,
+            'total_exits': self.total_exits,
+            'total_balked': self.total_balked,
+            'total_reneged': self.total_reneged,
+            'balking_rate': (self.total_balked / self.total_arrivals
+                             if self.total_arrivals else 0.0),
+            'avg_system_time': float(self.avg_system_time),
+            'p95_wait_time': self.p95_wait_time,
+            'warmup_time': self.warmup_time,
+            'warmup_fraction': self.warmup_fraction,
+            'simulated_time': self.simulated_time,
+        }
+        for metric, values in self.precision.items():
+            result[f'relative_precision.{metric}'] = values['relative']
+        for p, value in self.system_time_percentiles.items():
+            result[f'p{p}_system_time'] = value
+        for station, value in self.avg_wait_time_per_station.items():
+            result[f'avg_wait_time.{station}'] = float(value)
+        for station, percentiles in self.wait_percentiles_per_station.items():
+            for p, value in percentiles.items():
+                result[f'p{p}_wait_time.{station}'] = value
+        for station, value in self.blocking_probability_per_station.items():
+            result[f'blocking_probability.{station}'] = value
+        for station, value in self.reneging_probability_per_station.items():
+            result[f'reneging_probability.{station}'] = value
+        for station, value in self.mean_in_system_per_station.items():
+            result[f'mean_in_system.{station}'] = value
+        for station, value in self.mean_queue_length_per_station.items():
+            result[f'mean_queue_length.{station}'] = value
+        for station, value in self.utilization_per_station.items():
+            result[f'utilization.{station}'] = value
+        return result
+
     def print_report(self):
         """Định dạng và in kết quả đã tính. """
         print("--- BAO CAO MO PHONG ---")
@@ -124,9 +547,24 @@ class Analysis:
         # print(f"Tyle khach bi chan vi day K: {overall_balking_rate:.2%}")
         # print("Tyle khach reneging khi het DEFAULT_PATIENCE_TIME: "
         #       f"{overall_reneging_rate:.2%}")
-        
+
+        if self.detect_warmup:
+            print(f"Warm-up (MSER): bo {self.warmup_batches} batch dau "
+                  f"(W={self.batch_width}), thong ke tinh tu t={self.warmup_time:.2f}")
+            print(f"  Da bo {self.warmup_fraction:.1%} thoi gian mo phong, "
+                  f"{self.warmup_discarded} khach ra ve trong giai doan warm-up")
+
+        if self.converged is not None:
+            status = "dat" if self.converged else "CHUA DAT (het thoi gian toi da)"
+            print(f"Dung tuan tu: {status} sau t={self.simulated_time:.2f} phut mo phong")
+            for metric, values in self.precision.items():
+                print(f"  - {metric:<20}: {values['mean']:.4f} +/- {values['half_width']:.4f} "
+                      f"(tuong doi {values['relative']:.2%}, yeu cau {values['target']:.2%})")
+
         print(f"\nThoi gian trung binh trong he thong: {self.avg_system_time:.2f}")
-        
+        percentiles = "  ".join(f"p{p}={v:.4f}" for p, v in self.system_time_percentiles.items())
+        print(f"  Phan vi: {percentiles}")
+
         print("\nThoi gian cho trung binh tai quay:")
         # In tất cả stations, kể cả không có wait time
         all_stations = set(self.wait_times.keys()) | set(self.total_attempts_per_station.keys())
@@ -134,13 +572,31 @@ class Analysis:
         for station in station_order:
             time = self.avg_wait_time_per_station.get(station, 0.0)
             attempts = self.total_attempts_per_station.get(station, 0)
-            wait_count = len(self.wait_times.get(station, []))
+            wait_count = self.wait_record_count(station)
             print(f"  - {station:<10}: {time:.4f} (attempts: {attempts}, wait_records: {wait_count})")
 
+        print("\nPhan vi thoi gian cho tai quay:")
+        for station in station_order:
+            values = self.wait_percentiles_per_station.get(station, {})
+            percentiles = "  ".join(f"p{p}={v:.4f}" for p, v in values.items())
+            print(f"  - {station:<10}: {percentiles}")
+
         print("\nXac suat bi chan (Balking):")
         for station, prob in self.blocking_probability_per_station.items():
             print(f"  - {station:<10}: {prob:.4%}")
 
         print("\nXac suat bi chan (Reneging - Het patience):")
         for station, prob in self.reneging_probability_per_station.items():
-            print(f"  - {station:<10}: {prob:.4%}")
\ No newline at end of file
+            print(f"  - {station:<10}: {prob:.4%}")
+
+        if self.in_system_stats:
+            print("\nSo khach theo thoi gian (L, Lq) va muc su dung server:")
+            for station in self.in_system_stats:
+                print(f"  - {station:<10}: L={self.mean_in_system_per_station[station]:.4f}  "
+                      f"Lq={self.mean_queue_length_per_station[station]:.4f}  "
+                      f"utilization={self.utilization_per_station[station]:.2%}")
+
+            print("\nTy le thoi gian theo so khach tai quay (n: %):")
+            for station, histogram in self.in_system_histogram_per_station.items():
+                states = "  ".join(f"{n}:{frac:.1%}" for n, frac in histogram.items())
+                print(f"  - {station:<10}: {states}")
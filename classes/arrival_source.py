@@ -0,0 +1,259 @@
+# classes/arrival_source.py
+"""
+NGUỒN KHÁCH ĐẾN (Arrival Sources)
+
+Mặc định BuffetSystem.generate_customers gọi random nhiều lần cho MỖI khách:
+1 expovariate, 1 random.random cho mỗi quầy trong DEFAULT_SERVICE_TIMES và
+1 random.choices, cùng một dict service times mới.
+
+BlockArrivalSource sinh trước theo KHỐI (mặc định 65536 khách/khối, mỗi cổng
+một nguồn) bằng NumPy:
+- Khoảng cách giữa hai lần đến (exponential)
+- Loại khách (searchsorted trên phân phối tích lũy)
+- Service time riêng tại mỗi quầy (uniform quanh DEFAULT_SERVICE_TIMES)
+Khối được chuyển sang list Python một lần; mỗi khách sau đó chỉ tốn một lần
+tăng chỉ số. Hết khối → sinh khối mới (lười, không sinh trước khi cần).
+
+Bật bằng ARRIVAL_MODE = 'block' trong config (mặc định 'scalar').
+
+PHÁT LẠI KHÁCH ĐẾN TỪ LOG (Replay)
+
+ARRIVAL_MODE = 'replay' (hoặc --replay PATH): thay vì Poisson theo
+ARRIVAL_RATES, khách đến đúng theo log đếm khách ở cổng (REPLAY_PATH):
+- CSV (.csv): cột time, gate; tùy chọn customer_type và service_<quầy>
+  (mỗi quầy trong DEFAULT_SERVICE_TIMES một cột)
+- NumPy (.npy, structured array, mở bằng memory map): trường time, gate;
+  tùy chọn type (chuỗi 'U' hoặc 'S', hoặc số nguyên = chỉ số trong
+  CUSTOMER_TYPE_DISTRIBUTION, âm = không có) và service (mảng con theo thứ
+  tự DEFAULT_SERVICE_TIMES, NaN = không có)
+time tính bằng phút (trừ REPLAY_TIME_OFFSET), tăng dần. Ô trống (thiếu loại
+khách / thiếu service time của một quầy) → sinh ngẫu nhiên như chế độ 'scalar'.
+File được đọc tuần tự theo chunk (REPLAY_CHUNK_SIZE dòng): bộ nhớ không phụ
+thuộc độ dài log (log nhiều ngày: dùng thêm Analysis(streaming=True)).
+"""
+import csv
+import itertools
+import math
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+
+# Số khách sinh trước trong một khối (mặc định)
+DEFAULT_BLOCK_SIZE = 65536
+
+
+class BlockArrivalSource:
+    """
+    Nguồn khách đến Poisson của một cổng, sinh theo khối NumPy.
+    """
+    def __init__(self, arrival_rate, config, rng, block_size=DEFAULT_BLOCK_SIZE,
+                 service_time_spread=0.5):
+        """
+        Args:
+            arrival_rate: Tốc độ đến của cổng (khách/phút)
+            config: Config (CUSTOMER_TYPE_DISTRIBUTION, DEFAULT_SERVICE_TIMES)
+            rng: numpy.random.Generator riêng của cổng
+            block_size: Số khách mỗi khối
+            service_time_spread: Service time ~ U(base * (1 - spread), base * (1 + spread))
+        """
+        self.arrival_rate = arrival_rate
+        self.rng = rng
+        self.block_size = block_size
+        self.service_time_spread = service_time_spread
+
+        self.customer_types = list(config.CUSTOMER_TYPE_DISTRIBUTION.keys())
+        weights = np.array(list(config.CUSTOMER_TYPE_DISTRIBUTION.values()), dtype=float)
+        self._type_cdf = np.cumsum(weights) / weights.sum()
+        self.station_names = list(config.DEFAULT_SERVICE_TIMES.keys())
+        self._base_times = np.array(list(config.DEFAULT_SERVICE_TIMES.values()), dtype=float)
+
+        self._gaps = []
+        self._types = []
+        self._service_times = []
+        self._index = 0
+
+    def _refill(self):
+        """Sinh một khối mới."""
+        n = self.block_size
+        rng = self.rng
+        spread = self.service_time_spread
+
+        self._gaps = rng.exponential(1.0 / self.arrival_rate, n).tolist()
+        type_index = np.searchsorted(self._type_cdf, rng.random(n), side='right')
+        np.minimum(type_index, len(self.customer_types) - 1, out=type_index)
+        self._types = [self.customer_types[i] for i in type_index.tolist()]
+        factors = rng.uniform(1 - spread, 1 + spread, (n, len(self._base_times)))
+        self._service_times = (factors * self._base_times).tolist()
+        self._index = 0
+
+    def next(self):
+        """
+        Khách kế tiếp của cổng.
+
+        Returns:
+            Tuple (inter_arrival_time, customer_type, service_times_row) với
+            service_times_row theo thứ tự station_names
+        """
+        i = self._index
+        if i == len(self._gaps):
+            self._refill()
+            i = 0
+        self._index = i + 1
+        return self._gaps[i], self._types[i], self._service_times[i]
+
+
+# Số dòng đọc một lần khi phát lại log (mặc định)
+DEFAULT_REPLAY_CHUNK_SIZE = 65536
+
+
+class ReplaySource(ABC):
+    """
+    Lớp cơ sở của nguồn phát lại: duyệt (time, gate_id, drawn) theo thứ tự thời gian.
+
+    drawn = (customer_type, service_times_row) như BlockArrivalSource, phần
+    nào không có trong log là None (BuffetSystem.new_customer tự sinh);
+    drawn = None nếu log không có cả hai.
+    Lớp con cung cấp _chunks(): các list dòng thô (time, gate, type, service_row).
+    """
+    def __init__(self, path, gates, customer_types, station_names,
+                 chunk_size=DEFAULT_REPLAY_CHUNK_SIZE, time_offset=0.0):
+        """
+        Args:
+            path: File log
+            gates: Các cổng hợp lệ (khóa của PROB_MATRICES['initial'])
+            customer_types: Các loại khách hợp lệ (CUSTOMER_TYPE_DISTRIBUTION)
+            station_names: Các quầy theo thứ tự service time (DEFAULT_SERVICE_TIMES)
+            chunk_size: Số dòng đọc mỗi lần
+            time_offset: Thời điểm trong log ứng với phút 0 của mô phỏng
+        """
+        self.path = Path(path)
+        self.customer_types = list(customer_types)
+        self.station_names = list(station_names)
+        self.chunk_size = chunk_size
+        self.time_offset = time_offset
+        # Cổng trong log có thể là số hoặc chuỗi ('0') → id cổng trong config
+        self._gate_ids = {}
+        for gate_id in gates:
+            self._gate_ids[gate_id] = gate_id
+            self._gate_ids[str(gate_id)] = gate_id
+        self._valid_types = set(self.customer_types)
+        self.rows_read = 0
+
+    @abstractmethod
+    def _chunks(self):
+        """Các list dòng thô (time, gate, customer_type, service_row), chunk_size dòng mỗi list."""
+        pass
+
+    def __iter__(self):
+        last_time = 0.0
+        for chunk in self._chunks():
+            for time, gate, customer_type, service_row in chunk:
+                self.rows_read += 1
+                time -= self.time_offset
+                if time < last_time:
+                    raise ValueError(
+                        f"{self.path}: dòng {self.rows_read} có time {time + self.time_offset} "
+                        "nhỏ hơn dòng trước (log phải sắp theo thời gian tăng dần, "
+                        "không trước REPLAY_TIME_OFFSET)"
+                    )
+                last_time = time
+                gate_id = self._gate_ids.get(gate)
+                if gate_id is None:
+                    raise ValueError(f"{self.path}: dòng {self.rows_read} có cổng không "
+                                     f"có trong PROB_MATRICES['initial']: {gate!r}")
+                if customer_type is not None and customer_type not in self._valid_types:
+                    raise ValueError(f"{self.path}: dòng {self.rows_read} có loại khách "
+                                     f"không xác định: {customer_type!r}")
+                if customer_type is None and service_row is None:
+                    yield time, gate_id, None
+                else:
+                    yield time, gate_id, (customer_type, service_row)
+
+
+class CsvReplaySource(ReplaySource):
+    """Phát lại log CSV (đọc tuần tự bằng csv.reader, chunk_size dòng mỗi lần)."""
+    def _chunks(self):
+        with open(self.path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = [name.strip() for name in next(reader, [])]
+            missing = [name for name in ('time', 'gate') if name not in header]
+            if missing:
+                raise ValueError(f"{self.path}: thiếu cột {missing}")
+            time_col = header.index('time')
+            gate_col = header.index('gate')
+            type_col = header.index('customer_type') if 'customer_type' in header else None
+            service_cols = [
+                header.index(f'service_{name}') if f'service_{name}' in header else None
+                for name in self.station_names
+            ]
+            has_service = any(col is not None for col in service_cols)
+
+            while True:
+                rows = list(itertools.islice(reader, self.chunk_size))
+                if not rows:
+                    return
+                chunk = []
+                for row in rows:
+                    if not row:
+                        continue
+                    customer_type = (row[type_col].strip() or None) if type_col is not None else None
+                    service_row = None
+                    if has_service:
+                        service_row = [
+                            float(row[col]) if col is not None and row[col].strip() else None
+                            for col in service_cols
+                        ]
+                    chunk.append((float(row[time_col]), row[gate_col].strip(),
+                                  customer_type, service_row))
+                yield chunk
+
+
+class NpyReplaySource(ReplaySource):
+    """Phát lại log .npy (np.load mmap_mode='r': chỉ chunk đang đọc nằm trong bộ nhớ)."""
+    def _chunks(self):
+        data = np.load(self.path, mmap_mode='r')
+        names = data.dtype.names or ()
+        missing = [name for name in ('time', 'gate') if name not in names]
+        if missing:
+            raise ValueError(f"{self.path}: thiếu trường {missing}")
+        if 'service' in names and data.dtype['service'].shape != (len(self.station_names),):
+            raise ValueError(f"{self.path}: trường service phải có {len(self.station_names)} "
+                             "cột (thứ tự DEFAULT_SERVICE_TIMES)")
+        type_codes = 'type' in names and data.dtype['type'].kind in 'iu'
+
+        for start in range(0, len(data), self.chunk_size):
+            block = data[start:start + self.chunk_size]
+            times = block['time'].tolist()
+            gates = block['gate'].tolist()
+            if 'type' not in names:
+                types = [None] * len(block)
+            elif type_codes:
+                types = [self.customer_types[code] if 0 <= code < len(self.customer_types) else None
+                         for code in block['type'].tolist()]
+            elif block['type'].dtype.kind == 'S':
+                # Chuỗi byte độ rộng cố định ('S'): .tolist() cho bytes
+                types = [name.decode().strip() or None for name in block['type'].tolist()]
+            else:
+                types = [name.strip() or None for name in block['type'].tolist()]
+            if 'service' in names:
+                services = [
+                    [None if math.isnan(t) else t for t in row]
+                    for row in block['service'].tolist()
+                ]
+            else:
+                services = [None] * len(block)
+            yield list(zip(times, gates, types, services))
+
+
+def open_replay_source(path, gates, customer_types, station_names,
+                       chunk_size=DEFAULT_REPLAY_CHUNK_SIZE, time_offset=0.0):
+    """Nguồn phát lại theo đuôi file: .csv hoặc .npy."""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        source_class = CsvReplaySource
+    elif suffix == '.npy':
+        source_class = NpyReplaySource
+    else:
+        raise ValueError(f"REPLAY_PATH phải là file .csv hoặc .npy: {path}")
+    return source_class(path, gates, customer_types, station_names, chunk_size, time_offset)
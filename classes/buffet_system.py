@@ -1,28 +1,125 @@
 # classes/buffet_system.py
 import simpy
-import random
+import itertools
 from .customer import Customer
+from .arrival_source import (BlockArrivalSource, DEFAULT_BLOCK_SIZE,
+                             open_replay_source, DEFAULT_REPLAY_CHUNK_SIZE)
 from .food_station import FoodStation
-from .analysis import Analysis
+from .routing import Router
+from .analysis import Analysis, validate_precision_targets
 from core.queue_system_factory import QueueSystemFactory
+from core.random_streams import RandomStreams
+from core.trace_recorder import TraceRecorder, TRACE_BALK, TRACE_EXIT
+
+# Độ rộng batch mặc định (phút) khi chạy dừng tuần tự mà config không đặt WARMUP_BATCH_WIDTH
+DEFAULT_BATCH_WIDTH = 5.0
+# Khoảng thời gian mô phỏng giữa hai lần kiểm tra độ chính xác (phút)
+DEFAULT_CHUNK_TIME = 100.0
 
 class BuffetSystem:
     """
     Đây là bộ não của toàn bộ mô phỏng. 
     Chứa logic chính, điều khiển luồng thời gian và quản lý các thành phần. [cite: 198]
     """
-    def __init__(self, env: simpy.Environment, analyzer: Analysis, config):
+    def __init__(self, env: simpy.Environment, analyzer: Analysis, config, streams=None):
         self.env = env                 # [cite: 200]
         self.analyzer = analyzer       # [cite: 204]
         self.config = config           # File config (sẽ tạo sau)
         
-        # Khởi tạo seed cho random để đảm bảo kết quả tái lập được
-        seed = getattr(config, 'RANDOM_SEED', 42)
-        random.seed(seed)
+        # Mỗi mục đích một luồng ngẫu nhiên riêng, tất định theo seed
+        # (đổi kỷ luật một quầy không làm lệch số ngẫu nhiên của phần còn lại)
+        if streams is None:
+            streams = RandomStreams(getattr(config, 'RANDOM_SEED', 42))
+        self.streams = streams
+        self.attribute_rng = streams.attributes()
+        self.routing_rng = streams.routing()
         
         self.stations = {}             # Dict chứa các đối tượng FoodStation 
         self.arrival_rates = config.ARRIVAL_RATES # 
         self.prob_matrices = config.PROB_MATRICES # 
+        self._customer_ids = itertools.count()  # Id khách (không phụ thuộc bộ đếm của analyzer)
+        # Độ dao động của service time trung bình theo khách (xem new_customer)
+        self.service_time_spread = getattr(config, 'SERVICE_TIME_SPREAD', 0.5)
+        # Độ trễ mỗi khách 'erratic' gây ra cho các khách đang chờ ở quầy
+        self.erratic_delay = getattr(config, 'ERRATIC_DELAY_AMOUNT', 0.2)
+        # Dựng sẵn một lần cho new_customer (cùng số ngẫu nhiên như gọi
+        # uniform(base*(1-spread), base*(1+spread)) và choices(weights=...) mỗi khách):
+        # (cận dưới, độ rộng) service time theo thứ tự DEFAULT_SERVICE_TIMES,
+        # trọng số tích lũy loại khách
+        spread = self.service_time_spread
+        self._service_time_bounds = [
+            (base_time * (1 - spread),
+             base_time * (1 + spread) - base_time * (1 - spread))
+            for base_time in config.DEFAULT_SERVICE_TIMES.values()
+        ]
+        self._customer_types = list(config.CUSTOMER_TYPE_DISTRIBUTION.keys())
+        self._customer_type_cum_weights = list(
+            itertools.accumulate(config.CUSTOMER_TYPE_DISTRIBUTION.values()))
+
+        # customer.service_times là list theo thứ tự quầy trong STATIONS
+        # (station_index[tên quầy] = chỉ số), thay cho dict theo tên quầy.
+        # Service time được sinh theo thứ tự DEFAULT_SERVICE_TIMES; nếu khác
+        # STATIONS thì sắp lại theo _service_layout (quầy thiếu → avg_service_time)
+        self.station_index = {name: i for i, name in enumerate(config.STATIONS)}
+        default_names = list(config.DEFAULT_SERVICE_TIMES)
+        if default_names == list(config.STATIONS):
+            self._service_layout = None
+        else:
+            self._service_layout = [
+                (default_names.index(name) if name in config.DEFAULT_SERVICE_TIMES else None,
+                 cfg['avg_service_time'])
+                for name, cfg in config.STATIONS.items()
+            ]
+
+        # Định tuyến biên dịch sẵn + bitmask quầy đầy (FoodStation cập nhật)
+        self.router = Router(self.prob_matrices, self.station_index, self.routing_rng)
+
+        # Ghi vết sự kiện nhị phân (None = tắt): mỗi điểm ghi vết chỉ kiểm tra
+        # `if self.trace is not None` (xem core/trace_recorder.py)
+        trace_path = getattr(config, 'TRACE_PATH', None)
+        self.trace = TraceRecorder(
+            trace_path, config.CUSTOMER_TYPE_DISTRIBUTION, config.STATIONS
+        ) if trace_path else None
+
+        # Cách sinh khách đến: 'scalar' (random từng khách), 'block'
+        # (sinh trước theo khối NumPy, mỗi cổng một luồng riêng) hoặc 'replay'
+        # (phát lại log REPLAY_PATH, không dùng ARRIVAL_RATES)
+        self.arrival_mode = getattr(config, 'ARRIVAL_MODE', 'scalar')
+        self.arrival_rngs = {gate_id: streams.arrivals(gate_id) for gate_id in self.arrival_rates}
+        self.arrival_sources = {}
+        self.replay_source = None
+        if self.arrival_mode == 'replay':
+            self.replay_source = open_replay_source(
+                config.REPLAY_PATH,
+                gates=self.router.initial,
+                customer_types=config.CUSTOMER_TYPE_DISTRIBUTION,
+                station_names=config.DEFAULT_SERVICE_TIMES,
+                chunk_size=getattr(config, 'REPLAY_CHUNK_SIZE', DEFAULT_REPLAY_CHUNK_SIZE),
+                time_offset=getattr(config, 'REPLAY_TIME_OFFSET', 0.0),
+            )
+        elif self.arrival_mode == 'block':
+            block_size = getattr(config, 'ARRIVAL_BLOCK_SIZE', DEFAULT_BLOCK_SIZE)
+            for gate_id, rate in self.arrival_rates.items():
+                self.arrival_sources[gate_id] = BlockArrivalSource(
+                    rate, config, streams.generator(f'arrival_block.{gate_id}'),
+                    block_size, self.service_time_spread
+                )
+        elif self.arrival_mode != 'scalar':
+            raise ValueError(f"ARRIVAL_MODE không hợp lệ: {self.arrival_mode!r} "
+                             "(chọn 'scalar', 'block' hoặc 'replay')")
+
+        # Chia số liệu theo cửa sổ thời gian để tự phát hiện warm-up (None = tắt)
+        self.warmup_batch_width = getattr(config, 'WARMUP_BATCH_WIDTH', None)
+        if self.warmup_batch_width:
+            self.analyzer.enable_batches(self.warmup_batch_width, detect_warmup=True)
+
+        # Dừng tuần tự: {metric: độ chính xác tương đối}, UNTIL_TIME thành mức trần
+        self.target_precision = getattr(config, 'TARGET_PRECISION', None)
+        if self.target_precision:
+            validate_precision_targets(self.target_precision, config.STATIONS)
+        self.chunk_time = getattr(config, 'CHUNK_TIME', DEFAULT_CHUNK_TIME)
+        if self.target_precision and not self.warmup_batch_width:
+            self.analyzer.enable_batches(DEFAULT_BATCH_WIDTH, detect_warmup=False)
 
         # Khởi tạo Factory
         self.factory = QueueSystemFactory()
@@ -35,13 +132,19 @@ class BuffetSystem:
                 env=env,
                 config=cfg,
                 analyzer=analyzer,
-                station_name=name
+                station_name=name,
+                streams=self.streams,
+                erratic_delay=self.erratic_delay,
+                station_index=self.station_index[name]
             )
+            model.trace = self.trace
             
             # 2. Tạo FoodStation và tiêm model vào
             self.stations[name] = FoodStation(
                 env=env,
                 name=name,
+                index=self.station_index[name],
+                router=self.router,
                 capacity_K=cfg['capacity_K'],
                 analyzer=analyzer,
                 discipline_model=model, # Tiêm model vào
@@ -50,53 +153,110 @@ class BuffetSystem:
 
             # Ghi nhận station với analyzer
             self.analyzer.add_station(name)
+            self.analyzer.add_level_trackers(
+                name, model.queue_length, model.in_system, model.busy_servers, cfg['servers']
+            )
 
     def generate_customers(self, gate_id):
         """
         Một "tiến trình" SimPy chạy song song. [cite: 207]
         Nó tạo ra khách hàng mới theo phân phối Poisson (exponential inter-arrival). 
         """
-        arrival_rate = self.arrival_rates[gate_id] # (lambda)
-        
         while True:
             # 1. Tính thời gian chờ cho khách tiếp theo
-            inter_arrival_time = random.expovariate(arrival_rate)
+            inter_arrival_time, drawn = self.draw_arrival(gate_id)
             yield self.env.timeout(inter_arrival_time)
             
             # 2. Tạo khách hàng
-            customer_id = self.analyzer.total_arrivals
-            self.analyzer.record_arrival() # [cite: 171]
-            
+            new_customer = self.new_customer(gate_id, self.env.now, drawn)
+
+            self.env.process(self.customer_lifecycle(new_customer))
+
+    def replay_customers(self):
+        """
+        Tiến trình SimPy phát lại khách đến từ log (ARRIVAL_MODE = 'replay'),
+        thay cho generate_customers của các cổng. Log được đọc dần theo chunk.
+        """
+        for arrival_time, gate_id, drawn in self.replay_source:
+            # max: tránh delay âm do sai số làm tròn khi nhiều dòng cùng thời điểm
+            yield self.env.timeout(max(arrival_time - self.env.now, 0.0))
+            new_customer = self.new_customer(gate_id, self.env.now, drawn)
+            self.env.process(self.customer_lifecycle(new_customer))
+
+    def draw_arrival(self, gate_id):
+        """
+        Khoảng thời gian đến khách kế tiếp của cổng gate_id.
+
+        Returns:
+            Tuple (inter_arrival_time, drawn): drawn = (customer_type, service_times_row)
+            đã sinh sẵn ở chế độ 'block', None ở chế độ 'scalar' (new_customer tự sinh)
+        """
+        source = self.arrival_sources.get(gate_id)
+        if source is None:
+            return self.arrival_rngs[gate_id].expovariate(self.arrival_rates[gate_id]), None  # (lambda)
+        inter_arrival_time, customer_type, service_times_row = source.next()
+        return inter_arrival_time, (customer_type, service_times_row)
+
+    def new_customer(self, gate_id, now, drawn=None):
+        """
+        Tạo một khách mới đến cổng gate_id tại thời điểm now (ghi nhận arrival):
+        service times riêng, loại khách và patience_time.
+        drawn: thuộc tính đã sinh sẵn từ draw_arrival (chế độ 'block') hoặc đọc
+        từ log (chế độ 'replay': phần None - loại khách, service time của một
+        quầy - được sinh ngẫu nhiên như chế độ 'scalar').
+        """
+        customer_id = next(self._customer_ids)
+        self.analyzer.record_arrival() # [cite: 171]
+        
+        if drawn is not None:
+            # Hàng service time của khối (mỗi khách một list riêng, dùng luôn)
+            customer_type, customer_service_times = drawn
+        else:
+            customer_type = customer_service_times = None
+
+        rand = self.attribute_rng.random
+        if customer_service_times is None:
             # Tạo service times ngẫu nhiên cho khách này (cho SJF)
-            customer_service_times = {}
-            for station, base_time in self.config.DEFAULT_SERVICE_TIMES.items():
-                # Giả định thời gian của khách dao động 50%-150% so với trung bình
-                customer_service_times[station] = random.uniform(base_time * 0.5, base_time * 1.5)
+            # Giả định thời gian của khách dao động (1 ± spread) so với trung bình
+            # (mặc định 50%-150%; spread = 0 → service time thuần exponential)
+            customer_service_times = [low + width * rand()
+                                      for low, width in self._service_time_bounds]
+        elif None in customer_service_times:
+            # Log thiếu service time của một số quầy
+            customer_service_times = [
+                low + width * rand() if t is None else t
+                for t, (low, width) in zip(customer_service_times, self._service_time_bounds)
+            ]
 
+        if customer_type is None:
             # Chọn loại khách hàng dựa trên phân phối xác suất
-            customer_types = list(self.config.CUSTOMER_TYPE_DISTRIBUTION.keys())
-            customer_weights = list(self.config.CUSTOMER_TYPE_DISTRIBUTION.values())
-            customer_type = random.choices(customer_types, weights=customer_weights, k=1)[0]
-            
-            # Tính patience_time dựa trên loại khách hàng
-            patience_factor = self.config.PATIENCE_TIME_FACTORS.get(
-                customer_type, 
-                1.0  # Mặc định giữ nguyên
-            )
-            patience_time = self.config.DEFAULT_PATIENCE_TIME * patience_factor
-
-            new_customer = Customer(
-                id=customer_id,
-                arrival_gate=gate_id,
-                arrival_time=self.env.now,
-                customer_type=customer_type,
-                patience_time=patience_time,
-                service_times=customer_service_times
-            )
-            # Thêm thuộc tính 'reneged'
-            # new_customer.reneged = False 
+            customer_type = self.attribute_rng.choices(
+                self._customer_types, cum_weights=self._customer_type_cum_weights, k=1)[0]
+        
+        # Tính patience_time dựa trên loại khách hàng
+        patience_factor = self.config.PATIENCE_TIME_FACTORS.get(
+            customer_type, 
+            1.0  # Mặc định giữ nguyên
+        )
+        patience_time = self.config.DEFAULT_PATIENCE_TIME * patience_factor
 
-            self.env.process(self.customer_lifecycle(new_customer))
+        if self._service_layout is not None:
+            customer_service_times = [
+                customer_service_times[i] if i is not None else avg_service_time
+                for i, avg_service_time in self._service_layout
+            ]
+
+        customer = Customer(
+            id=customer_id,
+            arrival_gate=gate_id,
+            arrival_time=now,
+            customer_type=customer_type,
+            patience_time=patience_time,
+            service_times=customer_service_times
+        )
+        if self.trace is not None:
+            self.trace.record_arrival(now, customer)
+        return customer
 
     def customer_lifecycle(self, customer: Customer):
         """
@@ -110,15 +270,17 @@ class BuffetSystem:
         5. Quyết định: Lấy thêm hay ra về
         6. Lặp lại hoặc thoát
         """
-        # Chỉ 'indulgent' không được quay lại quầy đã đi qua
+        # Chỉ 'indulgent' không được quay lại quầy đã đi qua (bitmask theo station_index)
         # Các loại khác có thể quay lại quầy cũ
-        visited_stations = set() if customer.customer_type == 'indulgent' else None
+        visited_stations = 0 if customer.customer_type == 'indulgent' else None
 
         # ========== BƯỚC 1: Chọn quầy đầu tiên kèm kiểm tra K ==========
         station_name, no_available = self.choose_initial_section(customer.arrival_gate)
         if station_name is None:
             if no_available:
                 customer.reneged = True
+                if self.trace is not None:
+                    self.trace.record(self.env.now, customer, -1, TRACE_BALK)
             return
 
         # ========== VÒNG LẶP: Đi lấy thức ăn tại các quầy ==========
@@ -127,10 +289,13 @@ class BuffetSystem:
             
             # Đánh dấu quầy đã đi qua (chỉ cho indulgent)
             if visited_stations is not None:
-                visited_stations.add(station_name)
+                visited_stations |= station.bit
             
             # Đến quầy và lấy thức ăn (có thể bị balking hoặc reneging)
-            yield self.env.process(station.serve(customer))
+            # Chỉ chờ khi khách còn ở quầy (None → đã rời quầy ngay)
+            left_station = station.visit(customer)
+            if left_station is not None:
+                yield left_station
             
             # Nếu khách đã balking hoặc reneging, dừng hành trình ngay
             if customer.reneged:
@@ -141,6 +306,8 @@ class BuffetSystem:
             if next_station is None:
                 if reason == 'no_available':
                     customer.reneged = True
+                    if self.trace is not None:
+                        self.trace.record(self.env.now, customer, -1, TRACE_BALK)
                 break
             station_name = next_station
         
@@ -156,6 +323,8 @@ class BuffetSystem:
             # Khách hàng này thoát thành công
             system_time = self.env.now - customer.arrival_time
             self.analyzer.record_exit(system_time)
+            if self.trace is not None:
+                self.trace.record(self.env.now, customer, -1, TRACE_EXIT)
 
     def choose_initial_section(self, gate_id):
         """
@@ -163,16 +332,16 @@ class BuffetSystem:
         Trả về tuple (station_name, no_available). station_name = None khi không
         có quầy nào còn chỗ.
         """
-        # Lấy ma trận xác suất cho cổng này
-        prob_map = self.prob_matrices['initial'][gate_id]
-        return self._select_station_with_capacity(prob_map)
+        # Ma trận xác suất (đã biên dịch) cho cổng này
+        return self._select_station_with_capacity(self.router.initial[gate_id])
 
     def choose_next_action(self, customer: Customer, visited_stations):
         """
         Quyết định: (a) đi lấy thêm đồ hay (b) ra về. [cite: 277, 278]
         
         LƯU Ý: 
-        - 'indulgent': Không được quay lại quầy đã đi (visited_stations là set)
+        - 'indulgent': Không được quay lại quầy đã đi (visited_stations là bitmask
+          theo station_index)
         - Các loại khác: Có thể quay lại quầy cũ (visited_stations là None)
         Trả về tuple (station_name_or_none, reason):
             - reason = 'exit'  → khách quyết định ra về
@@ -180,95 +349,119 @@ class BuffetSystem:
             - reason = None → có quầy mới để tới
         """
         # Quyết định: Lấy thêm hay Về? (Hình 2 [cite: 118])
-        prob_map = self.prob_matrices['next_action']
-        action = random.choices(
-            list(prob_map.keys()), 
-            weights=list(prob_map.values()), 
-            k=1
-        )[0]
+        action = self.router.next_action()
         
         if action == 'Exit':
             return None, 'exit'  # Khách quyết định ra về
         
         # Nếu chọn "More", chọn quầy tiếp theo theo logic phân bổ mới
-        prob_map_transition = self.prob_matrices['transition']
         next_station, no_available = self._select_station_with_capacity(
-            prob_map_transition,
+            self.router.transition,
             visited_stations
         )
         if next_station is None and no_available:
             return None, 'no_available'
         return next_station, None
 
-    def _select_station_with_capacity(self, prob_map, visited_stations=None):
+    def _select_station_with_capacity(self, sampler, visited_mask=None):
         """
-        Chọn quầy dựa theo xác suất. Nếu quầy được chọn đang đầy K, đặt xác suất
+        Chọn quầy theo xác suất. Nếu quầy được chọn đang đầy K, đặt xác suất
         của quầy đó về 0, chia đều phần xác suất bị mất cho các quầy còn lại
         (đảm bảo tổng = 1) rồi chọn lại. Lặp đến khi tìm được quầy còn chỗ
         hoặc tất cả xác suất đều về 0 (mọi quầy đầy) → trả None, True.
-        """
-        current_probs = {}
-        for station, prob in prob_map.items():
-            if visited_stations is not None and station in visited_stations:
-                continue
-            current_probs[station] = prob
-
-        if not current_probs:
-            return None, False  # Không có quầy hợp lệ (do visited hoặc không cấu hình)
-
-        full_attempts = []
-        full_set = set()
-        while True:
-            # A={ i ∣ p[i] ​> 0}
-            active_stations = [s for s, p in current_probs.items() if p > 0]
-            if not active_stations:
-                if full_attempts:
-                    self._record_balking_for_stations(full_attempts)
-                    return None, True  # Tất cả xác suất đã về 0 do quầy đầy
-                return None, False  # Không có xác suất dương nào (không phải do đầy)
-
-            weights = [current_probs[s] for s in active_stations]
-
-            # chosen∼DiscreteDistribution(P) Where: 𝑃 = { 𝑝[𝑖] ∣ 𝑖 ∈ 𝐴}
-            chosen = random.choices(active_stations, weights=weights, k=1)[0]
-
-            if self.stations[chosen].queue_space.level > 0:
-                return chosen, False
 
-            # Quầy đã đầy: chuyển xác suất sang các quầy còn lại
-            full_attempts.append(chosen)
-            full_set.add(chosen)
-
-            prob_loss = current_probs[chosen]
-            current_probs[chosen] = 0.0
-
-            remaining = [s for s in current_probs if s not in full_set]
-            if not remaining:
-                self._record_balking_for_stations(full_attempts)
-                return None, True  # Không còn quầy nào để nhận phần xác suất mất
-
-            share = prob_loss / len(remaining)
-            for station in remaining:
-                current_probs[station] += share
+        Luật trên được biên dịch sẵn (Router): phân phối kết quả theo tập quầy
+        đầy được tính một lần, mỗi lần chọn chỉ rút 1 số ngẫu nhiên (bảng alias).
+        sampler: StationSampler của ma trận xác suất (router.initial[gate], router.transition)
+        visited_mask: Bitmask quầy đã ghé không được chọn lại (None = không loại quầy nào)
+        """
+        excluded_mask = visited_mask or 0
+        station_name, balked = self.router.select(sampler, excluded_mask)
+        if balked:
+            # Mọi quầy hợp lệ đều đầy: luật chia lại đã thử hết các quầy đó
+            self._record_balking_for_stations(sampler.candidates(excluded_mask))
+            return None, True
+        return station_name, False
 
     def _record_balking_for_stations(self, stations):
         """Ghi nhận attempt + balking khi mọi quầy hợp lệ đều đầy."""
-        unique = set(stations)
+        unique = dict.fromkeys(stations)
         for station_name in unique:
             self.analyzer.record_attempt(station_name)
             self.analyzer.record_blocking_event(station_name)
         if unique:
             self.analyzer.record_customer_balk()
 
-    def run(self, until_time):
+    def batch_clock(self, width):
         """
-        Phương thức khởi động. 
+        Tiến trình đóng batch của analyzer sau mỗi width phút
+        (1 sự kiện / cửa sổ, không polling theo khách).
         """
-        # Khởi chạy các generator cho từng cổng 
-        for gate_id in self.arrival_rates.keys():
-            self.env.process(self.generate_customers(gate_id))
-        
+        while True:
+            yield self.env.timeout(width)
+            self.analyzer.close_batch(self.env.now)
+
+    def close_level_trackers(self):
+        """Chốt các thống kê theo thời gian (hàng chờ, khách tại quầy, server bận) tới env.now."""
+        for station in self.stations.values():
+            model = station.discipline_model
+            model.queue_length.close(self.env.now)
+            model.in_system.close(self.env.now)
+            model.busy_servers.close(self.env.now)
+        # Đóng batch cuối (phần dở dang) nếu đang chia batch
+        if self.analyzer.batch_width and self.analyzer.batch_end_times[-1:] != [self.env.now]:
+            self.analyzer.close_batch(self.env.now)
+
+    def close_trace(self):
+        """Ghi nốt vết sự kiện (nếu đang bật) ra file."""
+        if self.trace is not None:
+            self.trace.close()
+
+    def run_sequential(self, max_time, verbose=True):
+        """
+        Chạy theo từng đoạn chunk_time và dừng khi mọi metric trong
+        TARGET_PRECISION đạt độ chính xác tương đối (CI batch means),
+        hoặc khi chạm mức trần max_time.
+
+        Returns:
+            True nếu đã đạt độ chính xác trước mức trần
+        """
+        converged = False
+        while self.env.now < max_time:
+            self.env.run(until=min(self.env.now + self.chunk_time, max_time))
+            converged = self.analyzer.check_precision(self.target_precision)
+            if verbose:
+                worst = max(v['relative'] for v in self.analyzer.precision.values())
+                print(f"  t={self.env.now:.1f}: do chinh xac tuong doi lon nhat {worst:.2%}")
+            if converged:
+                break
+        self.analyzer.converged = converged
+        return converged
+
+    def run(self, until_time, verbose=True):
+        """
+        Phương thức khởi động.
+        verbose=False: Không in thông báo (dùng khi chạy nhiều replications song song).
+        Nếu config có TARGET_PRECISION: chạy dừng tuần tự, until_time là mức trần.
+        """
+        # Khởi chạy các generator cho từng cổng (hoặc tiến trình phát lại log)
+        if self.replay_source is not None:
+            self.env.process(self.replay_customers())
+        else:
+            for gate_id in self.arrival_rates.keys():
+                self.env.process(self.generate_customers(gate_id))
+        if self.analyzer.batch_width:
+            self.env.process(self.batch_clock(self.analyzer.batch_width))
+
         # Chạy mô phỏng cho đến mốc thời gian
-        print(f"--- Bat dau mo phong (Until={until_time}) ---")
-        self.env.run(until=until_time)
-        print("--- Ket thuc mo phong ---")
\ No newline at end of file
+        if verbose:
+            print(f"--- Bat dau mo phong (Until={until_time}) ---")
+        if self.target_precision:
+            self.run_sequential(until_time, verbose)
+        else:
+            self.env.run(until=until_time)
+        self.analyzer.simulated_time = self.env.now
+        self.close_level_trackers()
+        self.close_trace()
+        if verbose:
+            print("--- Ket thuc mo phong ---")
@@ -4,28 +4,38 @@ class Customer:
     """
     Đại diện cho một "thực thể" (entity) di chuyển trong hệ thống. [cite: 233]
     Chủ yếu là một cấu trúc dữ liệu để lưu trữ trạng thái. [cite: 234]
+
+    Dùng __slots__ (không có __dict__ riêng cho mỗi khách): mỗi lần chạy tạo
+    hàng triệu khách, nên bộ nhớ và áp lực GC cho mỗi khách cần nhỏ nhất có thể.
     """
+    __slots__ = ('id', 'arrival_gate', 'arrival_time', 'customer_type', 'patience_time',
+                 'service_times', 'current_station', 'start_wait_time', 'visit_event',
+                 'reneged', 'queue_handle', 'deadline_handle', 'erratic_stamp')
+
     def __init__(self, id, arrival_gate, arrival_time, customer_type, patience_time, service_times):
-        
+
         # --- Thuộc tính chính từ báo cáo ---
         self.id = id                         # Mã định danh duy nhất [cite: 239]
         self.arrival_gate = arrival_gate     # Ghi nhận cổng vào (0 hay 1) [cite: 236]
         self.arrival_time = arrival_time     # Thời điểm khách xuất hiện [cite: 237]
         self.customer_type = customer_type   # 'normal', 'indulgent', 'impatient', ... [cite: 240]
-        self.patience_time = patience_time   # Ngưỡng kiên nhẫn để "Reneging" 
-        
-        # Dict: {'Meat': 5.0, 'Seafood': 7.0, ...}
-        # Lưu thời gian LẤY THỨC ĂN (service time) trung bình của khách này 
+        self.patience_time = patience_time   # Ngưỡng kiên nhẫn để "Reneging"
+
+        # List: [5.0, 7.0, ...] theo thứ tự quầy trong STATIONS
+        # (chỉ số = station_index của quầy, xem BuffetSystem.station_index)
+        # Lưu thời gian LẤY THỨC ĂN (service time) trung bình của khách này
         # tại mỗi quầy [cite: 238]
         self.service_times = service_times
-        
+
         # --- Thuộc tính theo dõi trạng thái ---
         self.current_station = None          # Quầy hiện tại khách đang ở
         self.start_wait_time = 0.0           # Thời điểm bắt đầu chờ (để tính wait time)
-        self.served_event = None             # Sự kiện để server báo cho customer
+        self.visit_event = None              # Sự kiện báo khách rời quầy (FoodStation.visit)
         self.reneged = False
-        self.my_turn_event = None
+        self.queue_handle = None             # Handle trong hàng đợi của quầy (xóa ngay khi reneging)
+        self.deadline_handle = None          # Handle hạn chót kiên nhẫn tại quầy (hủy khi được phục vụ)
+        self.erratic_stamp = None            # Mốc độ trễ erratic của quầy lúc bắt đầu chờ
 
     def __str__(self):
         """Hàm hỗ trợ cho việc logging, in ra ID khách hàng."""
-        return f"Customer_{self.id}({self.customer_type})"
\ No newline at end of file
+        return f"Customer_{self.id}({self.customer_type})"
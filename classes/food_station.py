@@ -1,75 +1,106 @@
 # classes/food_station.py
 import simpy
-import random
 from .customer import Customer
 from .analysis import Analysis
 from core.base_queue_system import BaseQueueSystem # Import lớp base
+from core.trace_recorder import TRACE_ATTEMPT, TRACE_BALK, TRACE_QUEUE
 
 class FoodStation:
     """
     Đại diện cho một hàng đợi M/M/c/K vật lý.
-    Phiên bản này được refactor để sử dụng mô hình kỷ luật (model) 
+    Phiên bản này được refactor để sử dụng mô hình kỷ luật (model)
     được tiêm vào (dependency injection).
+
+    TÀI NGUYÊN GỘP (fused): một lần ghé quầy không còn đi qua simpy.Container
+    (K) rồi tới Resource/Container (c) với process lồng nhau. Quầy đếm chỗ K
+    bằng số nguyên và xử lý trọn vẹn bằng callback:
+    - Nhận khách / Balking khi K đầy (visit)
+    - Xếp hàng theo kỷ luật, hạn chót kiên nhẫn, giao server (discipline_model.admit)
+    - Khách rời quầy → trả chỗ K, đánh thức hành trình khách (leave)
+    Khách chỉ chờ MỘT event cho cả lần ghé (và không event nào nếu rời quầy ngay).
     """
-    def __init__(self, env: simpy.Environment, name: str, 
-                 capacity_K: int, analyzer: Analysis, 
-                 discipline_model: BaseQueueSystem, config=None): # Thêm config parameter
-        
+    def __init__(self, env: simpy.Environment, name: str,
+                 capacity_K: int, analyzer: Analysis,
+                 discipline_model: BaseQueueSystem, config=None, # Thêm config parameter
+                 index=0, router=None):
+
         self.env = env
-        self.name = name                 
+        self.name = name
+        self.index = index               # Chỉ số của quầy trong STATIONS
+        self.bit = 1 << index            # Bit của quầy trong các bitmask định tuyến
+        self.router = router             # Router: cập nhật bitmask quầy đầy
         self.analyzer = analyzer
         self.discipline_model = discipline_model # Model (SJF, FCFS...) được tiêm vào
+        self.discipline_model.on_leave = self.leave
+        self.trace = discipline_model.trace   # TraceRecorder (None = tắt ghi vết)
         self.config = config  # Lưu config để reset patience_time
-        
-        # 'queue_space' vẫn ở đây, để theo dõi không gian vật lý (K)
-        self.capacity_K = capacity_K     
-        self.queue_space = simpy.Container(env, capacity=capacity_K, init=capacity_K)
 
-    def serve(self, customer: Customer):
+        # Không gian vật lý (K): không gian đứng lấy thức ăn (serving space) + đứng xếp hàng
+        self.capacity_K = capacity_K
+        self.free_space = capacity_K     # Số chỗ K còn trống (dùng khi định tuyến khách)
+        if capacity_K == 0 and router is not None:
+            router.mark_full(index)
+
+    def visit(self, customer: Customer):
         """
-        Tiến trình mô phỏng.
-        Xử lý logic chờ không gian tổng thể (K) (Balking).
-        Sau đó ủy quyền logic chờ không gian phục vụ (serving space) (Reneging) cho discipline_model.
+        Khách ghé quầy.
+
+        LUỒNG:
+        1. K đầy → Balking ngay (không chờ)
+        2. Lấy 1 chỗ K, reset patience_time, bắt đầu chờ server
+        3. Ủy quyền chờ server / Reneging / phục vụ cho discipline_model
+
+        Returns:
+            None nếu khách đã rời quầy (balking, reneging ngay hoặc được phục vụ
+            và đi tiếp ngay); ngược lại event sẽ xảy ra khi khách rời quầy.
+            Sau đó kiểm tra customer.reneged.
         """
-        
         self.analyzer.record_attempt(self.name)
-        
-        # 1. Kiểm tra và lấy không gian vật lý tổng thể (K) - BALKING
-        # Balking: Nếu K đầy → Khách bỏ về ngay lập tức (không chờ)
-        # SimPy Container: 
-        #   - init=K nghĩa là ban đầu có K đơn vị trong container (K chỗ trống)
-        #   - level = số đơn vị hiện có trong container (số chỗ còn trống)
-        #   - level = 0 → đã lấy hết (đầy, không còn chỗ)
-        #   - level = K → chưa lấy gì (rỗng, còn K chỗ)
-        # Vậy: available_space = level (số chỗ còn trống)
-        # K bao gồm: không gian đứng lấy thức ăn (serving space) + không gian đứng xếp hàng
-        if self.queue_space.level == 0:
-            # Queue đã đầy (level = 0) → Balking ngay (không chờ patience_time)
+        trace = self.trace
+        if trace is not None:
+            trace.record(self.env.now, customer, self.index, TRACE_ATTEMPT)
+
+        # ========== BƯỚC 1: Không gian K (Balking) ==========
+        if self.free_space == 0:
+            # Quầy đã đầy → Balking ngay (không chờ patience_time)
             customer.reneged = True
             self.analyzer.record_blocking_event(self.name)
             self.analyzer.record_customer_balk()
-            return  # Khách hàng bỏ về ngay
-        
-        # 2. Lấy không gian K (tổng thể)
-        # Lưu ý: Nếu available_space > 0, get(1) sẽ lấy ngay (không chờ)
-        # Nếu có race condition (nhiều khách cùng lúc), get(1) sẽ chờ
-        # Thời gian chờ đó sẽ được tính vào time_spent_waiting_K
-        yield self.queue_space.get(1)
+            if trace is not None:
+                trace.record(self.env.now, customer, self.index, TRACE_BALK)
+            return None  # Khách hàng bỏ về ngay
+
+        # ========== BƯỚC 2: Lấy không gian K (tổng thể) ==========
+        self.free_space -= 1
+        if self.free_space == 0 and self.router is not None:
+            self.router.mark_full(self.index)
+        if trace is not None:
+            trace.record(self.env.now, customer, self.index, TRACE_QUEUE)
 
-        # 3. Reset patience_time sau khi khách THỰC SỰ vào quầy
+        # Reset patience_time sau khi khách THỰC SỰ vào quầy
         if self.config:
             patience_factor = self.config.PATIENCE_TIME_FACTORS.get(
-                customer.customer_type, 
+                customer.customer_type,
                 1.0
             )
             customer.patience_time = self.config.DEFAULT_PATIENCE_TIME * patience_factor
-        
+
         # Đánh dấu thời điểm bắt đầu chờ không gian phục vụ (sau khi đã có chỗ K)
         customer.start_wait_time = self.env.now
-        
-        # 4. Ủy quyền cho mô hình xử lý chờ không gian phục vụ (serving space) và RENEGING
-        # Reneging: Khách chờ không gian phục vụ quá patience_time → Rời hàng
-        yield self.env.process(self.discipline_model.serve(customer))
-        
-        # 5. Phục vụ xong (hoặc reneged), trả lại không gian K
-        yield self.queue_space.put(1)
\ No newline at end of file
+
+        # ========== BƯỚC 3: Chờ server và RENEGING (qua callback) ==========
+        customer.visit_event = None
+        if self.discipline_model.admit(customer):
+            return None
+        customer.visit_event = self.env.event()
+        return customer.visit_event
+
+    def leave(self, customer: Customer):
+        """Callback của discipline_model: khách rời quầy (phục vụ xong hoặc reneged)."""
+        if self.free_space == 0 and self.router is not None:
+            self.router.mark_available(self.index)
+        self.free_space += 1
+        event = customer.visit_event
+        if event is not None:
+            customer.visit_event = None
+            event.succeed()
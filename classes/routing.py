@@ -0,0 +1,205 @@
+# classes/routing.py
+"""
+ĐỊNH TUYẾN BIÊN DỊCH SẴN (Compiled routing)
+
+Trước đây mỗi quyết định định tuyến dựng lại dict xác suất, lọc quầy đã ghé,
+gọi random.choices với list mới và, khi quầy được chọn đang đầy, chia lại
+phần xác suất mất trong vòng lặp Python rồi chọn lại.
+
+Router biên dịch PROB_MATRICES một lần cho mỗi config:
+- Quầy được đánh chỉ số theo thứ tự STATIONS; tập quầy là BITMASK
+  (quầy đã ghé của khách 'indulgent', quầy đang đầy K)
+- full_mask được cập nhật dần khi chỗ K của quầy chạm 0 / rời 0
+  (FoodStation.visit/leave) → kiểm tra "mọi quầy hợp lệ đều
+  đầy" là một phép AND, O(1)
+- Mỗi ma trận xác suất (cổng vào, 'transition') là một StationSampler:
+  với mỗi cặp (quầy bị loại, quầy đầy) gặp lần đầu, tính PHÂN PHỐI KẾT QUẢ
+  của luật chia lại hiện tại (redistribution_distribution, duyệt hết các
+  nhánh chọn-đầy-chia-lại) và dựng bảng alias (Vose) → mỗi lần chọn quầy
+  chỉ tốn 1 số ngẫu nhiên, O(1)
+
+Luật chia lại giữ NGUYÊN như _select_station_with_capacity cũ: chọn theo
+xác suất; quầy đầy → xác suất của nó về 0, chia đều cho các quầy chưa bị
+thử; chọn lại. Phân phối quầy nhận khách và trường hợp balking (mọi quầy
+hợp lệ đều đầy → ghi balking cho tất cả các quầy đó) không đổi; chỉ cách
+dùng số ngẫu nhiên thay đổi (1 số/lần chọn thay vì 1 số/lần thử).
+"""
+from itertools import accumulate
+
+
+def redistribution_distribution(prob_map, full, excluded=()):
+    """
+    Phân phối quầy được nhận khi chọn theo prob_map với tập quầy đầy full,
+    đúng theo luật chia lại của định tuyến: chọn một quầy theo xác suất; nếu
+    đầy thì đưa xác suất của nó về 0, chia đều cho các quầy chưa bị
+    thử-và-đầy, rồi chọn lại. Duyệt hết các nhánh (số quầy nhỏ).
+    Dùng bởi StationSampler (bảng alias) và MultiQueueSystem (lời giải giải tích).
+
+    Args:
+        prob_map: {station: xác suất}
+        full: Tập quầy đang đầy
+        excluded: Các quầy không được chọn (ví dụ đã ghé, với khách indulgent)
+
+    Returns:
+        Tuple ({station: xác suất được nhận}, xác suất balking)
+    """
+    stations = [st for st in prob_map if st not in excluded]
+    admitted = dict.fromkeys(stations, 0.0)
+    balk = 0.0
+
+    def visit(probs, tried, weight):
+        nonlocal balk
+        active = [st for st in stations if probs[st] > 0]
+        total = sum(probs[st] for st in active)
+        if not active or total <= 0:
+            balk += weight if tried else 0.0
+            return
+        for st in active:
+            w = weight * probs[st] / total
+            if st not in full:
+                admitted[st] += w
+                continue
+            now_tried = tried | {st}
+            remaining = [r for r in stations if r not in now_tried]
+            if not remaining:
+                balk += w
+                continue
+            new_probs = dict(probs)
+            share = new_probs[st] / len(remaining)
+            new_probs[st] = 0.0
+            for r in remaining:
+                new_probs[r] += share
+            visit(new_probs, now_tried, w)
+
+    visit({st: prob_map[st] for st in stations}, frozenset(), 1.0)
+    return admitted, balk
+
+
+def build_alias_table(weights):
+    """
+    Bảng alias (phương pháp Vose) cho phân phối rời rạc weights (không cần chuẩn hóa).
+
+    Returns:
+        Tuple (probs, aliases): chọn i đều trong [0, n), giữ i nếu
+        u < probs[i], ngược lại lấy aliases[i]
+    """
+    n = len(weights)
+    total = sum(weights)
+    scaled = [w * n / total for w in weights]
+    probs = [1.0] * n
+    aliases = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s = small.pop()
+        g = large.pop()
+        probs[s] = scaled[s]
+        aliases[s] = g
+        scaled[g] -= 1.0 - scaled[s]
+        if scaled[g] < 1.0:
+            small.append(g)
+        else:
+            large.append(g)
+    # Phần còn lại (sai số làm tròn): xác suất giữ = 1
+    return probs, aliases
+
+
+class StationSampler:
+    """
+    Chọn quầy theo một ma trận xác suất {station: xác suất}, có tính tới
+    quầy bị loại (đã ghé) và quầy đang đầy.
+    """
+    def __init__(self, prob_map, station_index):
+        """
+        Args:
+            prob_map: {station: xác suất} (một dòng của PROB_MATRICES)
+            station_index: {station: chỉ số trong STATIONS}
+        """
+        self.prob_map = prob_map
+        self.bits = {name: 1 << station_index[name] for name in prob_map}
+        self.all_mask = 0
+        self.positive_mask = 0
+        for name, prob in prob_map.items():
+            self.all_mask |= self.bits[name]
+            if prob > 0:
+                self.positive_mask |= self.bits[name]
+        # {(mask bị loại, mask đầy trong phần còn lại): (tên quầy, probs, aliases)}
+        self._tables = {}
+
+    def candidates(self, excluded_mask):
+        """Các quầy hợp lệ (không bị loại), theo thứ tự của prob_map."""
+        return [name for name, bit in self.bits.items() if not bit & excluded_mask]
+
+    def table(self, excluded_mask, full_mask):
+        """Bảng alias của phân phối quầy nhận khách (tính một lần rồi dùng lại)."""
+        key = (excluded_mask, full_mask)
+        table = self._tables.get(key)
+        if table is None:
+            excluded = [name for name, bit in self.bits.items() if bit & excluded_mask]
+            full = {name for name, bit in self.bits.items() if bit & full_mask}
+            admitted, _ = redistribution_distribution(self.prob_map, full, excluded)
+            names = [name for name, prob in admitted.items() if prob > 0]
+            probs, aliases = build_alias_table([admitted[name] for name in names])
+            table = self._tables[key] = (names, probs, aliases)
+        return table
+
+
+class Router:
+    """
+    Định tuyến của một BuffetSystem: các StationSampler, bảng 'next_action'
+    và bitmask các quầy đang đầy.
+    """
+    def __init__(self, prob_matrices, station_index, rng):
+        """
+        Args:
+            prob_matrices: PROB_MATRICES của config
+            station_index: {station: chỉ số trong STATIONS}
+            rng: Luồng ngẫu nhiên định tuyến (random.Random)
+        """
+        self.rng = rng
+        self.station_index = station_index
+        self.full_mask = 0           # Bit i = 1 ⇔ quầy i đang hết chỗ K
+        self.initial = {
+            gate_id: StationSampler(prob_map, station_index)
+            for gate_id, prob_map in prob_matrices['initial'].items()
+        }
+        self.transition = StationSampler(prob_matrices['transition'], station_index)
+        # 'next_action': trọng số tích lũy dựng một lần (cùng cách rút số với random.choices)
+        next_action = prob_matrices['next_action']
+        self.next_actions = list(next_action.keys())
+        self.next_action_cum_weights = list(accumulate(next_action.values()))
+
+    def mark_full(self, index):
+        """Quầy index vừa hết chỗ K."""
+        self.full_mask |= 1 << index
+
+    def mark_available(self, index):
+        """Quầy index vừa có lại chỗ K."""
+        self.full_mask &= ~(1 << index)
+
+    def next_action(self):
+        """'More' hoặc 'Exit' theo PROB_MATRICES['next_action']."""
+        return self.rng.choices(self.next_actions, cum_weights=self.next_action_cum_weights, k=1)[0]
+
+    def select(self, sampler, excluded_mask=0):
+        """
+        Chọn quầy theo sampler, bỏ qua quầy trong excluded_mask.
+
+        Returns:
+            Tuple (station_name, balked):
+            - (tên quầy, False): quầy còn chỗ được chọn
+            - (None, False): không có quầy hợp lệ có xác suất dương
+            - (None, True): mọi quầy hợp lệ đều đầy (ghi balking: sampler.candidates)
+        """
+        allowed = sampler.all_mask & ~excluded_mask
+        if not allowed & sampler.positive_mask:
+            return None, False
+        full = self.full_mask & allowed
+        if full == allowed:
+            return None, True
+        names, probs, aliases = sampler.table(excluded_mask & sampler.all_mask, full)
+        u = self.rng.random() * len(names)
+        i = int(u)
+        if u - i >= probs[i]:
+            i = aliases[i]
+        return names[i], False
@@ -59,6 +59,8 @@ DEFAULT_SERVICE_TIMES = {
 # - 'servers': Không gian vật lý để đứng lấy thức ăn (serving space)
 # - 'capacity_K': Tổng không gian vật lý = không gian đứng lấy thức ăn + không gian đứng xếp hàng
 #   (capacity_K >= servers, phần còn lại là không gian xếp hàng)
+# - 'discipline': Tên kỷ luật đã đăng ký: 'FCFS', 'SJF', 'ROS', 'LCFS',
+#   'PRIORITY' (theo loại khách), 'AGED_SJF' (xem QueueSystemFactory)
 STATIONS = {
     'Meat': {
         'servers': 5,            # Không gian vật lý để đứng lấy thức ăn
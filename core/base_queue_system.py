@@ -1,28 +1,289 @@
 # core/base_queue_system.py
+import random
 import simpy
 from abc import ABC, abstractmethod
 from classes.customer import Customer
 from classes.analysis import Analysis
+from core.deadline_timer import DeadlineTimer
+from core.statistics import TimeWeightedStat
+from core.trace_recorder import TRACE_SERVICE_START, TRACE_SERVICE_END, TRACE_RENEGE
+from core.wait_queues import ShiftedPriorityQueue
+
+# Các kỷ luật đã đăng ký: {tên dùng trong config ('discipline': tên): lớp model}
+QUEUE_DISCIPLINES = {}
+
+
+def register_discipline(name):
+    """
+    Decorator đăng ký một lớp model cho kỷ luật name, ví dụ:
+
+        @register_discipline('LCFS')
+        class LCFSModel(PriorityQueueSystem): ...
+
+    Sau đó config có thể dùng 'discipline': 'LCFS' (QueueSystemFactory).
+    """
+    def decorator(cls):
+        QUEUE_DISCIPLINES[name] = cls
+        cls.discipline_name = name
+        return cls
+    return decorator
+
 
 class BaseQueueSystem(ABC):
     """
     Lớp cơ sở trừu tượng (Abstract Base Class) cho tất cả mô hình hàng đợi.
-    Định nghĩa giao diện 'serve' chung.
+    Định nghĩa giao diện 'admit' chung.
     """
     def __init__(self, env: simpy.Environment, num_servers: int, 
-                 avg_service_time: float, analyzer: Analysis, station_name: str):
+                 avg_service_time: float, analyzer: Analysis, station_name: str,
+                 streams=None, erratic_delay=0.2, station_index=0):
         self.env = env
         # num_servers: Số lượng không gian vật lý để đứng lấy thức ăn (serving space)
         self.num_servers = num_servers
         self.avg_service_time = avg_service_time
         self.analyzer = analyzer
-        self.station_name = station_name # Cần để lấy service time của khách
+        self.station_name = station_name
+        # Chỉ số của quầy trong customer.service_times (thứ tự STATIONS)
+        self.station_index = station_index
+        # Các mức theo thời gian của quầy, cập nhật bởi model khi mức thay đổi:
+        # - queue_length: Số khách đang chờ server (vào hàng → được phục vụ / reneging)
+        # - in_system: Số khách tại quầy (đang chờ + đang được phục vụ)
+        # - busy_servers: Số server đang bận (lấy/trả server)
+        self.queue_length = TimeWeightedStat()
+        self.in_system = TimeWeightedStat()
+        self.busy_servers = TimeWeightedStat()
+        # Luồng ngẫu nhiên riêng cho service time của quầy (None → module random)
+        self.streams = streams
+        self.service_rng = streams.service(station_name) if streams is not None else random
+
+        # Khách 'erratic' được phục vụ → mọi khách ĐANG CHỜ ở quầy chậm thêm
+        # erratic_delay (ERRATIC_DELAY_AMOUNT của config đang chạy).
+        # Tính lười: quầy giữ tổng độ trễ cộng dồn (erratic_offset), khách ghi
+        # mốc lúc bắt đầu chờ và nhận phần chênh lệch khi rời hàng → O(1)/sự kiện
+        self.erratic_delay = erratic_delay
+        self.erratic_offset = 0.0
+
+        # Callback của quầy vật lý (FoodStation.leave): khách rời quầy → trả chỗ K,
+        # đánh thức hành trình của khách. Được gán khi FoodStation nhận model.
+        self.on_leave = None
+        # TraceRecorder của hệ thống (None = tắt ghi vết), gán bởi BuffetSystem
+        self.trace = None
+
+    def stamp_erratic(self, customer: Customer):
+        """Khách bắt đầu chờ server: ghi mốc độ trễ erratic hiện tại của quầy."""
+        customer.erratic_stamp = self.erratic_offset
+
+    def resolve_erratic(self, customer: Customer):
+        """
+        Khách rời hàng chờ (được chọn phục vụ): cộng độ trễ erratic phát sinh
+        trong lúc chờ vào service time của khách tại quầy.
+        """
+        if customer.erratic_stamp is None:
+            return
+        delay = self.erratic_offset - customer.erratic_stamp
+        if delay:
+            customer.service_times[self.station_index] += delay
+        customer.erratic_stamp = None
+
+    def start_erratic(self, customer: Customer):
+        """Khách bắt đầu được phục vụ: nếu là 'erratic' → các khách đang chờ chậm thêm."""
+        if customer.customer_type == 'erratic':
+            self.erratic_offset += self.erratic_delay
+
+    @abstractmethod
+    def admit(self, customer: Customer):
+        """
+        Khách (đã có chỗ K) vào chờ server. Không phải generator: mọi việc chờ,
+        phục vụ và Reneging diễn ra bằng callback, khách rời quầy qua on_leave.
+
+        Returns:
+            True nếu khách đã rời quầy ngay trong lúc gọi (on_leave đã được gọi)
+        """
+        pass
+
+class DispatchingQueueSystem(BaseQueueSystem):
+    """
+    Lớp cơ sở cho các kỷ luật (FCFS, SJF, ROS...): ĐIỀU PHỐI THEO SỰ KIỆN.
+
+    Không có process nào cho việc chờ server: server rảnh được giao ngay khi
+    - Khách đến lúc còn server rảnh (admit → dispatch)
+    - Một khách phục vụ xong (callback của timeout → dispatch)
+    Mỗi lần phục vụ chỉ tốn 1 timeout; hạn chót kiên nhẫn nằm trong
+    DeadlineTimer chung của quầy (hủy được khi khách được phục vụ).
+
+    Khách rời quầy (on_leave):
+    - release_at_service_start = False (mặc định): khi phục vụ xong
+    - release_at_service_start = True (SJF, ROS - giữ hành vi cũ): ngay khi
+      được giao server (khách trả chỗ K và đi tiếp, server bận đến hết service time)
+
+    Lớp con chỉ cung cấp hàng đợi:
+    - enqueue(customer): thêm khách đang chờ
+    - select_next(): lấy ra khách được phục vụ kế tiếp (None nếu hết khách)
+    - cancel(customer): xóa khách reneging khỏi hàng
+    Kỷ luật chỉ cần một khóa ưu tiên: kế thừa PriorityQueueSystem.
+    """
+    release_at_service_start = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Số không gian phục vụ (server) đang rảnh
+        self.free_servers = self.num_servers
+        # Hạn chót kiên nhẫn của khách đang chờ server: 1 timer SimPy cho cả quầy
+        self.deadlines = DeadlineTimer(self.env, self._patience_expired)
 
     @abstractmethod
-    def serve(self, customer: Customer):
+    def enqueue(self, customer: Customer):
+        pass
+
+    @abstractmethod
+    def select_next(self):
+        pass
+
+    @abstractmethod
+    def cancel(self, customer: Customer):
+        pass
+
+    def admit(self, customer: Customer):
+        """
+        Khách vào hàng chờ server.
+
+        LUỒNG:
+        1. Hết kiên nhẫn ngay → Reneging
+        2. Còn server rảnh → hàng đang rỗng, điều phối: khách được phục vụ ngay
+        3. Hết server → xếp hàng, đăng ký hạn chót kiên nhẫn
+           (được phục vụ HOẶC hết kiên nhẫn → Reneging, xem _patience_expired)
         """
-        Tiến trình trừu tượng cho việc phục vụ khách hàng.
-        Bao gồm logic chờ không gian phục vụ (serving space) và xử lý "Reneging".
-        Logic chờ không gian tổng thể (K) được xử lý ở FoodStation.
+        # ========== BƯỚC 1: Hết kiên nhẫn ngay khi vào chờ server ==========
+        patience_remaining = customer.patience_time
+        if patience_remaining <= 0:
+            customer.reneged = True
+            self.analyzer.record_reneging_event(self.station_name)
+            wait_time = self.env.now - customer.start_wait_time
+            self.analyzer.record_wait_time(self.station_name, wait_time)
+            if self.trace is not None:
+                self.trace.record(self.env.now, customer, self.station_index, TRACE_RENEGE)
+            self.on_leave(customer)
+            return True
+
+        # ========== BƯỚC 2: Vào hàng, điều phối nếu còn server rảnh ==========
+        self.stamp_erratic(customer)
+        self.enqueue(customer)
+        self.queue_length.add(self.env.now, 1)
+        self.in_system.add(self.env.now, 1)
+        if self.free_servers > 0:
+            # Server rảnh ⇒ hàng đợi rỗng (dispatch luôn giao hết) ⇒ chọn chính khách này
+            self.dispatch()
+            return self.release_at_service_start
+
+        # ========== BƯỚC 3: Chờ server HOẶC hết kiên nhẫn ==========
+        if patience_remaining != float('inf'):
+            customer.deadline_handle = self.deadlines.add(
+                self.env.now + patience_remaining, customer
+            )
+        return False
+
+    def _patience_expired(self, customer: Customer):
+        """Hạn chót tới trước khi được phục vụ → Reneging, rời hàng ngay."""
+        customer.deadline_handle = None
+        customer.reneged = True
+        self.cancel(customer)
+        self.queue_length.add(self.env.now, -1)
+        self.in_system.add(self.env.now, -1)
+        self.analyzer.record_reneging_event(self.station_name)
+        wait_time = self.env.now - customer.start_wait_time
+        self.analyzer.record_wait_time(self.station_name, wait_time)
+        if self.trace is not None:
+            self.trace.record(self.env.now, customer, self.station_index, TRACE_RENEGE)
+        self.on_leave(customer)
+
+    def dispatch(self):
         """
-        pass
\ No newline at end of file
+        Giao các server rảnh cho khách được chọn kế tiếp (đến khi hết server
+        hoặc hết khách). SJF/ROS: khách được giao server rời quầy SAU khi
+        điều phối xong.
+        """
+        started = []
+        while self.free_servers > 0:
+            customer = self.select_next()
+            if customer is None:
+                break
+            # Khách rời hàng: chốt độ trễ erratic tính đến lúc này
+            self.resolve_erratic(customer)
+            self.start_service(customer)
+            started.append(customer)
+        if self.release_at_service_start:
+            for customer in started:
+                self.on_leave(customer)
+
+    def start_service(self, customer: Customer):
+        """Giao server: ghi wait time, hẹn thời điểm phục vụ xong."""
+        self.free_servers -= 1
+        self.queue_length.add(self.env.now, -1)
+        self.busy_servers.add(self.env.now, 1)
+
+        # Wait time = Tổng thời gian từ khi bắt đầu chờ K đến khi được phục vụ
+        wait_time = self.env.now - customer.start_wait_time
+        self.analyzer.record_wait_time(self.station_name, wait_time)
+        if self.trace is not None:
+            self.trace.record(self.env.now, customer, self.station_index, TRACE_SERVICE_START)
+        if customer.deadline_handle is not None:
+            self.deadlines.cancel(customer.deadline_handle)
+            customer.deadline_handle = None
+        customer.queue_handle = None
+
+        base_service_time = customer.service_times[self.station_index]
+        # - 'indulgent': Nhân đôi serve_time
+        if customer.customer_type == 'indulgent':
+            base_service_time *= 2.0
+        # - 'erratic': Các khách đang chờ chậm thêm (tính lười)
+        self.start_erratic(customer)
+
+        actual_service_time = self.service_rng.expovariate(1.0 / base_service_time)
+        self.env.timeout(actual_service_time, customer).callbacks.append(self._end_service)
+
+    def _end_service(self, event):
+        """Phục vụ xong: trả server, điều phối khách kế tiếp; FCFS: khách rời quầy."""
+        if self.trace is not None:
+            self.trace.record(self.env.now, event.value, self.station_index, TRACE_SERVICE_END)
+        self.free_servers += 1
+        self.busy_servers.add(self.env.now, -1)
+        self.in_system.add(self.env.now, -1)
+        self.dispatch()
+        if not self.release_at_service_start:
+            self.on_leave(event.value)
+
+
+class PriorityQueueSystem(DispatchingQueueSystem):
+    """
+    Lõi hàng đợi dùng chung cho các kỷ luật theo KHÓA ƯU TIÊN (SJF, LCFS,
+    theo loại khách, aged-SJF...): ShiftedPriorityQueue, thêm/chọn/xóa O(log n).
+
+    Lớp con chỉ cung cấp priority_key(customer, station_index)
+    → (base, scale), khách có độ ưu tiên thực nhỏ nhất được phục vụ trước:
+    - scale > 0: scale * (base + erratic_offset) (độ trễ erratic của quầy
+      cộng dồn trong lúc chờ, xem SJFModel)
+    - scale = 0: base cố định
+    Cùng độ ưu tiên → ai vào hàng trước được phục vụ trước.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # customer.queue_handle: xóa khách ngay khi reneging, O(log n)
+        self.wait_list = ShiftedPriorityQueue()
+
+    @staticmethod
+    @abstractmethod
+    def priority_key(customer: Customer, station_index):
+        pass
+
+    def enqueue(self, customer: Customer):
+        base, scale = self.priority_key(customer, self.station_index)
+        customer.queue_handle = self.wait_list.push(base, scale, customer)
+
+    def select_next(self):
+        if not self.wait_list:
+            return None
+        return self.wait_list.pop(self.erratic_offset)
+
+    def cancel(self, customer: Customer):
+        # Rời hàng ngay (heap chỉ chứa khách thực sự đang chờ)
+        self.wait_list.remove(customer.queue_handle)
@@ -0,0 +1,65 @@
+# core/deadline_timer.py
+"""
+HẠN CHÓT KIÊN NHẪN (Reneging deadlines) CỦA MỘT QUẦY
+
+Trước đây mỗi khách chờ server tạo 1 env.timeout(patience) trong AnyOf.
+Khách được phục vụ trước thì timeout đó vẫn nằm trong heap sự kiện của SimPy
+tới khi hết hạn (không làm gì), nên giờ cao điểm heap chứa hàng nghìn timer
+"chết" và mọi thao tác push/pop đều trả thêm chi phí log của chúng.
+
+DeadlineTimer giữ hạn chót của các khách đang chờ trong một IndexedHeap
+(hủy thật sự, O(log n), khi khách được phục vụ) và chỉ hẹn MỘT timeout SimPy
+cho hạn chót sớm nhất. Timer nổ → xử lý mọi hạn chót đã tới → hẹn timer cho
+hạn chót kế tiếp. Heap sự kiện chỉ còn tỷ lệ với số sự kiện còn hiệu lực.
+"""
+from core.wait_queues import IndexedHeap
+
+
+class DeadlineTimer:
+    """
+    Các hạn chót của một quầy, dùng chung một timer SimPy.
+    """
+    def __init__(self, env, on_expire):
+        """
+        Args:
+            env: simpy.Environment
+            on_expire: Hàm gọi với item khi hạn chót của item tới
+        """
+        self.env = env
+        self.on_expire = on_expire
+        self.deadlines = IndexedHeap()
+        self._timer = None        # Timeout đang hẹn (None = không có)
+        self._armed_at = None     # Hạn chót mà timer đang hẹn
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def add(self, deadline, item):
+        """Đăng ký hạn chót cho item, trả về handle để hủy."""
+        handle = self.deadlines.push(deadline, item)
+        if self._armed_at is None or deadline < self._armed_at:
+            self._arm(deadline)
+        return handle
+
+    def cancel(self, handle):
+        """Hủy hạn chót (khách đã được phục vụ). Timer sẽ tự hẹn lại khi nổ."""
+        self.deadlines.remove(handle)
+
+    def _arm(self, deadline):
+        # Timer cũ (muộn hơn) bị bỏ qua khi nổ vì không còn là self._timer
+        self._armed_at = deadline
+        self._timer = self.env.timeout(deadline - self.env.now)
+        self._timer.callbacks.append(self._fire)
+
+    def _fire(self, event):
+        if event is not self._timer:
+            return
+        limit = self._armed_at
+        self._timer = None
+        self._armed_at = None
+        # So với hạn chót đã hẹn (không so với env.now) để tránh sai số làm tròn
+        while self.deadlines and self.deadlines.peek()[0] <= limit:
+            _, item = self.deadlines.pop()
+            self.on_expire(item)
+        if self.deadlines and self._armed_at is None:
+            self._arm(self.deadlines.peek()[0])
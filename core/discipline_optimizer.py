@@ -0,0 +1,292 @@
+# core/discipline_optimizer.py
+"""
+TỐI ƯU TỔ HỢP KỶ LUẬT HÀNG ĐỢI (Discipline-Combination Optimizer)
+
+Với 3 kỷ luật (FCFS/SJF/ROS) và 4 quầy có 3^4 = 81 tổ hợp. Thay vì chạy
+brute-force mọi tổ hợp với cùng số replications, module này dùng thủ tục
+RANKING-AND-SELECTION của Kim & Nelson (KN, 2001):
+
+1. Chạy n0 replications cho MỌI tổ hợp (cùng seed ở replication r →
+   common random numbers, phương sai của hiệu số nhỏ hơn nhiều)
+2. Ước lượng phương sai hiệu số S²_il cho từng cặp tổ hợp
+3. Sau mỗi vòng, loại tổ hợp i nếu tồn tại tổ hợp l với
+       mean_i(r) > mean_l(r) + W_il(r),
+       W_il(r) = max(0, δ/(2r) · (h²·S²_il/δ² − r))
+   (bài toán cực tiểu hóa mục tiêu)
+4. Chỉ chạy thêm replications cho các tổ hợp còn sống sót
+5. Dừng khi còn 1 tổ hợp, hoặc hết ngân sách → chọn mean nhỏ nhất
+
+δ (indifference zone): Chênh lệch nhỏ nhất "đáng quan tâm" giữa hai tổ hợp.
+
+Mục tiêu hỗ trợ (càng nhỏ càng tốt):
+- 'system_time': Thời gian trung bình trong hệ thống
+- 'p95_wait': Phân vị 95% thời gian chờ tại quầy
+- 'balking_rate': Tỷ lệ khách bỏ về do hết chỗ K
+"""
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from core.queue_system_factory import QueueSystemFactory
+from core.replication_runner import config_to_namespace, replication_seeds
+from core.parameter_sweep import init_sweep_worker, run_sweep_task, set_config_value
+
+# Ánh xạ tên mục tiêu → tên chỉ số trong Analysis.summary()
+OBJECTIVES = {
+    'system_time': 'avg_system_time',
+    'p95_wait': 'p95_wait_time',
+    'balking_rate': 'balking_rate',
+}
+
+# Kỷ luật thử mặc định: 3 kỷ luật gốc (3^4 = 81 tổ hợp). Các kỷ luật đăng ký
+# thêm (LCFS, PRIORITY, AGED_SJF...) được thử khi truyền qua disciplines=...
+DEFAULT_DISCIPLINES = ('FCFS', 'SJF', 'ROS')
+
+# Thứ tự các biến khi sinh file config
+CONFIG_KEY_ORDER = [
+    'RANDOM_SEED', 'UNTIL_TIME', 'ARRIVAL_RATES', 'DEFAULT_PATIENCE_TIME',
+    'CUSTOMER_TYPE_DISTRIBUTION', 'PATIENCE_TIME_FACTORS', 'ERRATIC_DELAY_AMOUNT',
+    'DEFAULT_SERVICE_TIMES', 'STATIONS', 'PROB_MATRICES',
+]
+
+
+def _format_value(value, level=0):
+    """Định dạng giá trị config: dict xuống dòng từng khóa (thụt lề 4 dấu cách)."""
+    if not isinstance(value, dict) or not value:
+        return repr(value)
+    indent = '    ' * (level + 1)
+    items = [f"{indent}{key!r}: {_format_value(item, level + 1)}"
+             for key, item in value.items()]
+    return "{\n" + ",\n".join(items) + "\n" + '    ' * level + "}"
+
+
+def write_config_module(config, path, description):
+    """
+    Ghi một config (namespace) ra file .py có cùng định dạng với configs/*.py.
+
+    Args:
+        config: Namespace config
+        path: Đường dẫn file đích
+        description: Mô tả ngắn đặt trong docstring của file
+    """
+    path = Path(path)
+    names = [n for n in CONFIG_KEY_ORDER if hasattr(config, n)]
+    names += sorted(n for n in vars(config) if n.isupper() and n not in names)
+
+    lines = [
+        f"# configs/{path.name}",
+        "",
+        '"""',
+        f"File cấu hình: {description}",
+        '"""',
+        "",
+    ]
+    for name in names:
+        lines.append(f"{name} = {_format_value(getattr(config, name))}")
+        lines.append("")
+
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+class DisciplineOptimizer:
+    """
+    Tìm tổ hợp kỷ luật tốt nhất cho các quầy bằng thủ tục KN
+    (loại bỏ sớm các tổ hợp kém rõ rệt).
+    """
+    def __init__(self, config_module, objective='system_time', disciplines=None,
+                 n0=5, max_replications=50, delta=None, alpha=0.05,
+                 max_workers=None, until_time=None):
+        """
+        Args:
+            config_module: Config gốc (arrival rates, servers, K...)
+            objective: 'system_time' | 'p95_wait' | 'balking_rate'
+            disciplines: Các kỷ luật được thử (mặc định: DEFAULT_DISCIPLINES)
+            n0: Số replications ban đầu cho mọi tổ hợp (>= 2)
+            max_replications: Ngân sách tối đa replications cho 1 tổ hợp
+            delta: Indifference zone (đơn vị của mục tiêu).
+                   None → 1% giá trị trung bình tốt nhất sau n0 replications
+            alpha: 1 - xác suất chọn đúng (PCS)
+            max_workers: Số process (None = tất cả CPU)
+            until_time: Ghi đè UNTIL_TIME
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Mục tiêu không hỗ trợ: {objective}. "
+                             f"Chọn một trong {list(OBJECTIVES)}")
+        if n0 < 2:
+            raise ValueError("n0 phải >= 2 để ước lượng phương sai")
+
+        self.config = config_to_namespace(config_module)
+        self.objective = objective
+        self.metric = OBJECTIVES[objective]
+        self.disciplines = tuple(disciplines or DEFAULT_DISCIPLINES)
+        for discipline in self.disciplines:
+            QueueSystemFactory.model_class(discipline)   # ValueError nếu chưa đăng ký
+        self.n0 = n0
+        self.max_replications = max(max_replications, n0)
+        self.delta = delta
+        self.alpha = alpha
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.until_time = until_time
+
+        self.station_names = list(self.config.STATIONS.keys())
+        # Mỗi tổ hợp: tuple kỷ luật theo thứ tự self.station_names
+        self.combinations = list(itertools.product(
+            self.disciplines, repeat=len(self.station_names)
+        ))
+        self.seeds = replication_seeds(
+            getattr(self.config, 'RANDOM_SEED', 42), self.max_replications
+        )
+
+        # --- Kết quả ---
+        # observations[i][r]: giá trị mục tiêu của tổ hợp i ở replication r
+        self.observations = [[] for _ in self.combinations]
+        self.survivors = list(range(len(self.combinations)))
+        self.eliminated_at = {}   # {combo_index: số replications khi bị loại}
+        self.best_index = None
+
+    def _overrides(self, combo):
+        """Các giá trị ghi đè discipline cho 1 tổ hợp."""
+        return {
+            f'STATIONS.{station}.discipline': discipline
+            for station, discipline in zip(self.station_names, combo)
+        }
+
+    def _evaluate(self, executor, indices, replications):
+        """Chạy các replications (theo chỉ số) cho những tổ hợp được chỉ định."""
+        tasks = [
+            (i, r, self.seeds[r], self._overrides(self.combinations[i]), self.until_time)
+            for i in indices
+            for r in replications
+        ]
+        if executor is None:
+            rows = map(run_sweep_task, tasks)
+        else:
+            chunksize = max(1, len(tasks) // (self.max_workers * 4))
+            rows = executor.map(run_sweep_task, tasks, chunksize=chunksize)
+
+        # executor.map giữ nguyên thứ tự task → append theo đúng thứ tự r
+        for row in rows:
+            self.observations[row['point_id']].append(row[self.metric])
+
+    def _h_squared(self, k):
+        """Hằng số h² của thủ tục KN cho k tổ hợp."""
+        if k < 2:
+            return 0.0
+        eta = 0.5 * ((2 * self.alpha / (k - 1)) ** (-2.0 / (self.n0 - 1)) - 1)
+        return 2 * eta * (self.n0 - 1)
+
+    def run(self):
+        """
+        Chạy thủ tục chọn lọc.
+
+        Returns:
+            Tuple kỷ luật tốt nhất theo thứ tự quầy
+        """
+        executor = None
+        if self.max_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                           initializer=init_sweep_worker,
+                                           initargs=(self.config,))
+        else:
+            init_sweep_worker(self.config)
+
+        try:
+            # ========== GIAI ĐOẠN 1: n0 replications cho mọi tổ hợp ==========
+            self._evaluate(executor, self.survivors, range(self.n0))
+
+            k = len(self.combinations)
+            first = np.array([obs[:self.n0] for obs in self.observations])
+            # S²_il: Phương sai mẫu của hiệu số (ma trận k x k)
+            diffs = first[:, None, :] - first[None, :, :]
+            s2 = diffs.var(axis=2, ddof=1)
+
+            if self.delta is None:
+                best_mean = first.mean(axis=1).min()
+                self.delta = max(abs(best_mean) * 0.01, 1e-9)
+            h2 = self._h_squared(k)
+
+            # ========== GIAI ĐOẠN 2: Loại dần các tổ hợp kém ==========
+            r = self.n0
+            while True:
+                self._screen(r, s2, h2)
+                if len(self.survivors) == 1 or r >= self.max_replications:
+                    break
+                if not self._has_open_pairs(r, s2, h2):
+                    break  # Mọi cặp còn lại đã hết vùng tiếp tục (W = 0)
+
+                # Mỗi vòng thêm đủ replications để giữ các worker bận
+                step = max(1, math.ceil(self.max_workers / len(self.survivors)))
+                step = min(step, self.max_replications - r)
+                self._evaluate(executor, self.survivors, range(r, r + step))
+                r += step
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        means = {i: np.mean(self.observations[i]) for i in self.survivors}
+        self.best_index = min(means, key=means.get)
+        return self.combinations[self.best_index]
+
+    def _screen(self, r, s2, h2):
+        """Loại các tổ hợp thua rõ rệt một tổ hợp khác sau r replications."""
+        idx = np.array(self.survivors)
+        means = np.array([np.mean(self.observations[i][:r]) for i in idx])
+        w = np.maximum(0.0, self.delta / (2 * r) * (h2 * s2[np.ix_(idx, idx)] / self.delta**2 - r))
+        # losing[a, b] = True nếu a thua b (mean_a > mean_b + W_ab)
+        losing = means[:, None] > means[None, :] + w
+        np.fill_diagonal(losing, False)
+        keep = ~losing.any(axis=1)
+
+        for i, alive in zip(idx, keep):
+            if not alive:
+                self.eliminated_at[int(i)] = r
+        self.survivors = [int(i) for i, alive in zip(idx, keep) if alive]
+
+    def _has_open_pairs(self, r, s2, h2):
+        """Còn cặp tổ hợp nào có W > 0 (chưa phân định được) không."""
+        idx = np.array(self.survivors)
+        w = self.delta / (2 * r) * (h2 * s2[np.ix_(idx, idx)] / self.delta**2 - r)
+        np.fill_diagonal(w, 0.0)
+        return bool((w > 0).any())
+
+    def best_config(self):
+        """Namespace config gốc với kỷ luật của tổ hợp tốt nhất."""
+        config = config_to_namespace(self.config)
+        for path, value in self._overrides(self.combinations[self.best_index]).items():
+            set_config_value(config, path, value)
+        return config
+
+    def write_best_config(self, path):
+        """Sinh file configs/*.py cho tổ hợp tốt nhất."""
+        combo = ", ".join(f"{s}={d}" for s, d in
+                          zip(self.station_names, self.combinations[self.best_index]))
+        write_config_module(
+            self.best_config(), path,
+            f"Tổ hợp tối ưu theo '{self.objective}' (sinh tự động bởi "
+            f"core/discipline_optimizer.py)\n{combo}",
+        )
+
+    def print_report(self, top=10):
+        """In bảng xếp hạng các tổ hợp (sống sót trước, theo mean)."""
+        total_runs = sum(len(obs) for obs in self.observations)
+        print(f"--- TOI UU KY LUAT ({self.objective}) ---")
+        print(f"So to hop: {len(self.combinations)}, tong so lan chay: {total_runs}, "
+              f"delta: {self.delta:.4g}")
+
+        ranking = sorted(
+            range(len(self.combinations)),
+            key=lambda i: (i not in self.survivors, np.mean(self.observations[i])),
+        )
+        header = "  ".join(f"{s:<8}" for s in self.station_names)
+        print(f"  {header}  {'Mean':>10}  {'Reps':>5}  Trang thai")
+        for i in ranking[:top]:
+            combo = "  ".join(f"{d:<8}" for d in self.combinations[i])
+            status = ("TOT NHAT" if i == self.best_index else
+                      "song sot" if i in self.survivors else
+                      f"loai o r={self.eliminated_at[i]}")
+            print(f"  {combo}  {np.mean(self.observations[i]):>10.4f}  "
+                  f"{len(self.observations[i]):>5}  {status}")
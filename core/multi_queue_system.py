@@ -0,0 +1,178 @@
+# core/multi_queue_system.py
+"""
+LỜI GIẢI GIẢI TÍCH XẤP XỈ CHO MẠNG NHIỀU QUẦY
+
+Ghép các quầy M/M/c/K (TheoreticalCalculator) theo PROB_MATRICES của config
+thành một mạng hàng đợi và giải bằng lặp điểm bất động. Dùng để ước lượng
+nhanh một config mà không cần mô phỏng, và để loại trước các điểm đã bão
+hòa khi quét tham số (prescreen_filter).
+"""
+import numpy as np
+
+from core.parameter_sweep import set_config_value
+from core.replication_runner import config_to_namespace
+from core.theoretical_calculator import MMCK_METRICS, mmck
+from classes.routing import redistribution_distribution
+
+
+class MultiQueueSystem:
+    """
+    Mô phỏng hệ thống đa hàng đợi[cite: 86] - lời giải giải tích xấp xỉ.
+
+    Xem mỗi quầy là một M/M/c/K, nối với nhau bởi PROB_MATRICES:
+    - 'initial': Cổng g (tốc độ lambda_g) chọn quầy đầu tiên
+    - 'next_action': Sau khi phục vụ, 'More' với xác suất m
+    - 'transition': Chọn quầy kế tiếp
+    Quầy đầy → xác suất được chia lại (redistribution_distribution); tất cả
+    đầy → balking. Giả thiết các quầy đầy độc lập với xác suất B_s = P_K.
+
+    LUỒNG (lặp điểm bất động có giảm chấn):
+    1. Với B hiện tại: phân phối vào quầy của từng cổng và của 'transition'
+    2. Phương trình lưu lượng → tốc độ được nhận lambda_s của mỗi quầy
+    3. Tốc độ đến đề nghị lambda_s / (1 - B_s) → M/M/c/K → B mới
+    4. B = (1 - damping) * B + damping * B_mới, lặp tới khi hội tụ
+
+    Xấp xỉ: không mô hình reneging, ràng buộc không quay lại quầy của khách
+    indulgent và độ trễ erratic; service time trung bình lấy từ
+    DEFAULT_SERVICE_TIMES (như mô phỏng), nhân (1 + tỷ lệ indulgent).
+    """
+    def __init__(self, config, damping=0.5, tolerance=1e-9, max_iterations=500):
+        self.config = config
+        self.damping = damping
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+        self.stations = list(config.STATIONS)
+        index = {st: i for i, st in enumerate(self.stations)}
+        n = len(self.stations)
+
+        # Mọi tập quầy đầy (bitmask) → ma trận bool (2^n x n)
+        self._full_masks = np.array(
+            [[(mask >> i) & 1 for i in range(n)] for mask in range(1 << n)], dtype=bool
+        )
+
+        def compile_map(prob_map):
+            # Ma trận (2^n x (n + 1)): phân phối quầy được nhận + balking theo tập đầy
+            table = np.zeros((1 << n, n + 1))
+            for mask, row in enumerate(self._full_masks):
+                full = {self.stations[i] for i in range(n) if row[i]}
+                admitted, balk = redistribution_distribution(prob_map, full)
+                for st, prob in admitted.items():
+                    table[mask, index[st]] = prob
+                table[mask, n] = balk
+            return table
+
+        matrices = config.PROB_MATRICES
+        self.gate_rates = np.array([float(r) for r in config.ARRIVAL_RATES.values()])
+        self._gate_tables = [compile_map(matrices['initial'][g]) for g in config.ARRIVAL_RATES]
+        self._transition_table = compile_map(matrices['transition'])
+        self.more_probability = matrices['next_action'].get('More', 0.0)
+
+        indulgent = getattr(config, 'CUSTOMER_TYPE_DISTRIBUTION', {}).get('indulgent', 0.0)
+        service_times = getattr(config, 'DEFAULT_SERVICE_TIMES', {})
+        self.service_times = np.array([
+            service_times.get(st, cfg['avg_service_time']) * (1 + indulgent)
+            for st, cfg in config.STATIONS.items()
+        ])
+        self.servers = np.array([cfg['servers'] for cfg in config.STATIONS.values()])
+        self.capacities = np.array([cfg['capacity_K'] for cfg in config.STATIONS.values()])
+
+        # --- Kết quả ---
+        self.converged = False
+        self.iterations = 0
+        self.results = {}
+
+    def _routing(self, table, blocking):
+        """Phân phối (quầy được nhận..., balking) với xác suất đầy blocking."""
+        weights = np.prod(np.where(self._full_masks, blocking, 1.0 - blocking), axis=1)
+        return weights @ table
+
+    def solve(self):
+        """
+        Giải mạng hàng đợi.
+
+        Returns:
+            Dict kết quả (cũng lưu ở self.results), xem summary()
+        """
+        n = len(self.stations)
+        blocking = np.zeros(n)
+        m = self.more_probability
+        for self.iterations in range(1, self.max_iterations + 1):
+            # ========== BƯỚC 1: Định tuyến với B hiện tại ==========
+            gate_routes = [self._routing(t, blocking) for t in self._gate_tables]
+            transition = self._routing(self._transition_table, blocking)
+
+            # ========== BƯỚC 2: Phương trình lưu lượng ==========
+            # lambda = a + m * Lambda * T, với Lambda = tổng lambda (T không phụ thuộc quầy đi)
+            external = sum(rate * route[:n] for rate, route in zip(self.gate_rates, gate_routes))
+            feedback = m * transition[:n].sum()
+            total = external.sum() / (1.0 - feedback) if feedback < 1.0 else np.inf
+            admitted = external + m * total * transition[:n]
+
+            # ========== BƯỚC 3: B mới từ M/M/c/K ==========
+            offered = admitted / np.maximum(1.0 - blocking, 1e-12)
+            station = mmck(offered, self.servers, self.capacities, self.service_times)
+
+            # ========== BƯỚC 4: Giảm chấn và kiểm tra hội tụ ==========
+            new_blocking = station['blocking_probability']
+            change = np.max(np.abs(new_blocking - blocking))
+            blocking = (1.0 - self.damping) * blocking + self.damping * new_blocking
+            if change < self.tolerance:
+                self.converged = True
+                break
+
+        entry_balk = sum(rate * route[n] for rate, route in zip(self.gate_rates, gate_routes))
+        balked = entry_balk + m * total * transition[n]
+        arrivals = self.gate_rates.sum()
+        entering = arrivals - entry_balk
+
+        self.results = {
+            'arrival_rate': dict(zip(self.stations, admitted.tolist())),
+            'offered_rate': dict(zip(self.stations, offered.tolist())),
+            'station': {
+                st: {name: float(station[name][i]) for name in MMCK_METRICS}
+                for i, st in enumerate(self.stations)
+            },
+            'balking_rate': float(balked / arrivals) if arrivals else 0.0,
+            # Little: thời gian trung bình trong hệ thống của khách đã vào
+            'avg_system_time': float(station['L'].sum() / entering) if entering > 0 else 0.0,
+        }
+        return self.results
+
+    def summary(self):
+        """Kết quả dạng dict phẳng, cùng tên khóa với Analysis.summary()."""
+        if not self.results:
+            self.solve()
+        result = {
+            'balking_rate': self.results['balking_rate'],
+            'avg_system_time': self.results['avg_system_time'],
+        }
+        for st, metrics in self.results['station'].items():
+            result[f'arrival_rate.{st}'] = self.results['arrival_rate'][st]
+            result[f'avg_wait_time.{st}'] = metrics['Wq']
+            result[f'blocking_probability.{st}'] = metrics['blocking_probability']
+            result[f'mean_in_system.{st}'] = metrics['L']
+            result[f'mean_queue_length.{st}'] = metrics['Lq']
+            result[f'utilization.{st}'] = metrics['utilization']
+        return result
+
+    def is_saturated(self, max_utilization=0.99, max_balking_rate=0.5):
+        """True nếu có quầy gần bão hòa hoặc tỷ lệ balking quá cao."""
+        summary = self.summary()
+        if summary['balking_rate'] > max_balking_rate:
+            return True
+        return any(summary[f'utilization.{st}'] > max_utilization for st in self.stations)
+
+
+def prescreen_filter(base_config, max_utilization=0.99, max_balking_rate=0.5):
+    """
+    Tạo point_filter cho ParameterSweep: loại trước các điểm mà lời giải
+    giải tích MultiQueueSystem cho thấy đã bão hòa (không cần mô phỏng).
+    """
+    def keep(overrides):
+        config = config_to_namespace(base_config)
+        for path, value in overrides.items():
+            set_config_value(config, path, value)
+        return not MultiQueueSystem(config).is_saturated(max_utilization, max_balking_rate)
+
+    return keep
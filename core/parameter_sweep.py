@@ -0,0 +1,254 @@
+# core/parameter_sweep.py
+"""
+QUÉT THAM SỐ THEO LƯỚI (Grid Parameter Sweep)
+
+Thay vì copy thủ công một file trong configs/ rồi sửa ARRIVAL_RATES hoặc
+STATIONS[*]['servers'|'capacity_K'], module này nhận một config gốc và các
+trục (axes) tham số, sinh tích Descartes của các trục, chạy mọi điểm song song
+và ghi ra MỘT bảng kết quả (CSV/Parquet): mỗi dòng = 1 điểm x 1 replication.
+
+CÚ PHÁP TRỤC (axis path): Đường dẫn phân tách bằng dấu chấm vào config
+- 'ARRIVAL_RATES.0'           → ARRIVAL_RATES[0]
+- 'STATIONS.Meat.servers'     → STATIONS['Meat']['servers']
+- 'STATIONS.*.capacity_K'     → capacity_K của TẤT CẢ quầy
+Trên dòng lệnh: 'ARRIVAL_RATES.0=6:30:2' (khoảng, gồm cả đầu mút)
+hoặc 'STATIONS.Meat.discipline=FCFS,SJF' (liệt kê).
+
+HIỆU NĂNG:
+- Config gốc được gửi sang mỗi worker MỘT lần (initializer), mỗi task chỉ
+  mang theo các giá trị ghi đè + SeedSequence → không exec lại file config
+- Worker process được tái sử dụng cho nhiều điểm (ProcessPoolExecutor)
+- Replication thứ r dùng cùng SeedSequence con ở mọi điểm (common random numbers)
+"""
+import copy
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from core.replication_runner import config_to_namespace, replication_seeds, run_replication
+
+# Config gốc trong mỗi worker process (gán bởi init_sweep_worker)
+_BASE_CONFIG = None
+
+
+def parse_value(text):
+    """Chuyển chuỗi sang int/float nếu được, ngược lại giữ nguyên chuỗi."""
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_axis(spec):
+    """
+    Đọc một trục từ chuỗi dòng lệnh.
+
+    'PATH=start:stop[:step]' → khoảng số (gồm cả stop)
+    'PATH=v1,v2,...'         → danh sách giá trị
+
+    Returns:
+        Tuple (path, list_values)
+    """
+    if '=' not in spec:
+        raise ValueError(f"Trục không hợp lệ (thiếu '='): {spec}")
+    path, values_text = spec.split('=', 1)
+
+    if ':' in values_text:
+        parts = [parse_value(p) for p in values_text.split(':')]
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Khoảng không hợp lệ: {values_text}")
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) == 3 else 1
+        if step <= 0:
+            raise ValueError(f"Bước nhảy phải dương: {values_text}")
+        # Sai số nhỏ để gồm cả stop khi step là số thực
+        count = int((stop - start) / step + 1e-9) + 1
+        values = [start + i * step for i in range(count)]
+        if any(isinstance(v, float) for v in (start, stop, step)):
+            values = [round(v, 10) for v in values]
+        return path.strip(), values
+
+    return path.strip(), [parse_value(v.strip()) for v in values_text.split(',')]
+
+
+def set_config_value(config, path, value):
+    """
+    Gán value vào config theo đường dẫn dạng 'ATTR.key.subkey'.
+    Khóa '*' áp dụng cho mọi khóa ở cấp đó; khóa số được ép về int nếu
+    dict dùng khóa int (ví dụ ARRIVAL_RATES).
+    """
+    parts = path.split('.')
+    attr = parts[0]
+    if len(parts) == 1:
+        setattr(config, attr, value)
+        return
+
+    targets = [getattr(config, attr)]
+    for key in parts[1:-1]:
+        targets = [child for target in targets for child in _resolve_keys(target, key)]
+
+    last = parts[-1]
+    for target in targets:
+        if last == '*':
+            for k in target:
+                target[k] = value
+        else:
+            target[_match_key(target, last)] = value
+
+
+def _resolve_keys(mapping, key):
+    """Trả về các giá trị con tương ứng với key (hỗ trợ '*')."""
+    if key == '*':
+        return list(mapping.values())
+    return [mapping[_match_key(mapping, key)]]
+
+
+def _match_key(mapping, key):
+    """Tìm khóa thực trong dict (khóa trong path luôn là chuỗi)."""
+    if key in mapping:
+        return key
+    converted = parse_value(key)
+    if converted in mapping:
+        return converted
+    raise KeyError(f"Không tìm thấy khóa '{key}' trong config")
+
+
+def init_sweep_worker(base_config):
+    """Chạy một lần khi worker khởi động: lưu config gốc."""
+    global _BASE_CONFIG
+    _BASE_CONFIG = base_config
+
+
+def run_sweep_task(task):
+    """
+    Chạy 1 điểm x 1 replication trong worker.
+    task = (point_id, replication, seed, overrides, until_time), seed là SeedSequence
+    của replication (cột 'replication' đủ để tái lập cùng RANDOM_SEED gốc).
+    """
+    point_id, replication, seed, overrides, until_time = task
+    config = copy.deepcopy(_BASE_CONFIG)
+    for path, value in overrides.items():
+        set_config_value(config, path, value)
+
+    row = {'point_id': point_id, 'replication': replication}
+    row.update(overrides)
+    row.update(run_replication(config, seed, until_time))
+    return row
+
+
+class ParameterSweep:
+    """
+    Quét lưới tham số trên một config gốc.
+    """
+    def __init__(self, config_module, axes, num_replications=1,
+                 max_workers=None, until_time=None, point_filter=None):
+        """
+        Args:
+            config_module: Config gốc (module hoặc namespace)
+            axes: Dict {path: list_values}, ví dụ
+                  {'ARRIVAL_RATES.0': range(6, 31, 2), 'STATIONS.Meat.servers': range(3, 11)}
+            num_replications: Số replications cho mỗi điểm
+            max_workers: Số process (None = tất cả CPU)
+            until_time: Ghi đè UNTIL_TIME (None = dùng của config)
+            point_filter: Hàm f(overrides) -> bool, chỉ giữ các điểm trả về True
+                          (None = giữ toàn bộ tích Descartes)
+        """
+        self.config = config_to_namespace(config_module)
+        self.axes = {path: list(values) for path, values in axes.items()}
+        self.num_replications = num_replications
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.until_time = until_time
+        self.point_filter = point_filter
+
+        self.seeds = replication_seeds(
+            getattr(self.config, 'RANDOM_SEED', 42), num_replications
+        )
+        self.rows = []
+
+    def points(self):
+        """Tích Descartes của các trục (qua point_filter nếu có) → list dict {path: value}."""
+        paths = list(self.axes.keys())
+        points = [dict(zip(paths, combo))
+                  for combo in itertools.product(*self.axes.values())]
+        if self.point_filter is not None:
+            points = [p for p in points if self.point_filter(p)]
+        return points
+
+    def tasks(self):
+        """Sinh các task (point_id, replication, seed, overrides, until_time)."""
+        for point_id, overrides in enumerate(self.points()):
+            for replication, seed in enumerate(self.seeds):
+                yield (point_id, replication, seed, overrides, self.until_time)
+
+    def run(self, output_path=None):
+        """
+        Chạy toàn bộ lưới. Nếu output_path là file .csv, kết quả được ghi dần
+        (an toàn khi chạy qua đêm); .parquet được ghi một lần khi xong.
+
+        Returns:
+            List các dòng kết quả (dict)
+        """
+        tasks = list(self.tasks())
+        self.rows = []
+
+        writer = None
+        csv_file = None
+        if output_path is not None and Path(output_path).suffix == '.csv':
+            csv_file = open(output_path, 'w', newline='')
+
+        try:
+            for row in self._execute(tasks):
+                self.rows.append(row)
+                if csv_file is not None:
+                    if writer is None:
+                        writer = csv.DictWriter(csv_file, fieldnames=list(row.keys()),
+                                                restval='')
+                        writer.writeheader()
+                    writer.writerow(row)
+        finally:
+            if csv_file is not None:
+                csv_file.close()
+
+        if output_path is not None and csv_file is None:
+            self.write(output_path)
+        return self.rows
+
+    def _execute(self, tasks):
+        """Thực thi các task, tuần tự hoặc qua ProcessPoolExecutor."""
+        if self.max_workers == 1:
+            init_sweep_worker(self.config)
+            for task in tasks:
+                yield run_sweep_task(task)
+            return
+
+        # chunksize: gom nhiều task vào 1 lần gửi để giảm chi phí IPC
+        chunksize = max(1, len(tasks) // (self.max_workers * 8))
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 initializer=init_sweep_worker,
+                                 initargs=(self.config,)) as executor:
+            yield from executor.map(run_sweep_task, tasks, chunksize=chunksize)
+
+    def write(self, output_path):
+        """Ghi bảng kết quả ra CSV hoặc Parquet (cần pandas + pyarrow)."""
+        output_path = Path(output_path)
+        if output_path.suffix == '.parquet':
+            try:
+                import pandas as pd
+            except ImportError as e:
+                raise ImportError("Ghi Parquet cần cài pandas và pyarrow") from e
+            pd.DataFrame(self.rows).to_parquet(output_path, index=False)
+            return
+
+        fieldnames = []
+        for row in self.rows:
+            for name in row:
+                if name not in fieldnames:
+                    fieldnames.append(name)
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, restval='')
+            writer.writeheader()
+            writer.writerows(self.rows)
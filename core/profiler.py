@@ -0,0 +1,224 @@
+# core/profiler.py
+"""
+PROFILE MÔ PHỎNG (--profile)
+
+Chạy mô phỏng dưới cProfile và chia thời gian chạy (self time, không tính
+trùng) theo THÀNH PHẦN của mô hình:
+- Sinh khách đến (arrival_source, new_customer, phát lại log)
+- Định tuyến (Router, _select_station_with_capacity, quyết định lấy thêm/ra về)
+- Hành trình khách (customer_lifecycle)
+- Quầy K / balking (FoodStation.visit/leave)
+- Kỷ luật hàng đợi: lõi điều phối chung (admit, dispatch, start_service,
+  _end_service, hạn chót kiên nhẫn, hàng đợi ưu tiên) và phần riêng của từng
+  model (models/*.py)
+- Ghi nhận Analysis, ghi vết, vòng lặp sự kiện SimPy, số ngẫu nhiên
+Hàm built-in (len, dict.get...) được tính cho thành phần của hàm gọi nó.
+
+Kèm theo: số sự kiện đã xử lý, sự kiện / phút mô phỏng, sự kiện / giây
+(wall time khi có profiler, chậm hơn chạy thường). Kết quả ghi được ra file
+.prof (pstats: snakeviz, gprof2dot, flameprof...) và gộp được giữa các
+worker process (SimulationProfile.merge, ReplicationRunner(profile=True)).
+"""
+import cProfile
+import pstats
+import time
+
+# Tên các thành phần (theo thứ tự in báo cáo)
+COMPONENT_LABELS = {
+    'arrivals': 'Sinh khach den',
+    'routing': 'Dinh tuyen',
+    'lifecycle': 'Hanh trinh khach (SimPy process)',
+    'station': 'Quay K / balking',
+    'discipline': 'Ky luat hang doi (loi dieu phoi)',
+    'analysis': 'Ghi nhan Analysis',
+    'trace': 'Ghi vet',
+    'engine': 'Vong lap su kien',
+    'random': 'So ngau nhien',
+    'other': 'Khac',
+}
+
+# (phần cuối đường dẫn file, {tên hàm: thành phần}, thành phần mặc định của file)
+COMPONENT_RULES = [
+    ('classes/buffet_system.py', {
+        'choose_initial_section': 'routing',
+        'choose_next_action': 'routing',
+        '_select_station_with_capacity': 'routing',
+        '_record_balking_for_stations': 'routing',
+        'customer_lifecycle': 'lifecycle',
+        'batch_clock': 'engine',
+        'run': 'engine',
+        'run_sequential': 'engine',
+        'close_level_trackers': 'engine',
+        'close_trace': 'trace',
+    }, 'arrivals'),
+    ('classes/arrival_source.py', {}, 'arrivals'),
+    ('classes/customer.py', {}, 'arrivals'),
+    ('classes/routing.py', {}, 'routing'),
+    ('core/theoretical_calculator.py', {}, 'routing'),
+    ('classes/food_station.py', {}, 'station'),
+    ('core/base_queue_system.py', {}, 'discipline'),
+    ('core/wait_queues.py', {}, 'discipline'),
+    ('core/deadline_timer.py', {}, 'discipline'),
+    ('classes/analysis.py', {}, 'analysis'),
+    ('core/statistics.py', {}, 'analysis'),
+    ('core/trace_recorder.py', {}, 'trace'),
+    ('simpy/', {}, 'engine'),
+    ('core/random_streams.py', {}, 'random'),
+    ('/random.py', {}, 'random'),
+    ('numpy/random/', {}, 'random'),
+]
+
+# Hàm built-in thuộc hẳn một thành phần (còn lại: tính cho hàm gọi)
+BUILTIN_COMPONENTS = {
+    "of '_random.Random' objects": 'random',
+    'numpy.random.': 'random',
+}
+
+
+def _normalize(filename):
+    return filename.replace('\\', '/')
+
+
+def component_of(func):
+    """
+    Thành phần của một hàm trong pstats (filename, lineno, funcname);
+    None nếu là built-in không thuộc thành phần nào (tính cho hàm gọi).
+    """
+    filename, _, funcname = func
+    filename = _normalize(filename)
+    if filename == '~':
+        for marker, component in BUILTIN_COMPONENTS.items():
+            if marker in funcname:
+                return component
+        return None
+    if '/models/' in filename:
+        # Phần riêng của từng kỷ luật, ví dụ 'discipline.sjf'
+        return 'discipline.' + filename.rsplit('/', 1)[-1][:-len('.py')]
+    for suffix, functions, default in COMPONENT_RULES:
+        if suffix in filename:
+            return functions.get(funcname, default)
+    return 'other'
+
+
+class _RawStats:
+    """Bọc dict stats của cProfile để pstats.Stats đọc (giao diện create_stats)."""
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class SimulationProfile:
+    """
+    Kết quả profile của một hoặc nhiều lần chạy (pickle được → gửi từ worker về).
+    """
+    def __init__(self, stats=None, wall_time=0.0, simulated_time=0.0, events=0, runs=0):
+        self.stats = stats or {}            # Dict stats thô của cProfile
+        self.wall_time = wall_time          # Tổng wall time các lần chạy (giây)
+        self.simulated_time = simulated_time  # Tổng thời gian mô phỏng (phút)
+        self.events = events                # Tổng số sự kiện đã xử lý
+        self.runs = runs
+
+    @classmethod
+    def capture(cls, buffet, until_time):
+        """Chạy buffet.run(until_time) dưới cProfile."""
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            buffet.run(until_time=until_time, verbose=False)
+        finally:
+            profiler.disable()
+        wall_time = time.perf_counter() - start
+        profiler.create_stats()
+
+        # Mỗi lần Environment.step xử lý một sự kiện
+        events = sum(
+            stat[1] for func, stat in profiler.stats.items()
+            if func[2] == 'step' and _normalize(func[0]).endswith('simpy/core.py')
+        )
+        return cls(profiler.stats, wall_time, buffet.analyzer.simulated_time, events, 1)
+
+    def to_pstats(self):
+        """pstats.Stats của profile (sắp xếp, in, dump_stats)."""
+        return pstats.Stats(_RawStats(dict(self.stats)))
+
+    def merge(self, other):
+        """Gộp profile của lần chạy khác (ví dụ từ worker process khác)."""
+        if other.stats:
+            if self.stats:
+                combined = self.to_pstats()
+                combined.add(_RawStats(dict(other.stats)))
+                self.stats = combined.stats
+            else:
+                self.stats = dict(other.stats)
+        self.wall_time += other.wall_time
+        self.simulated_time += other.simulated_time
+        self.events += other.events
+        self.runs += other.runs
+        return self
+
+    def dump(self, path):
+        """Ghi file .prof (định dạng pstats/cProfile)."""
+        self.to_pstats().dump_stats(path)
+
+    def component_times(self):
+        """
+        Self time theo thành phần (giây).
+
+        Returns:
+            Dict {thành phần: giây}, giảm dần
+        """
+        times = {}
+        for func, (_, _, tottime, _, callers) in self.stats.items():
+            component = component_of(func)
+            if component is not None:
+                times[component] = times.get(component, 0.0) + tottime
+                continue
+            # Built-in: chia theo thời gian trong từng hàm gọi
+            attributed = 0.0
+            for caller, caller_stat in callers.items():
+                caller_component = component_of(caller) or 'other'
+                times[caller_component] = times.get(caller_component, 0.0) + caller_stat[2]
+                attributed += caller_stat[2]
+            if tottime > attributed:
+                times['other'] = times.get('other', 0.0) + tottime - attributed
+        return dict(sorted(times.items(), key=lambda item: -item[1]))
+
+    def summary(self):
+        """Các chỉ số tổng hợp (dict phẳng)."""
+        return {
+            'runs': self.runs,
+            'wall_time': self.wall_time,
+            'simulated_time': self.simulated_time,
+            'events': self.events,
+            'events_per_simulated_minute': self.events / self.simulated_time if self.simulated_time else 0.0,
+            'events_per_wall_second': self.events / self.wall_time if self.wall_time else 0.0,
+        }
+
+    def print_report(self, top=15):
+        """In báo cáo: chỉ số tổng hợp, thời gian theo thành phần, top hàm theo self time."""
+        summary = self.summary()
+        print(f"--- PROFILE ({self.runs} lan chay) ---")
+        print(f"Wall time (co cProfile)       : {summary['wall_time']:.3f} s")
+        print(f"Thoi gian mo phong            : {summary['simulated_time']:.1f} phut")
+        print(f"So su kien da xu ly           : {summary['events']}")
+        print(f"Su kien / phut mo phong       : {summary['events_per_simulated_minute']:.1f}")
+        print(f"Su kien / giay (wall)         : {summary['events_per_wall_second']:.0f}")
+
+        times = self.component_times()
+        total = sum(times.values()) or 1.0
+        print(f"\n{'Thanh phan':<36} {'Self time (s)':>14} {'%':>8}")
+        for component, seconds in times.items():
+            if seconds / total < 0.0005:
+                continue    # Không đáng kể (< 0.05%)
+            if component.startswith('discipline.'):
+                label = f"Ky luat - models/{component.split('.', 1)[1]}.py"
+            else:
+                label = COMPONENT_LABELS.get(component, component)
+            print(f"{label:<36} {seconds:>14.3f} {seconds / total:>8.1%}")
+
+        if top:
+            print(f"\nTop {top} ham theo self time:")
+            self.to_pstats().sort_stats('tottime').print_stats(top)
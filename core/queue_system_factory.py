@@ -1,37 +1,54 @@
 # core/queue_system_factory.py
 import simpy
 from classes.analysis import Analysis
+from core.base_queue_system import QUEUE_DISCIPLINES
 
-# Import các mô hình cụ thể
+# Import các mô hình cụ thể (mỗi module tự đăng ký kỷ luật của nó bằng @register_discipline)
 from models.fcfs import FCFSModel
 from models.sjf import SJFModel
 from models.ros import ROSModel
+from models.lcfs import LCFSModel
+from models.priority import PriorityByTypeModel
+from models.aged_sjf import AgedSJFModel
 # from models.dynamic_server import DynamicServerModel # (Sẽ thêm sau)
 
 class QueueSystemFactory:
     """
     Sử dụng Factory Pattern  để tạo các đối tượng mô hình hàng đợi
     dựa trên cấu hình.
+
+    Kỷ luật được tra theo tên trong QUEUE_DISCIPLINES. Thêm kỷ luật mới:
+    viết lớp model (thường chỉ cần priority_key, xem PriorityQueueSystem) và
+    đánh dấu @register_discipline('TÊN') → config dùng được 'discipline': 'TÊN'.
     """
-    def create_queue_model(self, env: simpy.Environment, config: dict, 
-                             analyzer: Analysis, station_name: str):
-        
-        discipline = config['discipline']
+    # Các kỷ luật có sẵn (đã đăng ký khi import factory)
+    DISCIPLINES = tuple(QUEUE_DISCIPLINES)
+
+    @staticmethod
+    def model_class(discipline):
+        """Lớp model của kỷ luật (ValueError nếu chưa đăng ký)."""
+        try:
+            return QUEUE_DISCIPLINES[discipline]
+        except KeyError:
+            raise ValueError(
+                f"Kỷ luật hàng đợi không xác định: {discipline}. "
+                f"Chọn một trong {list(QUEUE_DISCIPLINES)}"
+            ) from None
+
+    def create_queue_model(self, env: simpy.Environment, config: dict,
+                             analyzer: Analysis, station_name: str, streams=None,
+                             erratic_delay=0.2, station_index=0):
+        """
+        streams: RandomStreams cấp luồng ngẫu nhiên riêng cho quầy
+        (None → dùng module random toàn cục).
+        erratic_delay: ERRATIC_DELAY_AMOUNT của config đang chạy.
+        station_index: Chỉ số của quầy trong customer.service_times.
+        """
+
+        model_class = self.model_class(config['discipline'])
         num_servers = config['servers']
         avg_service_time = config['avg_service_time']
-        
+
         common_args = (env, num_servers, avg_service_time, analyzer, station_name)
-        
-        if discipline == 'FCFS':
-            return FCFSModel(*common_args)
-        
-        elif discipline == 'SJF':
-            return SJFModel(*common_args)
-        
-        elif discipline == 'ROS':
-            return ROSModel(*common_args)
-        
-        # Thêm các mô hình khác ở đây...
-        
-        else:
-            raise ValueError(f"Kỷ luật hàng đợi không xác định: {discipline}")
\ No newline at end of file
+        return model_class(*common_args, streams=streams, erratic_delay=erratic_delay,
+                           station_index=station_index)
@@ -0,0 +1,93 @@
+# core/random_streams.py
+"""
+CÁC LUỒNG SỐ NGẪU NHIÊN ĐỘC LẬP (Random Streams)
+
+Trước đây mọi thành phần (sinh khách, định tuyến, service time từng quầy,
+chọn khách của ROS) đều rút từ MỘT luồng random toàn cục. Đổi kỷ luật của
+một quầy (ví dụ FCFS → SJF) làm lệch toàn bộ các số ngẫu nhiên phía sau,
+nên hai kịch bản không dùng chung được số ngẫu nhiên (common random numbers).
+
+RandomStreams cấp một luồng riêng cho mỗi mục đích, sinh từ numpy SeedSequence:
+- 'arrivals.<gate>':      Khoảng cách giữa hai lần đến của từng cổng
+- 'attributes':           Loại khách, service time riêng của khách
+- 'routing':              Chọn quầy, quyết định lấy thêm/ra về
+- 'service.<station>':    Service time thực tế tại từng quầy
+- 'ros.<station>':        Chọn khách ngẫu nhiên của ROS
+
+Mỗi luồng được định danh bằng TÊN (không theo thứ tự tạo), nên thêm/bớt một
+luồng không làm thay đổi các luồng còn lại. spawn(n) sinh n bộ luồng con độc
+lập thống kê cho n replications song song.
+"""
+import random
+import zlib
+
+import numpy as np
+
+# Phần tử đánh dấu trong spawn_key, tách luồng theo tên khỏi các luồng con của spawn()
+_NAMED_STREAM_TAG = 0x5354
+
+
+class RandomStreams:
+    """
+    Bộ luồng số ngẫu nhiên theo tên, tất định theo seed gốc.
+    """
+    def __init__(self, seed=42):
+        """
+        Args:
+            seed: Seed gốc (int) hoặc numpy.random.SeedSequence
+        """
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+        self._streams = {}
+        self._generators = {}
+
+    def seed_sequence_for(self, name):
+        """SeedSequence của luồng có tên name (chỉ phụ thuộc seed gốc và tên)."""
+        root = self.seed_sequence
+        key = zlib.crc32(name.encode('utf-8'))
+        return np.random.SeedSequence(
+            entropy=root.entropy,
+            spawn_key=root.spawn_key + (_NAMED_STREAM_TAG, key),
+        )
+
+    def stream(self, name):
+        """
+        random.Random của luồng name (cùng API với module random:
+        expovariate, uniform, choices, randrange...).
+        """
+        rng = self._streams.get(name)
+        if rng is None:
+            words = self.seed_sequence_for(name).generate_state(4)
+            rng = random.Random(sum(int(w) << (32 * i) for i, w in enumerate(words)))
+            self._streams[name] = rng
+        return rng
+
+    def generator(self, name):
+        """numpy.random.Generator của luồng name (dùng để sinh theo khối)."""
+        rng = self._generators.get(name)
+        if rng is None:
+            rng = np.random.default_rng(self.seed_sequence_for(name))
+            self._generators[name] = rng
+        return rng
+
+    def spawn(self, n):
+        """Sinh n bộ luồng con độc lập (mỗi replication một bộ)."""
+        return [RandomStreams(child) for child in self.seed_sequence.spawn(n)]
+
+    # --- Các luồng theo mục đích ---
+    def arrivals(self, gate_id):
+        return self.stream(f'arrivals.{gate_id}')
+
+    def attributes(self):
+        return self.stream('attributes')
+
+    def routing(self):
+        return self.stream('routing')
+
+    def service(self, station_name):
+        return self.stream(f'service.{station_name}')
+
+    def ros(self, station_name):
+        return self.stream(f'ros.{station_name}')
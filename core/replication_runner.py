@@ -0,0 +1,208 @@
+# core/replication_runner.py
+"""
+CHẠY NHIỀU LẦN LẶP ĐỘC LẬP (Independent Replications) SONG SONG
+
+Một lần chạy mô phỏng chỉ cho MỘT mẫu ngẫu nhiên của mỗi chỉ số.
+Module này chạy N replications của cùng một config, mỗi replication dùng
+một seed riêng (sinh tất định từ RANDOM_SEED), phân phối lên nhiều process
+bằng ProcessPoolExecutor, sau đó gộp kết quả và tính:
+- Trung bình (mean), độ lệch chuẩn (std-dev)
+- Khoảng tin cậy 95% (theo phân phối Student t)
+
+LUỒNG HOẠT ĐỘNG:
+1. Chuyển config module thành namespace có thể pickle (gửi sang worker)
+2. Sinh N SeedSequence con độc lập từ RANDOM_SEED (numpy SeedSequence.spawn)
+3. Mỗi worker dựng RandomStreams từ SeedSequence của mình và chạy 1
+   BuffetSystem (Analysis chế độ streaming, bộ nhớ không phụ thuộc số khách)
+   → trả về Analysis.summary() + Analysis
+4. Gộp các summary → mean / std / CI cho từng chỉ số
+5. Gộp các Analysis (merge) → phân vị p50/p90/p99 trên toàn bộ replications
+6. (TRACE_PATH) Mỗi replication ghi vết ra file riêng theo số thứ tự replication
+7. (profile=True) Mỗi worker chạy dưới cProfile → gộp SimulationProfile
+"""
+import copy
+import os
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import simpy
+
+from classes.analysis import Analysis
+from classes.buffet_system import BuffetSystem
+from core.profiler import SimulationProfile
+from core.random_streams import RandomStreams
+from core.statistics import confidence_interval
+from core.trace_recorder import replication_trace_path
+
+
+def config_to_namespace(config_module, **overrides):
+    """
+    Sao chép các biến cấu hình (tên viết HOA) của config module sang một
+    SimpleNamespace độc lập.
+
+    Module được load bằng importlib không pickle được, còn namespace thì có,
+    nên có thể gửi thẳng sang worker process mà không cần exec lại file config.
+
+    Args:
+        config_module: Module config (hoặc namespace) đã được load
+        **overrides: Các giá trị ghi đè, ví dụ RANDOM_SEED=7
+    """
+    values = {
+        name: copy.deepcopy(getattr(config_module, name))
+        for name in dir(config_module)
+        if name.isupper()
+    }
+    values.update(overrides)
+    return types.SimpleNamespace(**values)
+
+
+def replication_seeds(base_seed, num_replications):
+    """
+    Sinh danh sách SeedSequence con cho từng replication, tất định theo base_seed.
+    SeedSequence.spawn đảm bảo các luồng con độc lập thống kê với nhau; worker
+    nhận nguyên SeedSequence (không rút gọn về một số nguyên 32 bit).
+    """
+    return [streams.seed_sequence for streams in RandomStreams(base_seed).spawn(num_replications)]
+
+
+def run_replication(config, seed, until_time=None, return_analyzer=False, replication=0,
+                    profile=False):
+    """
+    Chạy 1 replication (hàm cấp module để ProcessPoolExecutor pickle được).
+    seed: SeedSequence của replication (từ replication_seeds) hoặc seed int.
+    replication: Số thứ tự replication (đặt tên file vết khi config có TRACE_PATH).
+
+    Returns:
+        Dict chỉ số phẳng từ Analysis.summary(), hoặc tuple (summary, analyzer)
+        nếu return_analyzer=True; profile=True → chạy dưới cProfile và trả
+        tuple (summary, analyzer, SimulationProfile)
+    """
+    trace_path = getattr(config, 'TRACE_PATH', None)
+    if trace_path:
+        # Các worker song song không dùng chung một file vết
+        config = config_to_namespace(
+            config, TRACE_PATH=str(replication_trace_path(trace_path, replication)))
+    if until_time is None:
+        until_time = config.UNTIL_TIME
+
+    env = simpy.Environment()
+    analyzer = Analysis(streaming=True)
+    buffet = BuffetSystem(env, analyzer, config, streams=RandomStreams(seed))
+    if profile:
+        run_profile = SimulationProfile.capture(buffet, until_time)
+    else:
+        buffet.run(until_time=until_time, verbose=False)
+
+    analyzer.calculate_statistics()
+    if profile:
+        return analyzer.summary(), analyzer, run_profile
+    if return_analyzer:
+        return analyzer.summary(), analyzer
+    return analyzer.summary()
+
+
+class ReplicationRunner:
+    """
+    Chạy N replications độc lập của một config và tổng hợp kết quả.
+    """
+    def __init__(self, config_module, num_replications=30, max_workers=None,
+                 until_time=None, confidence=0.95, profile=False):
+        self.config = config_to_namespace(config_module)
+        self.num_replications = num_replications
+        # max_workers=None → dùng tất cả CPU
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.until_time = until_time
+        self.confidence = confidence
+        self.profile = profile   # True → profile mọi replication (xem core/profiler.py)
+
+        self.seeds = replication_seeds(
+            getattr(self.config, 'RANDOM_SEED', 42), num_replications
+        )
+
+        # --- Kết quả ---
+        self.replications = []   # List các dict summary (1 dict / replication)
+        self.statistics = {}     # {metric: {'mean', 'std', 'half_width', ...}}
+        self.pooled = None       # Analysis gộp của mọi replications
+        self.profiler = None     # SimulationProfile gộp (profile=True)
+
+    def run(self):
+        """Chạy tất cả replications (song song nếu max_workers > 1)."""
+        n = len(self.seeds)
+        args = ([self.config] * n, self.seeds, [self.until_time] * n, [True] * n, range(n),
+                [self.profile] * n)
+        if self.max_workers == 1:
+            results = list(map(run_replication, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(run_replication, *args))
+
+        self.replications = [result[0] for result in results]
+        self.pooled = Analysis(streaming=True)
+        for result in results:
+            self.pooled.merge(result[1])
+        if self.profile:
+            self.profiler = SimulationProfile()
+            for result in results:
+                self.profiler.merge(result[2])
+        self.pooled.calculate_statistics()
+        self.calculate_statistics()
+        return self.statistics
+
+    def calculate_statistics(self):
+        """Gộp kết quả các replications: mean, std-dev và khoảng tin cậy."""
+        metrics = []
+        for summary in self.replications:
+            for name in summary:
+                if name not in metrics:
+                    metrics.append(name)
+
+        self.statistics = {
+            name: confidence_interval(
+                [summary[name] for summary in self.replications if name in summary],
+                self.confidence,
+            )
+            for name in metrics
+        }
+        return self.statistics
+
+    def print_report(self):
+        """In bảng tổng hợp các chỉ số chính kèm khoảng tin cậy."""
+        level = int(round(self.confidence * 100))
+        print(f"--- BAO CAO {self.num_replications} REPLICATIONS "
+              f"(CI {level}%) ---")
+        print(f"{'Chi so':<36} {'Mean':>10} {'Std':>10} {'CI':>24}")
+
+        def line(name, label, percent=False):
+            stat = self.statistics.get(name)
+            if stat is None:
+                return
+            fmt = (lambda v: f"{v:.4%}") if percent else (lambda v: f"{v:.4f}")
+            ci = f"[{fmt(stat['ci_low'])}, {fmt(stat['ci_high'])}]"
+            print(f"{label:<36} {fmt(stat['mean']):>10} {fmt(stat['std']):>10} {ci:>24}")
+
+        line('avg_system_time', 'Thoi gian trong he thong')
+        if getattr(self.config, 'WARMUP_BATCH_WIDTH', None):
+            line('warmup_time', 'Diem cat warm-up (MSER)')
+            line('warmup_fraction', 'Ty le thoi gian warm-up da bo', percent=True)
+        if getattr(self.config, 'TARGET_PRECISION', None):
+            line('simulated_time', 'Thoi gian mo phong da dung')
+        for station in self.config.STATIONS:
+            line(f'avg_wait_time.{station}', f'Thoi gian cho - {station}')
+        for station in self.config.STATIONS:
+            line(f'blocking_probability.{station}', f'Balking - {station}', percent=True)
+        for station in self.config.STATIONS:
+            line(f'reneging_probability.{station}', f'Reneging - {station}', percent=True)
+        for station in self.config.STATIONS:
+            line(f'mean_in_system.{station}', f'L (so khach) - {station}')
+        for station in self.config.STATIONS:
+            line(f'mean_queue_length.{station}', f'Lq (hang cho) - {station}')
+        for station in self.config.STATIONS:
+            line(f'utilization.{station}', f'Utilization - {station}', percent=True)
+
+        if self.pooled is not None:
+            print("\nPhan vi (gop moi replications):")
+            values = self.pooled.system_time_percentiles
+            print(f"  {'He thong':<10}: " + "  ".join(f"p{p}={v:.4f}" for p, v in values.items()))
+            for station in self.config.STATIONS:
+                values = self.pooled.wait_percentiles_per_station.get(station, {})
+                print(f"  {station:<10}: " + "  ".join(f"p{p}={v:.4f}" for p, v in values.items()))
@@ -0,0 +1,301 @@
+# core/statistics.py
+"""
+CÁC HÀM THỐNG KÊ DÙNG CHUNG
+
+Tập hợp các công cụ thống kê nhỏ (không phụ thuộc scipy) để đánh giá
+kết quả mô phỏng:
+- t_critical: Giá trị tới hạn của phân phối Student t (cho khoảng tin cậy)
+- confidence_interval: Trung bình, độ lệch chuẩn và khoảng tin cậy của một mẫu
+- RunningStats: Mean/variance/min/max dạng dòng (Welford), gộp được
+- QuantileSketch: Sketch phân vị (histogram logarit), gộp được
+- TimeWeightedStat: Trung bình theo thời gian của một mức (số khách, server bận)
+- mser_truncation: Điểm cắt bỏ giai đoạn khởi động (warm-up) theo MSER
+"""
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+
+def t_critical(df, confidence=0.95):
+    """
+    Giá trị tới hạn hai phía t_{1-alpha/2, df} của phân phối Student t.
+
+    - df = 1, 2: Dùng công thức đóng (chính xác)
+    - df >= 3: Khai triển Cornish-Fisher quanh phân vị chuẩn (sai số < 1%)
+
+    Args:
+        df: Số bậc tự do (>= 1)
+        confidence: Mức tin cậy (ví dụ 0.95)
+    """
+    if df < 1:
+        return float('nan')
+    p = 0.5 + confidence / 2.0
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+
+    z = NormalDist().inv_cdf(p)
+    v = float(df)
+    return (z
+            + (z**3 + z) / (4 * v)
+            + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * v**2)
+            + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * v**3)
+            + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / (92160 * v**4))
+
+
+def confidence_interval(values, confidence=0.95):
+    """
+    Tính trung bình, độ lệch chuẩn mẫu và khoảng tin cậy (theo phân phối t).
+
+    Returns:
+        Dict {'n', 'mean', 'std', 'half_width', 'ci_low', 'ci_high'}.
+        Với n < 2, half_width = nan (không đủ dữ liệu để ước lượng phương sai).
+    """
+    n = len(values)
+    if n == 0:
+        nan = float('nan')
+        return {'n': 0, 'mean': nan, 'std': nan, 'half_width': nan,
+                'ci_low': nan, 'ci_high': nan}
+
+    mean = math.fsum(values) / n
+    if n > 1:
+        std = math.sqrt(math.fsum((x - mean) ** 2 for x in values) / (n - 1))
+        half_width = t_critical(n - 1, confidence) * std / math.sqrt(n)
+    else:
+        std = float('nan')
+        half_width = float('nan')
+
+    return {
+        'n': n,
+        'mean': mean,
+        'std': std,
+        'half_width': half_width,
+        'ci_low': mean - half_width,
+        'ci_high': mean + half_width,
+    }
+
+
+class RunningStats:
+    """
+    Bộ tích lũy thống kê dạng dòng (streaming) theo thuật toán Welford.
+
+    Bộ nhớ O(1) bất kể số mẫu: chỉ lưu count, mean, M2 (tổng bình phương
+    độ lệch), min, max. Gộp được (merge) giữa nhiều replications/process
+    theo công thức song song của Chan et al.
+    """
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        """Thêm một mẫu."""
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def merge(self, other):
+        """Gộp một RunningStats khác vào (tại chỗ)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Phương sai mẫu (chia n - 1)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        """Độ lệch chuẩn mẫu."""
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """
+    Sketch phân vị gộp được, kiểu histogram logarit (giống DDSketch/HDR).
+
+    Mỗi giá trị x > 0 rơi vào bucket i = ceil(log(x) / log(gamma)) với
+    gamma = (1 + a) / (1 - a). Phân vị ước lượng có sai số TƯƠNG ĐỐI <= a
+    (mặc định 1%). Số bucket chỉ phụ thuộc khoảng giá trị (log), không phụ
+    thuộc số mẫu → bộ nhớ gần như hằng số. Gộp hai sketch = cộng số đếm.
+
+    Giá trị <= min_value (ví dụ wait time = 0 khi được phục vụ ngay)
+    được đếm riêng trong zero_count.
+    """
+    __slots__ = ('relative_accuracy', 'gamma', '_inv_log_gamma', 'min_value',
+                 'buckets', 'zero_count', 'count', 'max')
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._inv_log_gamma = 1.0 / math.log(self.gamma)
+        self.min_value = min_value
+        self.buckets = {}        # {bucket_index: count}
+        self.zero_count = 0
+        self.count = 0
+        self.max = 0.0           # Giá trị lớn nhất (chặn trên cho ước lượng)
+
+    def add(self, x):
+        """Thêm một mẫu."""
+        self.count += 1
+        if x > self.max:
+            self.max = x
+        if x <= self.min_value:
+            self.zero_count += 1
+            return
+        i = math.ceil(math.log(x) * self._inv_log_gamma)
+        buckets = self.buckets
+        buckets[i] = buckets.get(i, 0) + 1
+
+    def merge(self, other):
+        """Gộp một sketch khác (cùng relative_accuracy) vào (tại chỗ)."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Không thể gộp sketch có độ chính xác khác nhau")
+        for i, c in other.buckets.items():
+            self.buckets[i] = self.buckets.get(i, 0) + c
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Ước lượng phân vị q (0 <= q <= 1). Trả về 0.0 khi chưa có mẫu."""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if rank < seen:
+                # Trung điểm (theo sai số tương đối) của bucket (gamma^(i-1), gamma^i]
+                return min(2.0 * self.gamma ** i / (self.gamma + 1), self.max)
+        return self.max
+
+
+class TimeWeightedStat:
+    """
+    Thống kê theo thời gian (time-weighted) của một đại lượng dạng bậc thang,
+    ví dụ số khách đang chiếm chỗ K tại quầy hoặc số server đang bận.
+
+    Chỉ cập nhật khi mức thay đổi (O(1), không cần process polling):
+    tích phân area += level * (now - last_time) và cộng dồn thời gian ở mỗi
+    mức (time-in-state histogram). Gộp được giữa các replications.
+    """
+    __slots__ = ('level', 'start_time', 'last_time', 'area', 'time_in_state')
+
+    def __init__(self, level=0, start_time=0.0):
+        self.level = level
+        self.start_time = start_time
+        self.last_time = start_time
+        self.area = 0.0
+        self.time_in_state = {}  # {level: tổng thời gian ở mức đó}
+
+    def update(self, now, level):
+        """Ghi nhận mức mới tại thời điểm now."""
+        dt = now - self.last_time
+        if dt > 0:
+            self.area += self.level * dt
+            tis = self.time_in_state
+            tis[self.level] = tis.get(self.level, 0.0) + dt
+            self.last_time = now
+        self.level = level
+
+    def add(self, now, delta):
+        """Tăng/giảm mức hiện tại một lượng delta tại thời điểm now."""
+        # Như update(now, level + delta), viết liền (gọi mỗi lần vào/ra quầy)
+        level = self.level
+        dt = now - self.last_time
+        if dt > 0:
+            self.area += level * dt
+            tis = self.time_in_state
+            tis[level] = tis.get(level, 0.0) + dt
+            self.last_time = now
+        self.level = level + delta
+
+    def close(self, now):
+        """Chốt khoảng thời gian đang dở tới now (gọi khi kết thúc mô phỏng)."""
+        self.update(now, self.level)
+
+    @property
+    def duration(self):
+        """Tổng thời gian đã quan sát."""
+        return self.last_time - self.start_time
+
+    @property
+    def mean(self):
+        """Trung bình theo thời gian (cần close() trước để tính tới cuối)."""
+        return self.area / self.duration if self.duration > 0 else 0.0
+
+    def histogram(self):
+        """Tỷ lệ thời gian ở mỗi mức {level: fraction}, sắp theo level."""
+        total = self.duration
+        if total <= 0:
+            return {}
+        return {level: t / total for level, t in sorted(self.time_in_state.items())}
+
+    def merge(self, other):
+        """Gộp thống kê của một khoảng quan sát khác (tại chỗ)."""
+        self.area += other.area
+        for level, t in other.time_in_state.items():
+            self.time_in_state[level] = self.time_in_state.get(level, 0.0) + t
+        # Nối tiếp khoảng thời gian để duration = tổng hai khoảng
+        self.last_time += other.duration
+        return self
+
+
+def mser_truncation(batch_means, max_fraction=0.5):
+    """
+    Chọn điểm cắt warm-up theo quy tắc MSER (Marginal Standard Error Rule).
+
+    Với chuỗi trung bình batch x_1..x_n, MSER(d) = sum_{i>d} (x_i - mean_d)^2 / (n - d)^2
+    là bình phương sai số chuẩn của trung bình phần còn lại sau khi bỏ d batch
+    đầu. d* = argmin MSER(d), chỉ xét d <= max_fraction * n (nếu cực tiểu nằm
+    ở nửa sau thì chuỗi chưa ổn định, cắt nhiều hơn cũng không đáng tin).
+    MSER-5 là trường hợp mỗi batch gồm 5 quan sát.
+
+    Args:
+        batch_means: Chuỗi trung bình batch theo thứ tự thời gian
+        max_fraction: Tỷ lệ tối đa số batch được phép cắt bỏ
+
+    Returns:
+        Số batch cần bỏ ở đầu chuỗi (0 nếu chuỗi quá ngắn)
+    """
+    x = np.asarray(batch_means, dtype=float)
+    n = len(x)
+    if n < 4:
+        return 0
+
+    # Tổng và tổng bình phương của phần đuôi x[d:] cho mọi d (vector hóa)
+    tail_sum = np.cumsum(x[::-1])[::-1]
+    tail_sq = np.cumsum((x * x)[::-1])[::-1]
+    remaining = np.arange(n, 0, -1, dtype=float)
+    sse = np.maximum(tail_sq - tail_sum * tail_sum / remaining, 0.0)
+    mser = sse / remaining ** 2
+
+    limit = int(n * max_fraction)
+    return int(np.argmin(mser[:limit + 1]))
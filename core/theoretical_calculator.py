@@ -1,19 +1,165 @@
 # core/theoretical_calculator.py
+import numpy as np
+
+# Các chỉ số M/M/c/K được trả về (ngoài phân phối Pn)
+MMCK_METRICS = ('P0', 'blocking_probability', 'L', 'Lq', 'W', 'Wq',
+                'effective_arrival_rate', 'utilization')
+
+
+def log_factorial_table(n_max):
+    """Bảng log(n!) cho n = 0..n_max (cumsum của log k, không tràn số với n lớn)."""
+    table = np.zeros(n_max + 1)
+    if n_max > 0:
+        table[1:] = np.cumsum(np.log(np.arange(1, n_max + 1)))
+    return table
+
+
+def mmck(arrival_rate, servers, capacity_K, avg_service_time):
+    """
+    Trạng thái dừng của hàng đợi M/M/c/K, vector hóa trên mảng tham số.
+
+    Tính trong không gian log để ổn định với c, K lớn:
+        log p_n = n log a - log n!                      (n <= c)
+        log p_n = n log a - log c! - (n - c) log c      (c < n <= K)
+    với a = lambda * E[S]. Chuẩn hóa bằng logsumexp theo từng hàng.
+
+    Args:
+        arrival_rate, servers, capacity_K, avg_service_time: Số hoặc mảng cùng shape
+            (được broadcast). K < c được hiểu là c = K (không có chỗ xếp hàng).
+
+    Returns:
+        Dict {tên: mảng 1 chiều} cho MMCK_METRICS, cùng 'Pn' (ma trận
+        điểm x (K_max + 1), phần n > K bằng 0)
+    """
+    lam, c, K, s = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(arrival_rate, dtype=float)),
+        np.atleast_1d(np.asarray(servers, dtype=int)),
+        np.atleast_1d(np.asarray(capacity_K, dtype=int)),
+        np.atleast_1d(np.asarray(avg_service_time, dtype=float)),
+    )
+    c = np.minimum(c, K)
+    k_max = int(K.max())
+    log_fact = log_factorial_table(k_max)
+
+    # ========== BƯỚC 1: log p_n chưa chuẩn hóa (ma trận điểm x n) ==========
+    n = np.arange(k_max + 1)[None, :]
+    cc = c[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_a = np.log(lam * s)[:, None]
+        n_log_a = np.where(n == 0, 0.0, n * log_a)
+        log_p = np.where(
+            n <= cc,
+            n_log_a - log_fact[n],
+            n_log_a - log_fact[cc] - (n - cc) * np.log(np.maximum(cc, 1)),
+        )
+    log_p = np.where(n <= K[:, None], log_p, -np.inf)
+
+    # ========== BƯỚC 2: Chuẩn hóa (logsumexp) ==========
+    row_max = log_p.max(axis=1, keepdims=True)
+    p = np.exp(log_p - row_max)
+    p /= p.sum(axis=1, keepdims=True)
+
+    # ========== BƯỚC 3: Các chỉ số ==========
+    p_block = p[np.arange(len(K)), K]
+    L = p @ np.arange(k_max + 1)
+    busy = (p * np.minimum(n, cc)).sum(axis=1)
+    Lq = np.maximum(L - busy, 0.0)
+    lam_eff = lam * (1.0 - p_block)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        W = np.where(lam_eff > 0, L / lam_eff, s)
+        Wq = np.where(lam_eff > 0, Lq / lam_eff, 0.0)
+        utilization = np.where(c > 0, busy / c, 0.0)
+
+    return {
+        'P0': p[:, 0],
+        'Pn': p,
+        'blocking_probability': p_block,
+        'L': L,
+        'Lq': Lq,
+        'W': W,
+        'Wq': Wq,
+        'effective_arrival_rate': lam_eff,
+        'utilization': utilization,
+    }
+
+
 class TheoreticalCalculator:
-    """Tính toán các giá trị lý thuyết[cite: 84]."""
-    def __init__(self):
-        pass # Logic sẽ được thêm sau
-
-# core/validation_analyzer.py
-class ValidationAnalyzer:
-    """So sánh kết quả mô phỏng với lý thuyết[cite: 85]."""
-    def __init__(self, sim_analyzer, theo_calculator):
-        self.sim_analyzer = sim_analyzer
-        self.theo_calculator = theo_calculator
-        pass # Logic sẽ được thêm sau
-
-# core/multi_queue_system.py
-class MultiQueueSystem:
-    """Mô phỏng hệ thống đa hàng đợi[cite: 86]."""
+    """
+    Tính toán các giá trị lý thuyết[cite: 84].
+
+    Mỗi quầy được xem là một hàng đợi M/M/c/K độc lập:
+    c = STATIONS[*]['servers'], K = STATIONS[*]['capacity_K'],
+    E[S] = STATIONS[*]['avg_service_time'], lambda = tốc độ đến quầy.
+    Kết quả được nhớ (memoize) theo bộ tham số (lambda, c, K, E[S]).
+    """
     def __init__(self):
-        pass # Logic sẽ được thêm sau
\ No newline at end of file
+        self._cache = {}   # {(lambda, c, K, E[S]): {metric: float, 'Pn': list}}
+
+    def calculate(self, arrival_rate, servers, capacity_K, avg_service_time):
+        """
+        Chỉ số M/M/c/K cho một bộ tham số (có cache).
+
+        Returns:
+            Dict {metric: float} cho MMCK_METRICS và 'Pn' (list P0..PK)
+        """
+        key = (float(arrival_rate), int(servers), int(capacity_K), float(avg_service_time))
+        result = self._cache.get(key)
+        if result is None:
+            self.calculate_grid([key[0]], [key[1]], [key[2]], [key[3]])
+            result = self._cache[key]
+        return result
+
+    def calculate_grid(self, arrival_rates, servers, capacity_K, avg_service_times):
+        """
+        Chỉ số M/M/c/K cho cả lưới tham số (mảng cùng độ dài hoặc broadcast được).
+
+        Chỉ những bộ tham số chưa có trong cache mới được tính (một lần gọi
+        mmck vector hóa cho tất cả), sau đó lưu từng bộ vào cache.
+
+        Returns:
+            Dict {metric: mảng} theo thứ tự điểm đầu vào (không gồm 'Pn')
+        """
+        lam, c, K, s = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(arrival_rates, dtype=float)),
+            np.atleast_1d(np.asarray(servers, dtype=int)),
+            np.atleast_1d(np.asarray(capacity_K, dtype=int)),
+            np.atleast_1d(np.asarray(avg_service_times, dtype=float)),
+        )
+        keys = list(zip(lam.tolist(), c.tolist(), K.tolist(), s.tolist()))
+
+        missing = list(dict.fromkeys(k for k in keys if k not in self._cache))
+        if missing:
+            m_lam, m_c, m_K, m_s = zip(*missing)
+            computed = mmck(m_lam, m_c, m_K, m_s)
+            columns = {name: computed[name].tolist() for name in MMCK_METRICS}
+            for i, key in enumerate(missing):
+                result = {name: columns[name][i] for name in MMCK_METRICS}
+                result['Pn'] = computed['Pn'][i, :key[2] + 1].tolist()
+                self._cache[key] = result
+
+        return {
+            name: np.array([self._cache[k][name] for k in keys])
+            for name in MMCK_METRICS
+        }
+
+    def calculate_stations(self, stations, arrival_rates):
+        """
+        Chỉ số lý thuyết cho từng quầy trong config.
+
+        Args:
+            stations: Dict STATIONS của config
+            arrival_rates: {station_name: tốc độ khách đến quầy (khách/phút)}
+
+        Returns:
+            {station_name: {metric: float, 'Pn': list}}
+        """
+        return {
+            name: self.calculate(arrival_rates[name], cfg['servers'],
+                                 cfg['capacity_K'], cfg['avg_service_time'])
+            for name, cfg in stations.items()
+            if name in arrival_rates
+        }
+
+    def clear_cache(self):
+        """Xóa bộ nhớ đệm kết quả."""
+        self._cache.clear()
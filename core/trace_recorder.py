@@ -0,0 +1,220 @@
+# core/trace_recorder.py
+"""
+GHI VẾT SỰ KIỆN NHỊ PHÂN (Binary event trace)
+
+Khi một kết quả trông bất thường, Analysis.print_report chỉ cho số tổng hợp.
+TraceRecorder (bật khi cần, TRACE_PATH trong config hoặc --trace trên dòng
+lệnh) ghi MỌI sự kiện của khách thành bản ghi độ rộng cố định:
+
+    time (f8) | customer (i8) | gate (i2) | type (u1) | station (i2) | event (u1)
+
+- type: chỉ số loại khách trong CUSTOMER_TYPE_DISTRIBUTION
+- station: chỉ số quầy trong STATIONS (-1: không gắn với quầy, ví dụ lúc đến,
+  ra về, balking vì mọi quầy hợp lệ đều đầy)
+- event: mã sự kiện (EVENT_NAMES)
+
+Mỗi sự kiện chỉ nối 4 số (time, customer, station, event) vào bộ đệm phẳng;
+gate và type không đổi theo khách nên chỉ ghi MỘT lần lúc khách đến
+(record_arrival) vào bảng theo mã khách. Đủ chunk_size bản ghi → chuyển cả
+bộ đệm thành mảng một lần, điền vào chunk NumPy structured array cấp phát
+sẵn (gate/type tra từ bảng theo mã khách, vector hóa) và ghi nối vào file
+qua np.memmap. Khi kết thúc, file JSON đi kèm (<path>.json) lưu dtype, số
+bản ghi và bảng mã (sự kiện, loại khách, quầy). load_trace đọc lại bằng
+np.memmap (không sao chép).
+
+Nhiều replication chạy song song: mỗi replication ghi file riêng
+(replication_trace_path, chèn số thứ tự replication vào tên file).
+
+Khi tắt, mỗi điểm ghi vết chỉ tốn một phép so sánh: `if trace is not None`.
+"""
+import json
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+# Mã sự kiện (cột 'event')
+TRACE_ARRIVAL = 0         # Khách đến cổng
+TRACE_ATTEMPT = 1         # Khách tới một quầy
+TRACE_BALK = 2            # Bỏ về: quầy hết chỗ K (station >= 0) hoặc mọi quầy hợp lệ đều đầy (-1)
+TRACE_QUEUE = 3           # Vào quầy (chiếm 1 chỗ K), bắt đầu chờ server
+TRACE_SERVICE_START = 4   # Được giao server
+TRACE_SERVICE_END = 5     # Phục vụ xong
+TRACE_RENEGE = 6          # Hết kiên nhẫn, rời hàng
+TRACE_EXIT = 7            # Ra về sau khi phục vụ xong
+
+EVENT_NAMES = ('arrival', 'attempt', 'balk', 'queue', 'service_start',
+               'service_end', 'renege', 'exit')
+
+# Bản ghi độ rộng cố định (22 byte, không đệm)
+TRACE_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('customer', '<i8'),
+    ('gate', '<i2'),
+    ('type', 'u1'),
+    ('station', '<i2'),
+    ('event', 'u1'),
+])
+
+# Số bản ghi mỗi chunk (mặc định)
+DEFAULT_CHUNK_SIZE = 65536
+
+# Số cột trong bộ đệm phẳng của mỗi bản ghi: time, customer, station, event
+PENDING_FIELDS = 4
+
+# Mã của khách chưa ghi record_arrival (gate / type không biết)
+UNKNOWN_GATE = -1
+UNKNOWN_TYPE = 255
+
+
+class TraceRecorder:
+    """
+    Ghi vết sự kiện của một lần chạy mô phỏng ra file nhị phân.
+    """
+    def __init__(self, path, customer_types, station_names, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            path: File vết (ghi đè nếu đã có)
+            customer_types: Các loại khách theo thứ tự mã 'type'
+            station_names: Các quầy theo thứ tự mã 'station' (thứ tự STATIONS)
+            chunk_size: Số bản ghi mỗi chunk trước khi ghi ra file
+        """
+        self.path = Path(path)
+        self.customer_types = list(customer_types)
+        self.station_names = list(station_names)
+        self.chunk_size = chunk_size
+        self._type_codes = {name: i for i, name in enumerate(self.customer_types)}
+
+        self._chunk = np.empty(chunk_size, dtype=TRACE_DTYPE)   # Chunk cấp phát sẵn
+        # Bản ghi chưa chép vào chunk, nối phẳng (PENDING_FIELDS số/bản ghi):
+        # không tạo tuple cho mỗi sự kiện, GC không phải duyệt hàng chục nghìn
+        # đối tượng sống
+        self._pending = []
+        self._pending_limit = chunk_size * PENDING_FIELDS
+        # Gate / mã loại của từng khách, chỉ số = customer.id (mảng gọn, đọc
+        # không sao chép bằng np.frombuffer khi flush)
+        self._customer_gates = array('h')
+        self._customer_type_codes = array('B')
+        self.count = 0           # Số bản ghi đã ghi ra file
+        self.path.write_bytes(b'')
+
+    def record_arrival(self, time, customer):
+        """Khách đến cổng: lưu gate / loại của khách (một lần) và ghi sự kiện TRACE_ARRIVAL."""
+        gates = self._customer_gates
+        type_code = self._type_codes.get(customer.customer_type, UNKNOWN_TYPE)
+        if customer.id == len(gates):
+            gates.append(customer.arrival_gate)
+            self._customer_type_codes.append(type_code)
+        else:
+            # Mã khách không liên tiếp (BuffetSystem cấp mã 0, 1, 2... nên hiếm gặp)
+            self._reserve_customers(customer.id + 1)
+            gates[customer.id] = customer.arrival_gate
+            self._customer_type_codes[customer.id] = type_code
+        pending = self._pending
+        pending += (time, customer.id, -1, TRACE_ARRIVAL)
+        if len(pending) >= self._pending_limit:
+            self.flush()
+
+    def record(self, time, customer, station, event):
+        """Ghi một sự kiện của customer tại quầy station (-1 nếu không gắn quầy)."""
+        pending = self._pending
+        pending += (time, customer.id, station, event)
+        if len(pending) >= self._pending_limit:
+            self.flush()
+
+    def _reserve_customers(self, size):
+        """Mở rộng bảng gate / loại khách tới size mã (khách chưa biết: UNKNOWN_*)."""
+        missing = size - len(self._customer_gates)
+        if missing > 0:
+            self._customer_gates.extend([UNKNOWN_GATE] * missing)
+            self._customer_type_codes.extend([UNKNOWN_TYPE] * missing)
+
+    def flush(self):
+        """Chép các bản ghi đang chờ vào chunk và ghi nối vào file (np.memmap)."""
+        if not self._pending:
+            return
+        # Một lần chuyển list phẳng → mảng (n, PENDING_FIELDS), rồi điền từng cột của chunk
+        pending = self._pending
+        flat = np.fromiter(pending, dtype=np.float64, count=len(pending)).reshape(-1, PENDING_FIELDS)
+        pending.clear()
+        n = len(flat)
+        chunk = self._chunk[:n]
+        customers = flat[:, 1].astype(np.int64)
+        chunk['time'] = flat[:, 0]
+        chunk['customer'] = customers
+        chunk['station'] = flat[:, 2]
+        chunk['event'] = flat[:, 3]
+        self._reserve_customers(int(customers.max()) + 1)
+        chunk['gate'] = np.frombuffer(self._customer_gates, dtype=np.int16)[customers]
+        chunk['type'] = np.frombuffer(self._customer_type_codes, dtype=np.uint8)[customers]
+
+        offset = self.count * TRACE_DTYPE.itemsize
+        with open(self.path, 'r+b') as f:
+            f.truncate(offset + n * TRACE_DTYPE.itemsize)
+            mapped = np.memmap(f, dtype=TRACE_DTYPE, mode='r+', offset=offset, shape=(n,))
+            mapped[:] = chunk
+            mapped.flush()
+            del mapped
+        self.count += n
+
+    def close(self):
+        """Ghi nốt các bản ghi còn lại và file JSON mô tả đi kèm."""
+        self.flush()
+        meta = {
+            'dtype': TRACE_DTYPE.descr,
+            'count': self.count,
+            'events': list(EVENT_NAMES),
+            'customer_types': self.customer_types,
+            'stations': self.station_names,
+        }
+        sidecar_path(self.path).write_text(json.dumps(meta, indent=2), encoding='utf-8')
+
+
+def replication_trace_path(path, replication):
+    """
+    File vết riêng của một replication: chèn số thứ tự replication trước phần
+    mở rộng (trace.bin → trace.rep<replication>.bin) để các worker song song
+    không ghi đè nhau.
+    """
+    path = Path(path)
+    return path.with_name(f"{path.stem}.rep{replication}{path.suffix}")
+
+
+def sidecar_path(path):
+    """File JSON mô tả đi kèm file vết."""
+    path = Path(path)
+    return path.with_name(path.name + '.json')
+
+
+def load_trace(path, as_dataframe=False):
+    """
+    Đọc file vết.
+
+    Args:
+        path: File vết do TraceRecorder ghi
+        as_dataframe: True → pandas.DataFrame (cột event/type/station thành
+                      Categorical theo tên); False → np.memmap chỉ đọc (không sao chép)
+
+    Returns:
+        Tuple (trace, meta): meta là nội dung file JSON đi kèm
+    """
+    meta = json.loads(sidecar_path(path).read_text(encoding='utf-8'))
+    dtype = np.dtype([tuple(field) for field in meta['dtype']])
+    if meta['count']:
+        trace = np.memmap(path, dtype=dtype, mode='r', shape=(meta['count'],))
+    else:
+        trace = np.empty(0, dtype=dtype)
+    if not as_dataframe:
+        return trace, meta
+
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise ImportError("Đọc vết thành DataFrame cần cài pandas") from e
+    frame = pd.DataFrame({name: trace[name] for name in dtype.names}, copy=False)
+    frame['event'] = pd.Categorical.from_codes(frame['event'], meta['events'])
+    frame['type'] = pd.Categorical.from_codes(
+        frame['type'].where(frame['type'] < len(meta['customer_types']), -1).astype('int8'),
+        meta['customer_types'])
+    frame['station'] = pd.Categorical.from_codes(frame['station'], meta['stations'])
+    return frame, meta
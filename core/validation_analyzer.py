@@ -0,0 +1,183 @@
+# core/validation_analyzer.py
+"""
+KIỂM ĐỊNH MÔ PHỎNG VỚI LÝ THUYẾT M/M/c/K
+
+Chạy các config 1 quầy thỏa đúng giả thiết M/M/c/K và so sánh kết quả mô
+phỏng với lời giải giải tích của TheoreticalCalculator.
+"""
+import types
+
+from core.parameter_sweep import ParameterSweep
+from core.statistics import confidence_interval
+from core.theoretical_calculator import TheoreticalCalculator
+
+# Quầy duy nhất trong các config kiểm định
+VALIDATION_STATION = 'Meat'
+
+# {khóa trong Analysis.summary(): chỉ số lý thuyết M/M/c/K tương ứng}
+VALIDATION_METRICS = {
+    f'blocking_probability.{VALIDATION_STATION}': 'blocking_probability',
+    f'avg_wait_time.{VALIDATION_STATION}': 'Wq',
+    'avg_system_time': 'W',
+    f'mean_in_system.{VALIDATION_STATION}': 'L',
+    f'mean_queue_length.{VALIDATION_STATION}': 'Lq',
+    f'utilization.{VALIDATION_STATION}': 'utilization',
+}
+
+
+def validation_config(arrival_rate=10.0, servers=3, capacity_K=10, avg_service_time=0.25,
+                      until_time=1000.0, seed=42, warmup_batch_width=10.0):
+    """
+    Config 1 quầy đúng giả thiết M/M/c/K: 1 cổng Poisson, FCFS, chỉ khách
+    'normal', không reneging (kiên nhẫn vô hạn), service time thuần exponential
+    (SERVICE_TIME_SPREAD = 0), mỗi khách ghé đúng 1 quầy rồi về.
+    """
+    return types.SimpleNamespace(
+        RANDOM_SEED=seed,
+        UNTIL_TIME=until_time,
+        ARRIVAL_RATES={0: arrival_rate},
+        DEFAULT_PATIENCE_TIME=float('inf'),
+        CUSTOMER_TYPE_DISTRIBUTION={'normal': 1.0},
+        PATIENCE_TIME_FACTORS={'normal': 1.0},
+        ERRATIC_DELAY_AMOUNT=0.0,
+        DEFAULT_SERVICE_TIMES={VALIDATION_STATION: avg_service_time},
+        SERVICE_TIME_SPREAD=0.0,
+        STATIONS={
+            VALIDATION_STATION: {
+                'servers': servers,
+                'capacity_K': capacity_K,
+                'discipline': 'FCFS',
+                'avg_service_time': avg_service_time,
+            },
+        },
+        PROB_MATRICES={
+            'initial': {0: {VALIDATION_STATION: 1.0}},
+            'next_action': {'More': 0.0, 'Exit': 1.0},
+            'transition': {VALIDATION_STATION: 1.0},
+        },
+        WARMUP_BATCH_WIDTH=warmup_batch_width,
+    )
+
+
+class ValidationAnalyzer:
+    """
+    So sánh kết quả mô phỏng với lý thuyết[cite: 85].
+
+    - compare(): So sánh 1 Analysis (sim_analyzer) đã tính với M/M/c/K
+    - run_grid(): Chạy song song lưới (lambda, c, K) các config 1 quầy FCFS,
+      mỗi điểm nhiều replications → CI, và đánh dấu điểm có CI không phủ giá
+      trị lý thuyết. Dùng làm kiểm thử hồi quy khi tối ưu engine mô phỏng.
+
+    Với CI 95%, khoảng 5% (điểm x chỉ số) có thể bị đánh dấu do ngẫu nhiên;
+    tolerance nới CI thêm tolerance * |lý thuyết| + absolute_tolerance để giảm
+    báo động giả (kể cả khi CI suy biến, ví dụ xác suất chặn ~0).
+    """
+    def __init__(self, sim_analyzer=None, theo_calculator=None, confidence=0.95,
+                 tolerance=0.02, absolute_tolerance=1e-3):
+        self.sim_analyzer = sim_analyzer
+        self.theo_calculator = theo_calculator or TheoreticalCalculator()
+        self.confidence = confidence
+        self.tolerance = tolerance
+        self.absolute_tolerance = absolute_tolerance
+
+        # --- Kết quả run_grid ---
+        self.results = []    # 1 dict / (điểm, chỉ số)
+        self.failures = []   # Các dòng có CI không phủ lý thuyết
+
+    def compare(self, arrival_rate, servers, capacity_K, avg_service_time):
+        """
+        So sánh sim_analyzer (1 lần chạy config kiểm định, đã calculate_statistics)
+        với lý thuyết.
+
+        Returns:
+            {metric: {'simulated', 'theory', 'relative_error'}}
+        """
+        summary = self.sim_analyzer.summary()
+        theory = self.theo_calculator.calculate(arrival_rate, servers, capacity_K,
+                                                avg_service_time)
+        comparison = {}
+        for metric, theory_name in VALIDATION_METRICS.items():
+            simulated = summary.get(metric, float('nan'))
+            expected = theory[theory_name]
+            comparison[metric] = {
+                'simulated': simulated,
+                'theory': expected,
+                'relative_error': (abs(simulated - expected) / abs(expected)
+                                   if expected else abs(simulated)),
+            }
+        return comparison
+
+    def run_grid(self, arrival_rates, servers, capacities, avg_service_time=0.25,
+                 num_replications=10, max_workers=None, until_time=1000.0):
+        """
+        Chạy lưới kiểm định và so sánh với lý thuyết.
+
+        LUỒNG:
+        1. Sinh config kiểm định + trục quét (bỏ điểm K < c)
+        2. Chạy song song mọi điểm x replication (ParameterSweep)
+        3. Gom replications theo điểm → CI từng chỉ số
+        4. Tính lý thuyết cho toàn lưới (vector hóa) và đánh dấu điểm lệch
+
+        Returns:
+            List các dòng bị đánh dấu (self.failures)
+        """
+        # ========== BƯỚC 1-2: Chạy lưới ==========
+        config = validation_config(avg_service_time=avg_service_time, until_time=until_time)
+        rate_path = 'ARRIVAL_RATES.0'
+        servers_path = f'STATIONS.{VALIDATION_STATION}.servers'
+        capacity_path = f'STATIONS.{VALIDATION_STATION}.capacity_K'
+        sweep = ParameterSweep(
+            config,
+            {rate_path: arrival_rates, servers_path: servers, capacity_path: capacities},
+            num_replications=num_replications,
+            max_workers=max_workers,
+            until_time=until_time,
+            point_filter=lambda p: p[capacity_path] >= p[servers_path],
+        )
+        points = sweep.points()
+        rows = sweep.run()
+
+        # ========== BƯỚC 3: CI theo điểm ==========
+        rows_by_point = {}
+        for row in rows:
+            rows_by_point.setdefault(row['point_id'], []).append(row)
+
+        # ========== BƯỚC 4: So sánh với lý thuyết ==========
+        theory = self.theo_calculator.calculate_grid(
+            [p[rate_path] for p in points],
+            [p[servers_path] for p in points],
+            [p[capacity_path] for p in points],
+            avg_service_time,
+        )
+
+        self.results = []
+        for point_id, point in enumerate(points):
+            point_rows = rows_by_point.get(point_id, [])
+            for metric, theory_name in VALIDATION_METRICS.items():
+                expected = float(theory[theory_name][point_id])
+                interval = confidence_interval([r[metric] for r in point_rows], self.confidence)
+                slack = self.tolerance * abs(expected) + self.absolute_tolerance
+                self.results.append({
+                    'arrival_rate': point[rate_path],
+                    'servers': point[servers_path],
+                    'capacity_K': point[capacity_path],
+                    'metric': metric,
+                    'theory': expected,
+                    'mean': interval['mean'],
+                    'ci_low': interval['ci_low'],
+                    'ci_high': interval['ci_high'],
+                    'covered': interval['ci_low'] - slack <= expected <= interval['ci_high'] + slack,
+                })
+        self.failures = [r for r in self.results if not r['covered']]
+        return self.failures
+
+    def print_report(self):
+        """In tóm tắt kiểm định và các điểm bị đánh dấu."""
+        level = int(round(self.confidence * 100))
+        print(f"--- KIEM DINH MO PHONG vs M/M/c/K (CI {level}%) ---")
+        print(f"So (diem x chi so): {len(self.results)}, "
+              f"khong phu ly thuyet: {len(self.failures)}")
+        for r in self.failures:
+            print(f"  - lambda={r['arrival_rate']}, c={r['servers']}, K={r['capacity_K']} "
+                  f"{r['metric']:<30}: ly thuyet={r['theory']:.4f}  "
+                  f"CI=[{r['ci_low']:.4f}, {r['ci_high']:.4f}]")
@@ -0,0 +1,256 @@
+# core/wait_queues.py
+"""
+CẤU TRÚC DỮ LIỆU HÀNG ĐỢI CHO CÁC KỶ LUẬT THỦ CÔNG
+
+IndexedHeap: min-heap có HANDLE cho SJF
+- push trả về handle (giữ trong customer.queue_handle)
+- remove(handle): xóa khách reneging NGAY LẬP TỨC, O(log n)
+  (heapq thường chỉ bỏ qua khách đã rời hàng khi pop tới → heap phình to
+  dưới reneging nặng)
+- update(handle, key): tăng/giảm độ ưu tiên, O(log n)
+- So sánh theo (key, seq): seq là thứ tự vào hàng, không bao giờ so sánh
+  đối tượng Customer
+
+RandomBag: "túi" chọn ngẫu nhiên cho ROS
+- pop_random(rng): chọn đều một phần tử và xóa bằng swap-remove, O(1)
+  (list.pop(idx) ở vị trí ngẫu nhiên là O(n))
+- remove(handle): xóa khách reneging ngay lúc rời hàng, O(1)
+
+ShiftedPriorityQueue: hàng ưu tiên (SJF...) với độ trễ erratic tính lười
+- Độ ưu tiên thực = scale * (base + offset): offset là độ trễ erratic cộng
+  dồn chung của quầy, scale = 2 với 'indulgent'
+- scale = 0: độ ưu tiên cố định = base (không phụ thuộc offset: LCFS, theo loại khách)
+- Mỗi scale một IndexedHeap theo base → thứ tự trong từng heap không đổi khi
+  offset tăng; pop(offset) chỉ so sánh đỉnh các heap, O(log n)
+"""
+import itertools
+
+# Vị trí các trường trong một entry (handle) của IndexedHeap
+_KEY, _SEQ, _ITEM, _POS = 0, 1, 2, 3
+# Vị trí các trường trong một handle của RandomBag
+_BAG_ITEM, _BAG_POS = 0, 1
+
+
+class IndexedHeap:
+    """
+    Min-heap nhị phân theo (key, seq), mỗi phần tử có handle để xóa/cập nhật.
+    Handle là list [key, seq, item, pos]; pos = -1 khi đã rời heap.
+    """
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def __iter__(self):
+        """Duyệt các phần tử đang trong heap (không theo thứ tự ưu tiên)."""
+        return (entry[_ITEM] for entry in self._heap)
+
+    def handles(self):
+        """Bản sao danh sách handle (an toàn khi update trong lúc duyệt)."""
+        return list(self._heap)
+
+    def push(self, key, item):
+        """Thêm item với độ ưu tiên key, trả về handle."""
+        entry = [key, next(self._seq), item, len(self._heap)]
+        self._heap.append(entry)
+        self._sift_up(entry[_POS])
+        return entry
+
+    def peek(self):
+        """(key, item) nhỏ nhất, không xóa."""
+        entry = self._heap[0]
+        return entry[_KEY], entry[_ITEM]
+
+    def pop(self):
+        """Lấy và xóa (key, item) nhỏ nhất."""
+        entry = self._heap[0]
+        self._remove_at(0)
+        return entry[_KEY], entry[_ITEM]
+
+    def remove(self, handle):
+        """Xóa phần tử theo handle. Trả về False nếu phần tử đã rời heap."""
+        pos = handle[_POS]
+        if pos < 0:
+            return False
+        self._remove_at(pos)
+        return True
+
+    def update(self, handle, key):
+        """Đổi độ ưu tiên của phần tử (tăng hoặc giảm)."""
+        pos = handle[_POS]
+        if pos < 0:
+            return
+        old_key = handle[_KEY]
+        handle[_KEY] = key
+        if key < old_key:
+            self._sift_up(pos)
+        elif key > old_key:
+            self._sift_down(pos)
+
+    @staticmethod
+    def item_of(handle):
+        return handle[_ITEM]
+
+    @staticmethod
+    def key_of(handle):
+        return handle[_KEY]
+
+    @staticmethod
+    def contains(handle):
+        return handle[_POS] >= 0
+
+    # ------------------------------------------------------------------
+    def _remove_at(self, pos):
+        heap = self._heap
+        entry = heap[pos]
+        last = heap.pop()
+        entry[_POS] = -1
+        if last is not entry:
+            heap[pos] = last
+            last[_POS] = pos
+            self._sift_down(pos)
+            if last[_POS] == pos:
+                self._sift_up(pos)
+
+    def _sift_up(self, pos):
+        heap = self._heap
+        entry = heap[pos]
+        order = (entry[_KEY], entry[_SEQ])
+        while pos > 0:
+            parent_pos = (pos - 1) >> 1
+            parent = heap[parent_pos]
+            if order >= (parent[_KEY], parent[_SEQ]):
+                break
+            heap[pos] = parent
+            parent[_POS] = pos
+            pos = parent_pos
+        heap[pos] = entry
+        entry[_POS] = pos
+
+    def _sift_down(self, pos):
+        heap = self._heap
+        size = len(heap)
+        entry = heap[pos]
+        order = (entry[_KEY], entry[_SEQ])
+        while True:
+            child_pos = 2 * pos + 1
+            if child_pos >= size:
+                break
+            child = heap[child_pos]
+            right_pos = child_pos + 1
+            if right_pos < size:
+                right = heap[right_pos]
+                if (right[_KEY], right[_SEQ]) < (child[_KEY], child[_SEQ]):
+                    child_pos, child = right_pos, right
+            if order <= (child[_KEY], child[_SEQ]):
+                break
+            heap[pos] = child
+            child[_POS] = pos
+            pos = child_pos
+        heap[pos] = entry
+        entry[_POS] = pos
+
+
+class RandomBag:
+    """
+    Tập phần tử không thứ tự, chọn ngẫu nhiên đều và xóa theo handle trong O(1).
+    Handle là list [item, pos]; pos = -1 khi đã rời túi.
+    """
+    def __init__(self):
+        self._slots = []
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __bool__(self):
+        return bool(self._slots)
+
+    def __iter__(self):
+        """Duyệt các phần tử đang trong túi (thứ tự bất kỳ)."""
+        return (handle[_BAG_ITEM] for handle in self._slots)
+
+    def add(self, item):
+        """Thêm item, trả về handle."""
+        handle = [item, len(self._slots)]
+        self._slots.append(handle)
+        return handle
+
+    def pop_random(self, rng):
+        """Chọn đều một phần tử bằng rng.randrange, xóa khỏi túi và trả về."""
+        handle = self._slots[rng.randrange(len(self._slots))]
+        self._remove_at(handle[_BAG_POS])
+        return handle[_BAG_ITEM]
+
+    def remove(self, handle):
+        """Xóa phần tử theo handle. Trả về False nếu phần tử đã rời túi."""
+        pos = handle[_BAG_POS]
+        if pos < 0:
+            return False
+        self._remove_at(pos)
+        return True
+
+    def _remove_at(self, pos):
+        """Swap-remove: đưa phần tử cuối vào chỗ trống."""
+        slots = self._slots
+        handle = slots[pos]
+        last = slots.pop()
+        handle[_BAG_POS] = -1
+        if last is not handle:
+            slots[pos] = last
+            last[_BAG_POS] = pos
+
+
+class ShiftedPriorityQueue:
+    """
+    Hàng ưu tiên với độ ưu tiên scale * (base + offset), offset chung tăng dần
+    theo thời gian (không cần cập nhật từng phần tử khi offset đổi).
+    scale = 0 → độ ưu tiên cố định base. Cùng độ ưu tiên → ai vào trước lấy trước.
+    """
+    def __init__(self):
+        self._heaps = {}     # {scale: IndexedHeap}, key = (base, thứ tự vào)
+        self._order = itertools.count()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __iter__(self):
+        for heap in self._heaps.values():
+            yield from heap
+
+    def push(self, base, scale, item):
+        """Thêm item, trả về handle."""
+        heap = self._heaps.get(scale)
+        if heap is None:
+            heap = self._heaps[scale] = IndexedHeap()
+        self._size += 1
+        return heap, heap.push((base, next(self._order)), item)
+
+    def pop(self, offset):
+        """Lấy và xóa item có scale * (base + offset) nhỏ nhất."""
+        best = None
+        for scale, heap in self._heaps.items():
+            if heap:
+                (base, order), _ = heap.peek()
+                candidate = (scale * (base + offset) if scale else base, order)
+                if best is None or candidate < best[0]:
+                    best = (candidate, heap)
+        _, item = best[1].pop()
+        self._size -= 1
+        return item
+
+    def remove(self, handle):
+        """Xóa theo handle. Trả về False nếu phần tử đã rời hàng."""
+        heap, entry = handle
+        if heap.remove(entry):
+            self._size -= 1
+            return True
+        return False
@@ -1,10 +1,17 @@
 # main.py
 import simpy
-import sys
+import argparse
 import importlib.util
 from pathlib import Path
 from classes.buffet_system import BuffetSystem
-from classes.analysis import Analysis
+from classes.analysis import Analysis, precision_metric_names, validate_precision_targets
+from core.profiler import SimulationProfile
+from core.replication_runner import ReplicationRunner, config_to_namespace
+from core.parameter_sweep import ParameterSweep, parse_axis
+from core.discipline_optimizer import DisciplineOptimizer, OBJECTIVES
+from core.multi_queue_system import prescreen_filter
+from core.validation_analyzer import ValidationAnalyzer
+from core.trace_recorder import replication_trace_path
 
 def load_config(config_name):
     """
@@ -35,37 +42,220 @@ def list_available_configs():
     config_files = sorted([f.stem for f in configs_dir.glob("*.py") if not f.name.startswith("__")])
     return config_files
 
-def run_simulation(config_module):
+def run_simulation(config_module, streaming=False, profile=False, profile_output=None):
     """
     Thiết lập và chạy mô phỏng chính.
     
     Args:
         config_module: Module config đã được load
+        streaming: True → Analysis chỉ giữ bộ tích lũy dạng dòng (bộ nhớ hằng số)
+        profile: True → chạy dưới cProfile, in thời gian theo thành phần
+        profile_output: File .prof (pstats) để xem bằng snakeviz/flameprof (None = không ghi)
     """
     
     # 1. Khởi tạo môi trường
     env = simpy.Environment()
     
     # 2. Khởi tạo bộ phân tích
-    analyzer = Analysis()
+    analyzer = Analysis(streaming=streaming)
     
     # 3. Khởi tạo hệ thống buffet (truyền config vào)
     buffet = BuffetSystem(env, analyzer, config_module)
     
     # 4. Chạy mô phỏng
-    buffet.run(until_time=config_module.UNTIL_TIME)
+    run_profile = None
+    if profile:
+        run_profile = SimulationProfile.capture(buffet, config_module.UNTIL_TIME)
+    else:
+        buffet.run(until_time=config_module.UNTIL_TIME)
     
     # 5. Tính toán và in kết quả
     analyzer.calculate_statistics()
     analyzer.print_report()
+    if buffet.trace is not None:
+        print(f"Da ghi {buffet.trace.count} su kien vao {buffet.trace.path}")
+    if run_profile is not None:
+        report_profile(run_profile, profile_output)
+
+def report_profile(run_profile, profile_output=None):
+    """In báo cáo profile và ghi file .prof (nếu có)."""
+    print()
+    run_profile.print_report()
+    if profile_output:
+        run_profile.dump(profile_output)
+        print(f"--- Da ghi profile vao {profile_output} (pstats: snakeviz, flameprof...) ---")
+
+def run_replications(config_module, num_replications, max_workers=None,
+                     profile=False, profile_output=None):
+    """
+    Chạy nhiều replications độc lập song song và in khoảng tin cậy.
+    
+    Args:
+        config_module: Module config đã được load
+        num_replications: Số lần lặp độc lập
+        max_workers: Số process (None = tất cả CPU)
+        profile: True → profile mọi replication, in báo cáo gộp từ các worker
+        profile_output: File .prof của profile gộp (None = không ghi)
+    """
+    runner = ReplicationRunner(config_module, num_replications=num_replications,
+                               max_workers=max_workers, profile=profile)
+    runner.run()
+    runner.print_report()
+    trace_path = getattr(runner.config, 'TRACE_PATH', None)
+    if trace_path:
+        print(f"Da ghi vet tung replication vao "
+              f"{replication_trace_path(trace_path, '<i>')} (i = 0..{num_replications - 1})")
+    if runner.profiler is not None:
+        report_profile(runner.profiler, profile_output)
+    return runner
+
+def run_sweep(config_module, axis_specs, num_replications, max_workers=None,
+              output_path='sweep_results.csv', prescreen=False):
+    """
+    Quét lưới tham số quanh config gốc và ghi bảng kết quả.
+    
+    Args:
+        config_module: Module config gốc
+        axis_specs: List chuỗi trục, ví dụ ['ARRIVAL_RATES.0=6:30:2', 'STATIONS.Meat.servers=3:10']
+        num_replications: Số replications cho mỗi điểm
+        max_workers: Số process (None = tất cả CPU)
+        output_path: File kết quả (.csv hoặc .parquet)
+        prescreen: True → bỏ qua các điểm mà lời giải giải tích cho thấy đã bão hòa
+    """
+    axes = dict(parse_axis(spec) for spec in axis_specs)
+    point_filter = prescreen_filter(config_module) if prescreen else None
+    sweep = ParameterSweep(config_module, axes, num_replications=num_replications,
+                           max_workers=max_workers, point_filter=point_filter)
+    n_points = len(sweep.points())
+    if prescreen:
+        total = 1
+        for values in axes.values():
+            total *= len(values)
+        print(f"--- Loai truoc {total - n_points}/{total} diem bao hoa (giai tich) ---")
+    print(f"--- Quet {n_points} diem x {num_replications} replications ---")
+    sweep.run(output_path)
+    print(f"--- Da ghi {len(sweep.rows)} dong ket qua vao {output_path} ---")
+    return sweep
+
+def run_optimizer(config_name, config_module, objective, max_workers=None):
+    """
+    Tìm tổ hợp kỷ luật tốt nhất cho các quầy và sinh file config tương ứng.
+    
+    Args:
+        config_name: Tên config gốc (để đặt tên file sinh ra)
+        config_module: Module config gốc
+        objective: 'system_time' | 'p95_wait' | 'balking_rate'
+        max_workers: Số process (None = tất cả CPU)
+    """
+    optimizer = DisciplineOptimizer(config_module, objective=objective,
+                                    max_workers=max_workers)
+    optimizer.run()
+    optimizer.print_report()
+
+    output_file = Path(__file__).parent / "configs" / f"optimized_{config_name}_{objective}.py"
+    optimizer.write_best_config(output_file)
+    print(f"--- Da sinh config: {output_file} ---")
+    return optimizer
+
+def run_validation(num_replications, max_workers=None):
+    """
+    Kiểm định engine: chạy lưới (lambda, c, K) các quầy M/M/c/K đơn lẻ
+    và so sánh với công thức lý thuyết.
+    
+    Args:
+        num_replications: Số replications cho mỗi điểm
+        max_workers: Số process (None = tất cả CPU)
+    """
+    validator = ValidationAnalyzer()
+    validator.run_grid(arrival_rates=[4, 8, 12, 16], servers=[1, 2, 4], capacities=[2, 5, 10],
+                       num_replications=num_replications, max_workers=max_workers)
+    validator.print_report()
+    return validator
+
+def parse_precision(specs, stations):
+    """
+    Chuyển các chuỗi --precision METRIC=REL thành {metric: độ chính xác tương đối}.
+
+    Raises:
+        ValueError: Sai cú pháp, giá trị không phải số hoặc metric không hợp lệ
+    """
+    targets = {}
+    for spec in specs:
+        metric, sep, value = spec.partition('=')
+        try:
+            if not sep:
+                raise ValueError
+            targets[metric.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"'{spec}' phải có dạng METRIC=REL, ví dụ system_time=0.02. "
+                             f"Metric hợp lệ: {', '.join(precision_metric_names(stations))}") from None
+    validate_precision_targets(targets, stations)
+    return targets
+
+def parse_args():
+    """Đọc tham số dòng lệnh."""
+    parser = argparse.ArgumentParser(description="Mô phỏng hệ thống Buffet")
+    parser.add_argument('config', nargs='?', help="Tên config trong configs/ (bỏ trống để chọn từ menu)")
+    parser.add_argument('-n', '--replications', type=int, default=1,
+                        help="Số replications độc lập (> 1 để chạy song song và tính CI)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Số process khi chạy nhiều replications (mặc định: tất cả CPU)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Thống kê dạng dòng (bộ nhớ không phụ thuộc số khách, phân vị xấp xỉ)")
+    parser.add_argument('--sweep', action='append', metavar='PATH=VALUES',
+                        help="Trục quét tham số, ví dụ ARRIVAL_RATES.0=6:30:2 (lặp lại cho nhiều trục)")
+    parser.add_argument('--prescreen', action='store_true',
+                        help="Khi quét: loại trước các điểm bão hòa bằng lời giải mạng hàng đợi giải tích")
+    parser.add_argument('-o', '--output', default='sweep_results.csv',
+                        help="File kết quả khi quét tham số (.csv hoặc .parquet)")
+    parser.add_argument('--optimize', choices=list(OBJECTIVES),
+                        help="Tìm tổ hợp kỷ luật tốt nhất theo mục tiêu và sinh configs/optimized_*.py")
+    parser.add_argument('--validate', action='store_true',
+                        help="Kiểm định mô phỏng với lý thuyết M/M/c/K trên lưới (lambda, c, K)")
+    parser.add_argument('--arrivals', choices=('scalar', 'block'),
+                        help="Sinh khách đến: scalar (mặc định) hoặc block (sinh trước theo khối NumPy)")
+    parser.add_argument('--replay', metavar='PATH',
+                        help="Phát lại khách đến từ log PATH (.csv hoặc .npy) thay cho ARRIVAL_RATES")
+    parser.add_argument('--warmup', type=float, metavar='W',
+                        help="Tự phát hiện và cắt warm-up (MSER) với batch rộng W phút")
+    parser.add_argument('--precision', action='append', metavar='METRIC=REL',
+                        help="Dừng tuần tự khi metric đạt độ chính xác tương đối, ví dụ "
+                             "system_time=0.02 hoặc wait_time.Meat=0.05 (UNTIL_TIME là mức trần)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Đo thời gian theo thành phần (cProfile), số sự kiện/phút mô phỏng "
+                             "và sự kiện/giây; gộp giữa các worker khi chạy -n replications")
+    parser.add_argument('--profile-output', metavar='PATH',
+                        help="Ghi profile ra file .prof (pstats) cho snakeviz/flameprof/gprof2dot "
+                             "(bật luôn --profile)")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="Ghi vết mọi sự kiện của khách ra file nhị phân PATH "
+                             "(chạy -n replications: mỗi replication một file PATH chèn "
+                             ".rep<i>; đọc lại bằng core.trace_recorder.load_trace)")
+    args = parser.parse_args()
+    if args.trace and (args.optimize or args.sweep or args.validate):
+        # Các chế độ này chạy rất nhiều điểm/tổ hợp: không ghi vết
+        parser.error("--trace chỉ dùng khi chạy một lần hoặc -n replications "
+                     "(không dùng với --optimize, --sweep, --validate)")
+    if (args.profile or args.profile_output) and (args.optimize or args.sweep or args.validate):
+        # Các chế độ này không chạy qua run_simulation/run_replications: không có profile
+        parser.error("--profile/--profile-output chỉ dùng khi chạy một lần hoặc -n replications "
+                     "(không dùng với --optimize, --sweep, --validate)")
+    if args.profile_output:
+        args.profile = True
+    return args
 
 def main():
     """Hàm main với menu chọn config"""
+    args = parse_args()
     available_configs = list_available_configs()
+
+    if args.validate:
+        run_validation(max(args.replications, 2), args.workers)
+        return
     
     # Kiểm tra nếu có argument từ command line
-    if len(sys.argv) > 1:
-        config_name = sys.argv[1]
+    if args.config:
+        config_name = args.config
     else:
         # Hiển thị menu để chọn
         print("=== CHON CONFIG FILE ===")
@@ -102,7 +292,32 @@ def main():
     try:
         print(f"\n=== Dang chay config: {config_name} ===")
         config_module = load_config(config_name)
-        run_simulation(config_module)
+        if args.arrivals:
+            config_module = config_to_namespace(config_module, ARRIVAL_MODE=args.arrivals)
+        if args.replay:
+            config_module = config_to_namespace(config_module, ARRIVAL_MODE='replay',
+                                                REPLAY_PATH=args.replay)
+        if args.warmup:
+            config_module = config_to_namespace(config_module, WARMUP_BATCH_WIDTH=args.warmup)
+        if args.trace:
+            config_module = config_to_namespace(config_module, TRACE_PATH=args.trace)
+        if args.precision:
+            try:
+                targets = parse_precision(args.precision, config_module.STATIONS)
+            except ValueError as e:
+                raise SystemExit(f"Lỗi --precision: {e}")
+            config_module = config_to_namespace(config_module, TARGET_PRECISION=targets)
+        if args.optimize:
+            run_optimizer(config_name, config_module, args.optimize, args.workers)
+        elif args.sweep:
+            run_sweep(config_module, args.sweep, args.replications, args.workers, args.output,
+                      prescreen=args.prescreen)
+        elif args.replications > 1:
+            run_replications(config_module, args.replications, args.workers,
+                             profile=args.profile, profile_output=args.profile_output)
+        else:
+            run_simulation(config_module, streaming=args.streaming, profile=args.profile,
+                           profile_output=args.profile_output)
     except FileNotFoundError as e:
         print(f"Lỗi: {e}")
         print(f"Các config có sẵn: {', '.join(available_configs)}")
@@ -0,0 +1,39 @@
+# models/aged_sjf.py
+"""
+MÔ HÌNH HÀNG ĐỢI SJF CÓ LÃO HÓA (Aged SJF)
+
+SJF thuần có thể gây "starvation": khách có service time dài bị vượt mãi.
+Aged-SJF giảm dần độ ưu tiên (tức là tăng quyền được phục vụ) theo thời gian chờ:
+
+    độ ưu tiên = service_time (kể cả độ trễ erratic) - AGING_RATE * thời gian đã chờ
+
+Vì mọi khách cùng "già" thêm AGING_RATE mỗi phút, phần -AGING_RATE * now là
+chung cho cả hàng → chỉ cần khóa tĩnh service_time + AGING_RATE * thời điểm
+bắt đầu chờ, thứ tự trong heap không đổi theo thời gian (O(log n), không cần
+duyệt lại hàng đợi).
+
+LUỒNG HOẠT ĐỘNG:
+1. Khách đến → Thêm vào hàng ưu tiên (khóa theo service_time và lúc bắt đầu chờ)
+2. Có server rảnh → Phục vụ khách có độ ưu tiên nhỏ nhất
+3. Phục vụ xong → Trả server và chỗ K, chọn khách kế tiếp
+"""
+from core.base_queue_system import PriorityQueueSystem, register_discipline
+from classes.customer import Customer
+
+# Số phút ưu tiên được cộng cho mỗi phút chờ
+AGING_RATE = 0.5
+
+@register_discipline('AGED_SJF')
+class AgedSJFModel(PriorityQueueSystem):
+    """
+    Hiện thực hàng đợi SJF có lão hóa trên lõi hàng đợi dùng chung.
+    """
+    @staticmethod
+    def priority_key(customer: Customer, station_index):
+        service_time = customer.service_times[station_index]
+        # - 'indulgent': Nhân đôi serve_time (hệ số nhân của độ ưu tiên)
+        scale = 2.0 if customer.customer_type == 'indulgent' else 1.0
+        # scale * (base + erratic_offset) - AGING_RATE * (now - start_wait_time)
+        # = scale * (base + AGING_RATE * start_wait_time / scale + erratic_offset) - AGING_RATE * now
+        base = service_time - customer.erratic_stamp
+        return base + AGING_RATE * customer.start_wait_time / scale, scale
@@ -0,0 +1,27 @@
+# models/lcfs.py
+"""
+MÔ HÌNH HÀNG ĐỢI LCFS (Last Come First Served - Ai đến sau phục vụ trước)
+
+LCFS phục vụ khách vào hàng MUỘN NHẤT trước (không ngắt khách đang phục vụ).
+Thời gian chờ trung bình như FCFS nhưng phương sai lớn hơn nhiều: khách vào
+hàng sớm có thể bị "vượt" liên tục và reneging.
+
+LUỒNG HOẠT ĐỘNG:
+1. Khách đến → Thêm vào hàng ưu tiên (khóa = -thời điểm bắt đầu chờ)
+2. Có server rảnh → Phục vụ khách vào hàng muộn nhất
+3. Phục vụ xong → Trả server và chỗ K, chọn khách kế tiếp
+"""
+from core.base_queue_system import PriorityQueueSystem, register_discipline
+from classes.customer import Customer
+
+@register_discipline('LCFS')
+class LCFSModel(PriorityQueueSystem):
+    """
+    Hiện thực hàng đợi LCFS trên lõi hàng đợi dùng chung (PriorityQueueSystem).
+    """
+    @staticmethod
+    def priority_key(customer: Customer, station_index):
+        # Vào hàng càng muộn → khóa càng nhỏ → phục vụ trước
+        # scale = 0: khóa cố định (không phụ thuộc độ trễ erratic)
+        # Cùng thời điểm vào hàng → ai vào trước phục vụ trước (thứ tự của hàng)
+        return -customer.start_wait_time, 0.0
@@ -0,0 +1,38 @@
+# models/priority.py
+"""
+MÔ HÌNH HÀNG ĐỢI ƯU TIÊN THEO LOẠI KHÁCH (Priority by customer type)
+
+Khách được phục vụ theo hạng của loại khách (TYPE_PRIORITY, hạng nhỏ trước);
+cùng hạng → ai đến trước phục vụ trước (FCFS trong từng hạng).
+
+Mặc định ưu tiên khách 'impatient' (dễ reneging nhất), khách 'indulgent'
+(service time gấp đôi) xếp cuối.
+
+LUỒNG HOẠT ĐỘNG:
+1. Khách đến → Thêm vào hàng ưu tiên (khóa = hạng loại khách)
+2. Có server rảnh → Phục vụ khách có hạng nhỏ nhất, vào hàng sớm nhất
+3. Phục vụ xong → Trả server và chỗ K, chọn khách kế tiếp
+"""
+from core.base_queue_system import PriorityQueueSystem, register_discipline
+from classes.customer import Customer
+
+# Hạng ưu tiên theo loại khách (nhỏ = ưu tiên cao)
+TYPE_PRIORITY = {
+    'impatient': 0,
+    'erratic': 1,
+    'normal': 2,
+    'indulgent': 3,
+}
+# Hạng cho loại khách không có trong TYPE_PRIORITY
+DEFAULT_TYPE_PRIORITY = 2
+
+@register_discipline('PRIORITY')
+class PriorityByTypeModel(PriorityQueueSystem):
+    """
+    Hiện thực hàng đợi ưu tiên theo loại khách trên lõi hàng đợi dùng chung.
+    """
+    @staticmethod
+    def priority_key(customer: Customer, station_index):
+        # scale = 0: khóa cố định (không phụ thuộc độ trễ erratic)
+        rank = TYPE_PRIORITY.get(customer.customer_type, DEFAULT_TYPE_PRIORITY)
+        return rank, 0.0
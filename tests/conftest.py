@@ -0,0 +1,8 @@
+# tests/conftest.py
+"""Cho phép import các package của dự án (classes, core, models) khi chạy pytest."""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
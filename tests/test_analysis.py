@@ -0,0 +1,134 @@
+# tests/test_analysis.py
+"""Kiểm tra các chỉ số của Analysis trên những lần chạy ngắn."""
+import random
+
+import simpy
+import pytest
+
+from main import load_config
+from classes.analysis import Analysis
+from classes.buffet_system import BuffetSystem
+from core.replication_runner import config_to_namespace
+
+
+def run_config(config_name, until_time=300.0, streaming=True, **overrides):
+    config = config_to_namespace(load_config(config_name), **overrides)
+    analyzer = Analysis(streaming=streaming)
+    buffet = BuffetSystem(simpy.Environment(), analyzer, config)
+    buffet.run(until_time=until_time, verbose=False)
+    analyzer.calculate_statistics()
+    return analyzer, buffet
+
+
+def test_streaming_mode_matches_raw_samples():
+    exact, _ = run_config('all_fcfs', streaming=False)
+    streaming, _ = run_config('all_fcfs', streaming=True)
+    assert streaming.avg_system_time == pytest.approx(exact.avg_system_time, rel=1e-9)
+    for station, value in exact.avg_wait_time_per_station.items():
+        assert streaming.avg_wait_time_per_station[station] == pytest.approx(value, abs=1e-9)
+        assert streaming.wait_record_count(station) == len(exact.wait_times[station])
+    for p, value in exact.system_time_percentiles.items():
+        assert streaming.system_time_percentiles[p] == pytest.approx(value, rel=0.05)
+
+
+def test_new_customer_draws_match_uniform_and_weighted_choice():
+    config = config_to_namespace(load_config('all_sjf'))
+    buffet = BuffetSystem(simpy.Environment(), Analysis(streaming=True), config)
+    spread = buffet.service_time_spread
+    for seed in range(5):
+        rng = random.Random(seed)
+        expected = {station: rng.uniform(base * (1 - spread), base * (1 + spread))
+                    for station, base in config.DEFAULT_SERVICE_TIMES.items()}
+        expected_type = rng.choices(list(config.CUSTOMER_TYPE_DISTRIBUTION),
+                                    weights=list(config.CUSTOMER_TYPE_DISTRIBUTION.values()))[0]
+        buffet.attribute_rng.seed(seed)
+        customer = buffet.new_customer(0, 0.0)
+        # service_times: list theo thứ tự quầy trong STATIONS
+        assert customer.service_times == [expected[name] for name in config.STATIONS]
+        assert customer.customer_type == expected_type
+        assert not hasattr(customer, '__dict__')
+
+
+def test_service_times_follow_station_order():
+    # DEFAULT_SERVICE_TIMES khác thứ tự STATIONS và thiếu một quầy → sắp lại, quầy thiếu dùng avg_service_time
+    base = load_config('all_sjf')
+    names = list(base.STATIONS)
+    defaults = {name: base.DEFAULT_SERVICE_TIMES[name] for name in reversed(names[1:])}
+    config = config_to_namespace(base, DEFAULT_SERVICE_TIMES=defaults, SERVICE_TIME_SPREAD=0.0)
+    buffet = BuffetSystem(simpy.Environment(), Analysis(streaming=True), config)
+    customer = buffet.new_customer(0, 0.0)
+    assert customer.service_times == (
+        [base.STATIONS[names[0]]['avg_service_time']] + [defaults[name] for name in names[1:]])
+
+
+def test_merge_requires_same_mode():
+    with pytest.raises(ValueError):
+        Analysis(streaming=True).merge(Analysis())
+
+
+@pytest.mark.parametrize('config_name', ['all_fcfs', 'all_sjf', 'all_ros'])
+def test_queue_length_and_in_system_series(config_name):
+    # Mọi kỷ luật: khách tại quầy = đang chờ + đang được phục vụ, ở mọi thời điểm
+    analyzer, _ = run_config(config_name)
+    for station, utilization in analyzer.utilization_per_station.items():
+        busy = analyzer.busy_server_stats[station].mean
+        mean_in_system = analyzer.mean_in_system_per_station[station]
+        mean_queue_length = analyzer.mean_queue_length_per_station[station]
+        assert mean_in_system == pytest.approx(mean_queue_length + busy)
+        histogram = analyzer.in_system_histogram_per_station[station]
+        assert sum(histogram.values()) == pytest.approx(1.0)
+        assert sum(n * frac for n, frac in histogram.items()) == pytest.approx(mean_in_system)
+        if utilization > 0.95:
+            assert mean_queue_length > 0
+
+
+def test_level_trackers_merge_across_replications():
+    first, _ = run_config('all_sjf', until_time=100.0, RANDOM_SEED=1)
+    second, _ = run_config('all_sjf', until_time=100.0, RANDOM_SEED=2)
+    station = next(iter(first.in_system_stats))
+    area = first.in_system_stats[station].area + second.in_system_stats[station].area
+    first.merge(second)
+    first.calculate_statistics()
+    assert first.in_system_stats[station].duration == pytest.approx(200.0)
+    assert first.mean_in_system_per_station[station] == pytest.approx(area / 200.0)
+
+
+def test_warmup_cut_follows_system_time_and_is_reported():
+    # Cắt theo chuỗi system time: wait time dao động của một quầy không được
+    # đẩy điểm cắt đi xa (lấy điểm cắt lớn nhất mọi chuỗi bỏ 150/1000 phút)
+    analyzer, _ = run_config('all_fcfs', until_time=1000.0, WARMUP_BATCH_WIDTH=5.0)
+    assert 0 <= analyzer.warmup_time <= 50.0
+    assert analyzer.warmup_fraction == pytest.approx(analyzer.warmup_time / 1000.0)
+    assert analyzer.summary()['warmup_fraction'] == analyzer.warmup_fraction
+    assert (analyzer.warmup_discarded > 0) == (analyzer.warmup_batches > 0)
+
+
+def test_warmup_truncates_level_series():
+    analyzer, _ = run_config('all_sjf', until_time=400.0, WARMUP_BATCH_WIDTH=5.0)
+    for field in ('queue_length_stats', 'in_system_stats', 'busy_server_stats'):
+        for stat in getattr(analyzer, field).values():
+            assert stat.duration == pytest.approx(400.0 - analyzer.warmup_time)
+            assert sum(stat.time_in_state.values()) == pytest.approx(stat.duration)
+
+
+def test_sequential_stopping_reaches_precision():
+    analyzer, buffet = run_config('all_fcfs', until_time=5000.0,
+                                  TARGET_PRECISION={'system_time': 0.05})
+    assert analyzer.converged
+    assert analyzer.simulated_time < 5000.0
+    assert analyzer.precision['system_time']['relative'] <= 0.05
+
+
+def test_unknown_precision_metric_is_rejected_at_setup():
+    with pytest.raises(ValueError, match='wait_time.Meat'):
+        run_config('all_fcfs', TARGET_PRECISION={'wait_time.Beef': 0.05})
+
+
+def test_parse_precision_lists_valid_metrics():
+    from main import parse_precision
+    stations = load_config('all_fcfs').STATIONS
+    assert parse_precision(['system_time=0.02', 'wait_time.Meat=0.05'], stations) == {
+        'system_time': 0.02, 'wait_time.Meat': 0.05}
+    for spec in ('system_time', 'system_time=abc', 'queue=0.1'):
+        with pytest.raises(ValueError, match='system_time'):
+            parse_precision([spec], stations)
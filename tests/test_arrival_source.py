@@ -0,0 +1,120 @@
+# tests/test_arrival_source.py
+"""Nguồn khách đến sinh theo khối và nguồn phát lại log khách đến (CSV, .npy)."""
+import numpy as np
+import pytest
+import simpy
+
+from main import load_config
+from classes.analysis import Analysis
+from classes.arrival_source import BlockArrivalSource, ReplaySource, open_replay_source
+from classes.buffet_system import BuffetSystem
+from core.replication_runner import config_to_namespace
+
+CUSTOMER_TYPES = ['normal', 'indulgent', 'impatient', 'erratic']
+STATIONS = ['Meat', 'Seafood']
+
+
+def run_block(until_time=200.0, **overrides):
+    config = config_to_namespace(load_config('all_fcfs'), **overrides)
+    analyzer = Analysis(streaming=True)
+    BuffetSystem(simpy.Environment(), analyzer, config).run(until_time=until_time, verbose=False)
+    analyzer.calculate_statistics()
+    return analyzer
+
+
+def test_block_source_refills_and_matches_distribution():
+    config = load_config('all_sjf')
+    source = BlockArrivalSource(2.0, config, np.random.default_rng(0),
+                                block_size=1000, service_time_spread=0.5)
+    draws = [source.next() for _ in range(5000)]
+    gaps = np.array([gap for gap, _, _ in draws])
+    assert gaps.mean() == pytest.approx(0.5, rel=0.05)
+
+    types = [customer_type for _, customer_type, _ in draws]
+    weights = config.CUSTOMER_TYPE_DISTRIBUTION
+    total = sum(weights.values())
+    for name, weight in weights.items():
+        assert types.count(name) / len(types) == pytest.approx(weight / total, abs=0.03)
+
+    times = np.array([row for _, _, row in draws])
+    base = np.array([config.DEFAULT_SERVICE_TIMES[s] for s in source.station_names])
+    assert np.all(times >= 0.5 * base) and np.all(times <= 1.5 * base)
+
+
+def test_block_mode_is_reproducible_and_rejects_unknown_mode():
+    first = run_block(ARRIVAL_MODE='block', ARRIVAL_BLOCK_SIZE=64)
+    second = run_block(ARRIVAL_MODE='block', ARRIVAL_BLOCK_SIZE=64)
+    assert first.total_arrivals == second.total_arrivals > 0
+    assert first.avg_system_time == second.avg_system_time
+    with pytest.raises(ValueError):
+        run_block(ARRIVAL_MODE='vector')
+
+
+def replay(path, chunk_size=2):
+    source = open_replay_source(path, [0, 1], CUSTOMER_TYPES, STATIONS, chunk_size=chunk_size)
+    return list(source)
+
+
+@pytest.mark.parametrize('type_dtype, values', [
+    ('U10', ['normal', '', 'erratic']),
+    ('S10', [b'normal', b'', b'erratic']),
+    ('i1', [0, -1, 3]),
+])
+def test_npy_replay_type_field(tmp_path, type_dtype, values):
+    dtype = np.dtype([('time', 'f8'), ('gate', 'i2'), ('type', type_dtype),
+                      ('service', 'f8', (len(STATIONS),))])
+    data = np.array([
+        (0.5, 0, values[0], [0.4, 0.6]),
+        (1.0, 1, values[1], [np.nan, 0.3]),
+        (1.0, 0, values[2], [np.nan, np.nan]),
+    ], dtype=dtype)
+    path = tmp_path / 'log.npy'
+    np.save(path, data)
+
+    assert replay(path) == [
+        (0.5, 0, ('normal', [0.4, 0.6])),
+        (1.0, 1, (None, [None, 0.3])),
+        (1.0, 0, ('erratic', [None, None])),
+    ]
+
+
+def test_csv_replay_matches_npy(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_text('time,gate,customer_type,service_Meat\n'
+                    '0.5,0,normal,0.4\n'
+                    '1.0,1,,\n', encoding='utf-8')
+    assert replay(path) == [
+        (0.5, 0, ('normal', [0.4, None])),
+        (1.0, 1, (None, [None, None])),
+    ]
+
+
+@pytest.mark.parametrize('body, message', [
+    ('time,gate\n1.0,0\n0.5,1\n', 'tăng dần'),
+    ('time,gate\n1.0,7\n', 'cổng'),
+    ('time,gate,customer_type\n1.0,0,vip\n', 'loại khách'),
+    ('tim,gate\n', 'thiếu cột'),
+])
+def test_csv_replay_rejects_invalid_logs(tmp_path, body, message):
+    path = tmp_path / 'log.csv'
+    path.write_text(body, encoding='utf-8')
+    with pytest.raises(ValueError, match=message):
+        replay(path)
+
+
+def test_replay_source_requires_chunks():
+    with pytest.raises(TypeError, match='_chunks'):
+        ReplaySource('log.csv', [0], CUSTOMER_TYPES, STATIONS)
+
+
+def test_replay_mode_runs_logged_arrivals(tmp_path):
+    # Cổng 0 và 1 của all_fcfs; 1/3 số dòng không có loại khách (sinh ngẫu nhiên)
+    path = tmp_path / 'log.csv'
+    rows = ['time,gate,customer_type'] + [
+        f'{0.1 * i:.1f},{i % 2},{CUSTOMER_TYPES[i % 4] if i % 3 else ""}' for i in range(200)]
+    path.write_text('\n'.join(rows) + '\n', encoding='utf-8')
+    first = run_block(until_time=100.0, ARRIVAL_MODE='replay', REPLAY_PATH=str(path),
+                      REPLAY_CHUNK_SIZE=16)
+    second = run_block(until_time=100.0, ARRIVAL_MODE='replay', REPLAY_PATH=str(path))
+    assert first.total_arrivals == second.total_arrivals == 200
+    assert first.avg_system_time == second.avg_system_time
@@ -0,0 +1,43 @@
+# tests/test_deadline_timer.py
+"""DeadlineTimer: hạn chót nổ đúng thứ tự, hủy được, chỉ một timer SimPy mỗi lúc."""
+import random
+
+import simpy
+
+from core.deadline_timer import DeadlineTimer
+
+
+def test_deadlines_fire_in_order_and_cancelled_ones_never_fire():
+    env = simpy.Environment()
+    fired = []
+    timer = DeadlineTimer(env, lambda item: fired.append((env.now, item)))
+    rng = random.Random(1)
+    deadlines = {item: rng.uniform(0, 100) for item in range(200)}
+    handles = {item: timer.add(deadline, item) for item, deadline in deadlines.items()}
+    cancelled = set(rng.sample(sorted(deadlines), 60))
+    for item in cancelled:
+        timer.cancel(handles[item])
+
+    env.run()
+    expected = sorted((d, item) for item, d in deadlines.items() if item not in cancelled)
+    assert [item for _, item in fired] == [item for _, item in expected]
+    assert all(abs(now - d) < 1e-9 for (now, _), (d, _) in zip(fired, expected))
+    assert len(timer) == 0
+
+
+def test_earlier_deadline_rearms_and_cancelled_timers_leave_no_events():
+    env = simpy.Environment()
+    fired = []
+    timer = DeadlineTimer(env, fired.append)
+    timer.add(10.0, 'late')
+    timer.add(2.0, 'early')         # Sớm hơn timer đang hẹn → hẹn lại
+    env.run(until=5.0)
+    assert fired == ['early']
+
+    # Hủy hạn chót còn lại: timer 10.0 nổ nhưng không gọi on_expire
+    handle = timer.add(7.0, 'cancelled')
+    timer.cancel(handle)
+    timer.cancel(timer.deadlines.handles()[0])
+    env.run()
+    assert fired == ['early']
+    assert env.now <= 10.0
@@ -0,0 +1,64 @@
+# tests/test_discipline_optimizer.py
+"""Thủ tục KN của DisciplineOptimizer và file config sinh ra."""
+import importlib.util
+
+import numpy as np
+import pytest
+
+from main import load_config
+from core.discipline_optimizer import DisciplineOptimizer, write_config_module
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_rejects_unknown_objective_and_small_n0():
+    config = load_config('all_fcfs')
+    with pytest.raises(ValueError):
+        DisciplineOptimizer(config, objective='throughput')
+    with pytest.raises(ValueError):
+        DisciplineOptimizer(config, n0=1)
+    with pytest.raises(ValueError, match='LCFS'):
+        DisciplineOptimizer(config, disciplines=('FCFS', 'LIFO'))
+
+
+def test_screen_eliminates_clearly_worse_combinations():
+    optimizer = DisciplineOptimizer(load_config('all_fcfs'), disciplines=('FCFS', 'SJF'),
+                                    n0=5, max_workers=1)
+    rng = np.random.default_rng(0)
+    k = len(optimizer.combinations)
+    noise = 0.01 * rng.standard_normal(5)
+    # Tổ hợp 3 tốt nhất rõ rệt, các tổ hợp khác kém hơn 1 đơn vị (cùng nhiễu → CRN)
+    optimizer.observations = [list(10.0 + (0.0 if i == 3 else 1.0) + noise) for i in range(k)]
+    first = np.array(optimizer.observations)
+    s2 = (first[:, None, :] - first[None, :, :]).var(axis=2, ddof=1)
+    optimizer.delta = 0.1
+    optimizer._screen(5, s2, optimizer._h_squared(k))
+    assert optimizer.survivors == [3]
+    assert set(optimizer.eliminated_at) == set(range(k)) - {3}
+
+
+def test_best_config_round_trips_through_generated_module(tmp_path):
+    optimizer = DisciplineOptimizer(load_config('all_fcfs'), disciplines=('FCFS', 'SJF'),
+                                    n0=2, max_replications=2, max_workers=1, until_time=20.0)
+    best = optimizer.run()
+    assert len(best) == len(optimizer.station_names)
+
+    path = tmp_path / 'best.py'
+    optimizer.write_best_config(path)
+    written = load_module(path)
+    assert [cfg['discipline'] for cfg in written.STATIONS.values()] == list(best)
+    assert written.ARRIVAL_RATES == optimizer.config.ARRIVAL_RATES
+
+
+def test_write_config_module_keeps_values(tmp_path):
+    config = load_config('best_combination_normal')
+    path = tmp_path / 'copy.py'
+    write_config_module(config, path, 'ban sao')
+    copy = load_module(path)
+    for name in ('STATIONS', 'PROB_MATRICES', 'PATIENCE_TIME_FACTORS'):
+        assert getattr(copy, name) == getattr(config, name)
@@ -0,0 +1,48 @@
+# tests/test_food_station.py
+"""FoodStation gộp tài nguyên: đếm chỗ K, Balking khi đầy, trả chỗ khi khách rời quầy."""
+import pytest
+
+import simpy
+
+from main import load_config
+from classes.analysis import Analysis
+from classes.buffet_system import BuffetSystem
+from classes.customer import Customer
+from classes.food_station import FoodStation
+from core.replication_runner import config_to_namespace
+from models.fcfs import FCFSModel
+
+
+def test_full_station_balks_and_frees_space_when_customers_leave():
+    env = simpy.Environment()
+    analyzer = Analysis(streaming=True)
+    analyzer.add_station('Meat')
+    model = FCFSModel(env, 1, 1.0, analyzer, 'Meat')
+    station = FoodStation(env, 'Meat', 2, analyzer, model)
+    customers = [Customer(i, 0, 0.0, 'normal', float('inf'), [1.0]) for i in range(3)]
+
+    events = [station.visit(customer) for customer in customers]
+    # FCFS giữ chỗ K đến khi phục vụ xong: 2 khách chiếm đủ K, khách thứ 3 Balking
+    assert events[0] is not None and events[1] is not None
+    assert events[2] is None and customers[2].reneged
+    assert station.free_space == 0
+    assert analyzer.summary()['total_balked'] == 1
+
+    env.run()
+    assert all(event.triggered for event in events[:2])
+    assert station.free_space == station.capacity_K
+    assert model.in_system.level == 0 and model.busy_servers.level == 0
+
+
+@pytest.mark.parametrize('config_name', ['all_fcfs', 'all_sjf', 'all_ros'])
+def test_free_space_counts_customers_holding_k(config_name):
+    config = config_to_namespace(load_config(config_name))
+    buffet = BuffetSystem(simpy.Environment(), Analysis(streaming=True), config)
+    buffet.run(until_time=200.0, verbose=False)
+    for station in buffet.stations.values():
+        model = station.discipline_model
+        # SJF/ROS trả chỗ K khi được giao server, FCFS khi phục vụ xong
+        holding = (model.queue_length.level if model.release_at_service_start
+                   else model.in_system.level)
+        assert station.capacity_K - station.free_space == holding
+        assert 0 <= station.free_space <= station.capacity_K
@@ -0,0 +1,48 @@
+# tests/test_multi_queue_system.py
+"""Lời giải giải tích của mạng nhiều quầy và prescreen_filter."""
+import math
+
+import pytest
+
+from main import load_config, list_available_configs
+from classes.routing import redistribution_distribution
+from core.multi_queue_system import MultiQueueSystem, prescreen_filter
+
+
+def test_redistribution_spreads_full_station_probability():
+    probs = {'A': 0.5, 'B': 0.3, 'C': 0.2}
+    admitted, balk = redistribution_distribution(probs, full=set())
+    assert admitted == pytest.approx(probs) and balk == 0.0
+
+    admitted, balk = redistribution_distribution(probs, full={'A'})
+    assert admitted['A'] == 0.0
+    assert sum(admitted.values()) + balk == pytest.approx(1.0)
+    assert balk == 0.0
+
+    admitted, balk = redistribution_distribution(probs, full={'A', 'B', 'C'})
+    assert balk == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize('config_name', list_available_configs())
+def test_multi_queue_system_solves_shipped_configs(config_name):
+    config = load_config(config_name)
+    system = MultiQueueSystem(config)
+    summary = system.summary()
+
+    assert system.converged
+    assert 0.0 <= summary['balking_rate'] <= 1.0
+    assert summary['avg_system_time'] > 0
+    for station in config.STATIONS:
+        assert 0.0 <= summary[f'utilization.{station}'] <= 1.0 + 1e-9
+        assert 0.0 <= summary[f'blocking_probability.{station}'] <= 1.0
+        assert summary[f'mean_queue_length.{station}'] <= summary[f'mean_in_system.{station}']
+        assert math.isfinite(summary[f'avg_wait_time.{station}'])
+
+
+def test_prescreen_filter_keeps_light_load_and_drops_saturated_load():
+    config = load_config('all_fcfs')
+    keep = prescreen_filter(config)
+    light = {f'ARRIVAL_RATES.{gate}': 0.5 for gate in config.ARRIVAL_RATES}
+    heavy = {f'ARRIVAL_RATES.{gate}': 200.0 for gate in config.ARRIVAL_RATES}
+    assert keep(light)
+    assert not keep(heavy)
@@ -0,0 +1,48 @@
+# tests/test_parameter_sweep.py
+"""Đọc trục, gán giá trị theo đường dẫn và chạy lưới của ParameterSweep."""
+import csv
+
+import pytest
+
+from main import load_config
+from core.parameter_sweep import ParameterSweep, parse_axis, set_config_value
+from core.replication_runner import config_to_namespace
+
+
+def test_parse_axis_ranges_and_lists():
+    assert parse_axis('ARRIVAL_RATES.0=6:12:2') == ('ARRIVAL_RATES.0', [6, 8, 10, 12])
+    assert parse_axis('X=0.1:0.3:0.1') == ('X', [0.1, 0.2, 0.3])
+    assert parse_axis('STATIONS.Meat.servers=3, 5') == ('STATIONS.Meat.servers', [3, 5])
+    with pytest.raises(ValueError):
+        parse_axis('ARRIVAL_RATES.0')
+    with pytest.raises(ValueError):
+        parse_axis('X=1:5:0')
+
+
+def test_set_config_value_paths():
+    config = config_to_namespace(load_config('all_fcfs'))
+    gate = next(iter(config.ARRIVAL_RATES))
+    set_config_value(config, f'ARRIVAL_RATES.{gate}', 99.0)
+    set_config_value(config, 'STATIONS.*.capacity_K', 4)
+    set_config_value(config, 'UNTIL_TIME', 10.0)
+
+    assert config.ARRIVAL_RATES[gate] == 99.0
+    assert {cfg['capacity_K'] for cfg in config.STATIONS.values()} == {4}
+    assert config.UNTIL_TIME == 10.0
+    with pytest.raises(KeyError):
+        set_config_value(config, 'STATIONS.Nope.servers', 1)
+
+
+def test_sweep_writes_one_row_per_point_and_replication(tmp_path):
+    axes = dict([parse_axis('STATIONS.*.servers=2,3')])
+    sweep = ParameterSweep(load_config('all_fcfs'), axes, num_replications=2,
+                           max_workers=1, until_time=30.0)
+    output = tmp_path / 'sweep.csv'
+    rows = sweep.run(output)
+
+    assert [(r['point_id'], r['replication']) for r in rows] == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    # Replication r dùng cùng SeedSequence ở mọi điểm
+    seeds = {(task[0], task[1]): task[2].spawn_key for task in sweep.tasks()}
+    assert seeds[0, 0] == seeds[1, 0] != seeds[0, 1]
+    with open(output, newline='') as f:
+        assert len(list(csv.DictReader(f))) == 4
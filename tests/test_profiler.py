@@ -0,0 +1,87 @@
+# tests/test_profiler.py
+"""Profile mô phỏng: chia self time theo thành phần, đếm sự kiện, gộp giữa các replication."""
+import pstats
+
+import pytest
+import simpy
+
+from main import load_config, parse_args
+from classes.analysis import Analysis
+from classes.buffet_system import BuffetSystem
+from core.profiler import SimulationProfile, component_of
+from core.replication_runner import ReplicationRunner, config_to_namespace
+
+
+def capture(until_time=60.0):
+    config = config_to_namespace(load_config('all_sjf'))
+    buffet = BuffetSystem(simpy.Environment(), Analysis(streaming=True), config)
+    return SimulationProfile.capture(buffet, until_time)
+
+
+@pytest.mark.parametrize('func, expected', [
+    (('/x/classes/food_station.py', 1, 'visit'), 'station'),
+    (('/x/classes/buffet_system.py', 1, 'customer_lifecycle'), 'lifecycle'),
+    (('/x/classes/buffet_system.py', 1, 'new_customer'), 'arrivals'),
+    (('/x/classes/routing.py', 1, 'sample'), 'routing'),
+    (('/x/models/sjf.py', 1, 'priority_key'), 'discipline.sjf'),
+    (('/x/site-packages/simpy/core.py', 1, 'step'), 'engine'),
+    (('~', 0, "<method 'random' of '_random.Random' objects>"), 'random'),
+    (('~', 0, '<built-in method builtins.len>'), None),
+    (('/x/other.py', 1, 'f'), 'other'),
+])
+def test_component_of(func, expected):
+    assert component_of(func) == expected
+
+
+def test_capture_counts_events_and_attributes_self_time():
+    profile = capture()
+    summary = profile.summary()
+    assert summary['runs'] == 1 and summary['simulated_time'] == pytest.approx(60.0)
+    assert summary['events'] > 0
+    assert summary['events_per_simulated_minute'] == pytest.approx(summary['events'] / 60.0)
+
+    times = profile.component_times()
+    assert {'station', 'discipline', 'engine'} <= set(times)
+    # Built-in được chia cho hàm gọi: tổng theo thành phần bằng tổng self time
+    total = sum(stat[2] for stat in profile.stats.values())
+    assert sum(times.values()) == pytest.approx(total)
+
+
+def test_merge_and_dump(tmp_path):
+    first, second = capture(30.0), capture(30.0)
+    merged = SimulationProfile().merge(first).merge(second)
+    assert merged.runs == 2
+    assert merged.events == first.events + second.events
+    assert merged.simulated_time == pytest.approx(60.0)
+
+    path = tmp_path / 'run.prof'
+    merged.dump(path)
+    assert pstats.Stats(str(path)).total_calls == merged.to_pstats().total_calls
+
+
+def test_runner_merges_worker_profiles():
+    runner = ReplicationRunner(load_config('all_fcfs'), num_replications=2, max_workers=1,
+                               until_time=30.0, profile=True)
+    runner.run()
+    assert runner.profiler.runs == 2 and runner.profiler.events > 0
+    # Profile không làm thay đổi kết quả mô phỏng
+    plain = ReplicationRunner(load_config('all_fcfs'), num_replications=2, max_workers=1,
+                              until_time=30.0)
+    plain.run()
+    assert runner.replications == plain.replications
+
+
+@pytest.mark.parametrize('argv', [
+    ['all_fcfs', '--profile', '--sweep', 'ARRIVAL_RATES.0=6:8'],
+    ['all_fcfs', '--profile-output', 'run.prof', '--optimize', 'system_time'],
+])
+def test_profile_rejected_for_sweep_and_optimize(monkeypatch, argv):
+    monkeypatch.setattr('sys.argv', ['main.py'] + argv)
+    with pytest.raises(SystemExit) as excinfo:
+        parse_args()
+    assert excinfo.value.code == 2
+
+
+def test_profile_output_implies_profile(monkeypatch):
+    monkeypatch.setattr('sys.argv', ['main.py', 'all_fcfs', '--profile-output', 'run.prof'])
+    assert parse_args().profile
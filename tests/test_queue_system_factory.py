@@ -0,0 +1,62 @@
+# tests/test_queue_system_factory.py
+"""Đăng ký kỷ luật theo tên và thứ tự phục vụ của các kỷ luật trên lõi PriorityQueueSystem."""
+import pytest
+
+import simpy
+
+from main import load_config
+from classes.analysis import Analysis
+from classes.buffet_system import BuffetSystem
+from classes.customer import Customer
+from core.queue_system_factory import QueueSystemFactory
+from core.replication_runner import config_to_namespace
+
+
+def test_registry_lists_disciplines_and_rejects_unknown_names():
+    assert set(QueueSystemFactory.DISCIPLINES) >= {
+        'FCFS', 'SJF', 'ROS', 'LCFS', 'PRIORITY', 'AGED_SJF'}
+    for name in QueueSystemFactory.DISCIPLINES:
+        assert QueueSystemFactory.model_class(name).discipline_name == name
+    with pytest.raises(ValueError, match='FCFS'):
+        QueueSystemFactory.model_class('LIFO')
+
+
+@pytest.mark.parametrize('discipline, expected', [
+    ('FCFS', [1, 2, 3]),
+    ('LCFS', [3, 2, 1]),
+    ('PRIORITY', [2, 3, 1]),      # impatient < normal < indulgent
+])
+def test_waiting_customers_are_served_in_discipline_order(discipline, expected):
+    env = simpy.Environment()
+    analyzer = Analysis(streaming=True)
+    analyzer.add_station('Meat')
+    model = QueueSystemFactory().create_queue_model(
+        env, {'discipline': discipline, 'servers': 1, 'avg_service_time': 1.0},
+        analyzer, 'Meat')
+    served = []
+    model.on_leave = lambda customer: served.append(customer.id)
+    types = ['normal', 'indulgent', 'impatient', 'normal']
+    for i, customer_type in enumerate(types):
+        customer = Customer(i, 0, env.now, customer_type, float('inf'), [1.0])
+        customer.start_wait_time = float(i)
+        model.admit(customer)
+
+    env.run()
+    assert served == [0] + expected
+    assert model.queue_length.level == 0 and model.in_system.level == 0
+
+
+@pytest.mark.parametrize('discipline', ['LCFS', 'PRIORITY', 'AGED_SJF'])
+def test_registered_discipline_runs_from_config(discipline):
+    base = load_config('all_fcfs')
+    stations = {name: dict(cfg, discipline=discipline) for name, cfg in base.STATIONS.items()}
+    config = config_to_namespace(base, STATIONS=stations)
+    analyzer = Analysis(streaming=True)
+    buffet = BuffetSystem(simpy.Environment(), analyzer, config)
+    buffet.run(until_time=200.0, verbose=False)
+    analyzer.calculate_statistics()
+    assert analyzer.total_exits > 0
+    for station in buffet.stations.values():
+        model = station.discipline_model
+        assert model.discipline_name == discipline
+        assert model.queue_length.level == len(model.wait_list)
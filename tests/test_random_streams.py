@@ -0,0 +1,35 @@
+# tests/test_random_streams.py
+"""Luồng ngẫu nhiên theo tên và tính tái lập giữa các replications."""
+import numpy as np
+
+from main import load_config
+from core.random_streams import RandomStreams
+from core.replication_runner import config_to_namespace, replication_seeds, run_replication
+
+
+def test_streams_depend_only_on_seed_and_name():
+    first = RandomStreams(7)
+    first.stream('extra').random()      # Luồng khác không làm lệch 'routing'
+    second = RandomStreams(7)
+    assert first.routing().random() == second.routing().random()
+    assert RandomStreams(7).routing().random() != RandomStreams(8).routing().random()
+    assert RandomStreams(7).service('Meat').random() != RandomStreams(7).service('Fruit').random()
+
+
+def test_spawned_streams_are_distinct_and_accept_seed_sequences():
+    children = RandomStreams(7).spawn(3)
+    draws = [child.attributes().random() for child in children]
+    assert len(set(draws)) == 3
+    again = RandomStreams(np.random.SeedSequence(7).spawn(3)[1])
+    assert again.attributes().random() == draws[1]
+
+
+def test_changing_one_discipline_keeps_arrivals():
+    config = config_to_namespace(load_config('all_fcfs'))
+    seed = replication_seeds(3, 1)[0]
+    base = run_replication(config, seed, until_time=100.0)
+    assert run_replication(config, seed, until_time=100.0) == base
+
+    changed = config_to_namespace(config)
+    next(iter(changed.STATIONS.values()))['discipline'] = 'SJF'
+    assert run_replication(changed, seed, until_time=100.0)['total_arrivals'] == base['total_arrivals']
@@ -0,0 +1,41 @@
+# tests/test_replication_runner.py
+"""Khoảng tin cậy, seed của replications và tính tái lập của ReplicationRunner."""
+import math
+
+import pytest
+
+from main import load_config
+from core.replication_runner import ReplicationRunner, replication_seeds
+from core.statistics import confidence_interval, t_critical
+
+
+@pytest.mark.parametrize('df, expected', [(1, 12.7062), (2, 4.3027), (5, 2.5706),
+                                          (10, 2.2281), (29, 2.0452), (1000, 1.9623)])
+def test_t_critical_matches_table(df, expected):
+    assert t_critical(df, 0.95) == pytest.approx(expected, rel=1e-3)
+
+
+def test_confidence_interval_small_samples():
+    assert confidence_interval([])['n'] == 0
+    single = confidence_interval([2.0])
+    assert single['mean'] == 2.0 and math.isnan(single['half_width'])
+
+    stat = confidence_interval([1.0, 2.0, 3.0, 4.0])
+    assert stat['mean'] == pytest.approx(2.5)
+    assert stat['std'] == pytest.approx(math.sqrt(5 / 3))
+    assert stat['ci_low'] == pytest.approx(2.5 - t_critical(3) * stat['std'] / 2)
+
+
+def test_replication_seeds_are_deterministic_and_distinct():
+    states = [tuple(s.generate_state(4)) for s in replication_seeds(100, 8)]
+    assert states == [tuple(s.generate_state(4)) for s in replication_seeds(100, 8)]
+    assert len(set(states)) == 8
+
+
+def test_runner_is_reproducible():
+    config = load_config('all_fcfs')
+    first = ReplicationRunner(config, num_replications=3, max_workers=1, until_time=60.0)
+    second = ReplicationRunner(config, num_replications=3, max_workers=1, until_time=60.0)
+    assert first.run() == second.run()
+    assert first.statistics['avg_system_time']['n'] == 3
+    assert len({r['total_arrivals'] for r in first.replications}) > 1
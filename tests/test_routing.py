@@ -0,0 +1,122 @@
+# tests/test_routing.py
+"""So sánh định tuyến biên dịch sẵn (bảng alias) với luật chia lại xác suất cũ."""
+import random
+from collections import Counter
+
+import pytest
+import simpy
+
+from main import load_config, list_available_configs
+from classes.analysis import Analysis
+from classes.buffet_system import BuffetSystem
+from classes.routing import Router, build_alias_table, redistribution_distribution
+from core.replication_runner import config_to_namespace
+
+
+def alias_distribution(names, probs, aliases):
+    """Phân phối {tên: xác suất} mà bảng alias sinh ra."""
+    n = len(names)
+    result = dict.fromkeys(names, 0.0)
+    for i, name in enumerate(names):
+        result[name] += probs[i] / n
+        result[names[aliases[i]]] += (1.0 - probs[i]) / n
+    return result
+
+
+def old_select(prob_map, full, visited, rng):
+    """
+    Luật chọn quầy trước khi biên dịch (BuffetSystem._select_station_with_capacity
+    cũ): chọn theo xác suất; quầy đầy → xác suất về 0, chia đều cho các quầy
+    chưa thử, chọn lại. Trả về tên quầy hoặc None (balking).
+    """
+    current = {s: p for s, p in prob_map.items() if s not in visited}
+    tried = set()
+    while True:
+        active = [s for s, p in current.items() if p > 0]
+        if not active:
+            return None
+        chosen = rng.choices(active, weights=[current[s] for s in active], k=1)[0]
+        if chosen not in full:
+            return chosen
+        tried.add(chosen)
+        loss = current[chosen]
+        current[chosen] = 0.0
+        remaining = [s for s in current if s not in tried]
+        if not remaining:
+            return None
+        for s in remaining:
+            current[s] += loss / len(remaining)
+
+
+def subsets(names):
+    for mask in range(1 << len(names)):
+        yield {name for i, name in enumerate(names) if mask >> i & 1}
+
+
+@pytest.mark.parametrize('weights', [[1.0], [0.4, 0.3, 0.2, 0.2], [5, 0, 1, 1e-6], [0.25] * 4])
+def test_alias_table_reproduces_weights(weights):
+    names = list(range(len(weights)))
+    distribution = alias_distribution(names, *build_alias_table(weights))
+    total = sum(weights)
+    assert [distribution[i] for i in names] == pytest.approx([w / total for w in weights])
+
+
+@pytest.mark.parametrize('config_name', list_available_configs())
+def test_alias_tables_match_redistribution_rule(config_name):
+    config = load_config(config_name)
+    station_index = {name: i for i, name in enumerate(config.STATIONS)}
+    router = Router(config.PROB_MATRICES, station_index, random.Random(0))
+    samplers = list(router.initial.values()) + [router.transition]
+    for sampler in samplers:
+        names = list(sampler.prob_map)
+        for visited in subsets(names):
+            for full in subsets([name for name in names if name not in visited]):
+                admitted, balk = redistribution_distribution(sampler.prob_map, full, visited)
+                if not sum(admitted.values()):
+                    continue    # Mọi quầy hợp lệ đều đầy (hoặc không có quầy có xác suất dương)
+                excluded_mask = sum(1 << station_index[s] for s in visited)
+                full_mask = sum(1 << station_index[s] for s in full)
+                distribution = alias_distribution(*sampler.table(excluded_mask, full_mask))
+                assert balk == pytest.approx(0.0)
+                for name, prob in admitted.items():
+                    assert distribution.get(name, 0.0) == pytest.approx(prob, abs=1e-12)
+
+
+@pytest.mark.parametrize('full, visited', [
+    (set(), set()), ({'Meat'}, set()), ({'Meat', 'Seafood'}, {'Dessert'}),
+    ({'Seafood', 'Dessert', 'Fruit'}, set()), ({'Meat', 'Seafood', 'Dessert', 'Fruit'}, set()),
+])
+def test_router_select_matches_old_loop(full, visited):
+    config = load_config('best_combination_rush_hour')
+    station_index = {name: i for i, name in enumerate(config.STATIONS)}
+    router = Router(config.PROB_MATRICES, station_index, random.Random(1))
+    for name in full:
+        router.mark_full(station_index[name])
+    excluded_mask = sum(1 << station_index[s] for s in visited)
+    prob_map = config.PROB_MATRICES['initial'][0]
+    rng = random.Random(2)
+    draws = 20000
+    new = Counter(router.select(router.initial[0], excluded_mask)[0] for _ in range(draws))
+    old = Counter(old_select(prob_map, full, visited, rng) for _ in range(draws))
+    for name in set(new) | set(old):
+        # Hai mẫu độc lập: sai khác tần suất trong khoảng ~5 sigma
+        assert abs(new[name] - old[name]) / draws < 0.025
+    if full | visited >= set(prob_map):
+        assert new == old == Counter({None: draws})
+
+
+def test_full_mask_tracks_stations_without_free_space():
+    # K nhỏ → quầy đầy thường xuyên; bit của quầy bật ⇔ quầy hết chỗ K
+    base = load_config('best_combination_rush_hour')
+    stations = {name: dict(cfg, capacity_K=cfg['servers'] + 1) for name, cfg in base.STATIONS.items()}
+    config = config_to_namespace(base, STATIONS=stations)
+    buffet = BuffetSystem(simpy.Environment(), Analysis(streaming=True), config)
+    for gate_id in buffet.arrival_rates:
+        buffet.env.process(buffet.generate_customers(gate_id))
+    seen_full = False
+    for until_time in (50.0, 100.0, 150.0):
+        buffet.env.run(until=until_time)
+        for station in buffet.stations.values():
+            assert bool(buffet.router.full_mask & station.bit) == (station.free_space == 0)
+            seen_full |= station.free_space == 0
+    assert seen_full
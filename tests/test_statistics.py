@@ -0,0 +1,81 @@
+# tests/test_statistics.py
+"""So sánh các bộ tích lũy dạng dòng (gộp theo phần) với tính toán trên toàn bộ mẫu."""
+import numpy as np
+import pytest
+
+from core.statistics import (QuantileSketch, RunningStats, TimeWeightedStat,
+                             mser_truncation)
+
+
+def split(values, rng, parts=7):
+    """Chia values thành các phần liên tiếp độ dài ngẫu nhiên (có thể rỗng)."""
+    cuts = np.sort(rng.integers(0, len(values) + 1, size=parts - 1))
+    return np.split(values, cuts)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_running_stats_merge_matches_batch(seed):
+    rng = np.random.default_rng(seed)
+    values = rng.exponential(2.0, size=5000) + 1e3 * seed   # Trung bình lớn: kiểm tra ổn định số
+    merged = RunningStats()
+    for part in split(values, rng):
+        stats = RunningStats()
+        for x in part:
+            stats.add(float(x))
+        merged.merge(stats)
+
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert merged.variance == pytest.approx(values.var(ddof=1), rel=1e-9)
+    assert (merged.min, merged.max) == (values.min(), values.max())
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_quantile_sketch_merge_matches_batch(seed):
+    rng = np.random.default_rng(seed)
+    # Một phần ba mẫu bằng 0 (được phục vụ ngay), phần còn lại trải nhiều bậc độ lớn
+    values = np.where(rng.random(6000) < 1 / 3, 0.0, rng.lognormal(0.0, 2.0, size=6000))
+    whole = QuantileSketch()
+    for x in values:
+        whole.add(float(x))
+    merged = QuantileSketch()
+    for part in split(values, rng):
+        sketch = QuantileSketch()
+        for x in part:
+            sketch.add(float(x))
+        merged.merge(sketch)
+
+    assert merged.buckets == whole.buckets
+    assert (merged.count, merged.zero_count, merged.max) == (whole.count, whole.zero_count, whole.max)
+    ordered = np.sort(values)
+    for q in (0.1, 0.5, 0.9, 0.99, 1.0):
+        exact = ordered[int(np.floor(q * (len(values) - 1)))]
+        assert merged.quantile(q) == pytest.approx(exact, rel=merged.relative_accuracy, abs=1e-12)
+
+
+def test_quantile_sketch_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_time_weighted_stat_matches_step_integral():
+    rng = np.random.default_rng(3)
+    times = np.cumsum(rng.exponential(1.0, size=500))
+    deltas = rng.choice([-1, 1], size=500)
+    stat = TimeWeightedStat()
+    level, area, last = 0, 0.0, 0.0
+    for t, d in zip(times, deltas):
+        stat.add(float(t), int(d))
+        area += level * (t - last)
+        level, last = level + d, t
+    stat.close(float(times[-1]) + 1.0)
+    area += level * 1.0
+    assert stat.mean == pytest.approx(area / (times[-1] + 1.0))
+    assert sum(stat.histogram().values()) == pytest.approx(1.0)
+
+
+def test_mser_truncation_cuts_initial_transient():
+    rng = np.random.default_rng(4)
+    series = np.concatenate([np.linspace(10.0, 1.0, 20), 1.0 + 0.1 * rng.standard_normal(180)])
+    assert 10 <= mser_truncation(series) <= 25
+    assert mser_truncation(1.0 + 0.1 * rng.standard_normal(200)) < 20
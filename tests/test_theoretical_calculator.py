@@ -0,0 +1,66 @@
+# tests/test_theoretical_calculator.py
+"""Kiểm tra lời giải giải tích M/M/c/K vector hóa với công thức đóng."""
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from core.theoretical_calculator import MMCK_METRICS, TheoreticalCalculator, mmck
+
+
+def mmck_closed_form(lam, c, K, s):
+    """Công thức đóng M/M/c/K trong sách giáo khoa (Gross & Harris), tính vô hướng."""
+    a = lam * s
+    rho = a / c
+    p0 = 1.0 / (sum(a ** n / math.factorial(n) for n in range(c))
+                + a ** c / math.factorial(c) * sum(rho ** (n - c) for n in range(c, K + 1)))
+    pK = a ** K / (math.factorial(c) * c ** (K - c)) * p0
+    if rho == 1.0:
+        Lq = p0 * a ** c / math.factorial(c) * (K - c) * (K - c + 1) / 2
+    else:
+        Lq = (p0 * a ** c * rho / (math.factorial(c) * (1 - rho) ** 2)
+              * (1 - rho ** (K - c + 1) - (1 - rho) * (K - c + 1) * rho ** (K - c)))
+    lam_eff = lam * (1 - pK)
+    L = Lq + lam_eff * s
+    return {
+        'P0': p0, 'blocking_probability': pK, 'L': L, 'Lq': Lq,
+        'W': L / lam_eff, 'Wq': Lq / lam_eff,
+        'effective_arrival_rate': lam_eff, 'utilization': lam_eff * s / c,
+    }
+
+
+GRID = list(itertools.product([0.5, 3.0, 10.0, 25.0], [1, 2, 5], [0, 3, 25], [0.2, 1.0]))
+
+
+def test_mmck_matches_closed_form():
+    lam, c, extra, s = (np.array(column) for column in zip(*GRID))
+    result = mmck(lam, c, c + extra, s)     # Một lần gọi vector hóa cho cả lưới
+    for i, (lam_i, c_i, extra_i, s_i) in enumerate(GRID):
+        expected = mmck_closed_form(lam_i, c_i, c_i + extra_i, s_i)
+        for name in MMCK_METRICS:
+            assert result[name][i] == pytest.approx(expected[name], rel=1e-9, abs=1e-12), name
+        assert result['Pn'][i].sum() == pytest.approx(1.0)
+        assert not result['Pn'][i, c_i + extra_i + 1:].any()
+
+
+def test_mmck_utilization_one_and_large_systems():
+    # rho = 1 (công thức đóng riêng) và c, K lớn (giai thừa tràn số nếu không tính trong log)
+    expected = mmck_closed_form(4.0, 2, 10, 0.5)
+    result = mmck(4.0, 2, 10, 0.5)
+    assert result['Lq'][0] == pytest.approx(expected['Lq'])
+    large = mmck(950.0, 200, 2000, 0.2)
+    assert np.isfinite(large['L']).all()
+    assert large['utilization'][0] == pytest.approx(0.95, rel=1e-3)
+
+
+def test_calculator_grid_matches_single_calls():
+    calculator = TheoreticalCalculator()
+    lam, c, extra, s = zip(*GRID)
+    K = [ci + e for ci, e in zip(c, extra)]
+    grid = calculator.calculate_grid(lam, c, K, s)
+    fresh = TheoreticalCalculator()
+    for i, point in enumerate(zip(lam, c, K, s)):
+        single = fresh.calculate(*point)
+        for name in MMCK_METRICS:
+            assert grid[name][i] == pytest.approx(single[name], rel=1e-12)
@@ -0,0 +1,78 @@
+# tests/test_trace_recorder.py
+"""Kiểm tra ghi vết nhị phân: nội dung file vết và file riêng cho từng replication."""
+import numpy as np
+import pytest
+import simpy
+
+from main import load_config, parse_args
+from classes.analysis import Analysis
+from classes.buffet_system import BuffetSystem
+from classes.customer import Customer
+from core.replication_runner import config_to_namespace, run_replication
+from core.trace_recorder import (TRACE_ARRIVAL, TRACE_SERVICE_START, TraceRecorder,
+                                 load_trace, replication_trace_path)
+
+
+def test_trace_matches_analysis(tmp_path):
+    path = tmp_path / 'trace.bin'
+    config = config_to_namespace(load_config('all_sjf'), TRACE_PATH=str(path))
+    analyzer = Analysis(streaming=True)
+    buffet = BuffetSystem(simpy.Environment(), analyzer, config)
+    # chunk nhỏ: buộc ghi nhiều chunk trong lúc chạy
+    buffet.trace = TraceRecorder(path, config.CUSTOMER_TYPE_DISTRIBUTION, config.STATIONS,
+                                 chunk_size=1000)
+    for station in buffet.stations.values():
+        station.trace = station.discipline_model.trace = buffet.trace
+    buffet.run(until_time=60.0, verbose=False)
+
+    trace, meta = load_trace(path)
+    assert meta['count'] == len(trace) == buffet.trace.count
+    assert np.all(np.diff(trace['time']) >= 0)
+    arrivals = trace[trace['event'] == TRACE_ARRIVAL]
+    assert len(arrivals) == analyzer.total_arrivals
+    assert np.array_equal(arrivals['customer'], np.arange(len(arrivals)))
+
+    # gate / loại khách ghi một lần lúc đến, điền đúng cho mọi sự kiện của khách
+    gates = arrivals['gate'][trace['customer']]
+    types = arrivals['type'][trace['customer']]
+    assert np.array_equal(trace['gate'], gates)
+    assert np.array_equal(trace['type'], types)
+    assert set(meta['customer_types'][t] for t in np.unique(types)) <= set(
+        config.CUSTOMER_TYPE_DISTRIBUTION)
+    starts = trace[trace['event'] == TRACE_SERVICE_START]
+    assert len(starts) == sum(s.count for s in analyzer.wait_stats.values()) - analyzer.total_reneged
+
+
+def test_customers_without_arrival_record(tmp_path):
+    recorder = TraceRecorder(tmp_path / 'trace.bin', ['normal', 'impatient'], ['Meat'])
+    late = Customer(5, 1, 0.0, 'impatient', 1.0, [1.0])
+    unknown = Customer(2, 0, 0.0, 'normal', 1.0, [1.0])
+    recorder.record_arrival(0.5, late)
+    recorder.record(1.0, unknown, 0, TRACE_SERVICE_START)
+    recorder.close()
+
+    trace, _ = load_trace(tmp_path / 'trace.bin')
+    assert trace[['customer', 'gate', 'type']].tolist() == [(5, 1, 1), (2, -1, 255)]
+
+
+def test_replications_write_separate_traces(tmp_path):
+    path = tmp_path / 'trace.bin'
+    config = config_to_namespace(load_config('all_fcfs'), TRACE_PATH=str(path))
+    for replication, seed in enumerate((11, 12)):
+        summary = run_replication(config, seed, until_time=30.0, replication=replication)
+        trace, _ = load_trace(replication_trace_path(path, replication))
+        assert (trace['event'] == TRACE_ARRIVAL).sum() == summary['total_arrivals']
+    assert replication_trace_path(path, 1).name == 'trace.rep1.bin'
+    assert config.TRACE_PATH == str(path)
+    assert not path.exists()
+
+
+@pytest.mark.parametrize('argv', [
+    ['all_fcfs', '--trace', 't.bin', '--sweep', 'ARRIVAL_RATES.0=6:8'],
+    ['all_fcfs', '--trace', 't.bin', '--optimize', 'system_time'],
+])
+def test_trace_rejected_for_sweep_and_optimize(monkeypatch, argv):
+    monkeypatch.setattr('sys.argv', ['main.py'] + argv)
+    with pytest.raises(SystemExit) as excinfo:
+        parse_args()
+    assert excinfo.value.code == 2
@@ -0,0 +1,29 @@
+# tests/test_validation_analyzer.py
+"""Kiểm định mô phỏng 1 quầy với lời giải M/M/c/K."""
+import simpy
+import pytest
+
+from classes.analysis import Analysis
+from classes.buffet_system import BuffetSystem
+from core.validation_analyzer import VALIDATION_METRICS, ValidationAnalyzer, validation_config
+
+
+def test_compare_single_run_with_theory():
+    config = validation_config(arrival_rate=8.0, servers=2, capacity_K=5, until_time=3000.0)
+    analyzer = Analysis(streaming=True)
+    BuffetSystem(simpy.Environment(), analyzer, config).run(config.UNTIL_TIME, verbose=False)
+    analyzer.calculate_statistics()
+
+    comparison = ValidationAnalyzer(analyzer).compare(8.0, 2, 5, 0.25)
+    assert set(comparison) == set(VALIDATION_METRICS)
+    for metric, values in comparison.items():
+        assert values['relative_error'] < 0.1, metric
+
+
+def test_run_grid_skips_k_below_c_and_covers_theory():
+    validator = ValidationAnalyzer()
+    failures = validator.run_grid(arrival_rates=[6.0], servers=[2], capacities=[1, 4],
+                                  num_replications=4, max_workers=1, until_time=500.0)
+    assert {r['capacity_K'] for r in validator.results} == {4}
+    assert len(validator.results) == len(VALIDATION_METRICS)
+    assert len(failures) <= 1
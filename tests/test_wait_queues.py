@@ -0,0 +1,146 @@
+# tests/test_wait_queues.py
+"""So sánh các hàng đợi có handle (core/wait_queues.py) với list thường qua chuỗi thao tác ngẫu nhiên."""
+import random
+
+import pytest
+
+import simpy
+
+from main import load_config
+from classes.analysis import Analysis
+from classes.buffet_system import BuffetSystem
+from core.replication_runner import config_to_namespace
+from core.wait_queues import IndexedHeap, RandomBag, ShiftedPriorityQueue
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_indexed_heap_matches_sorted_list(seed):
+    rng = random.Random(seed)
+    heap = IndexedHeap()
+    reference = {}      # {item: [key, seq]}, min theo (key, seq) như IndexedHeap
+    handles = {}
+    for step in range(2000):
+        op = rng.random()
+        if op < 0.45 or not reference:
+            key = rng.randint(0, 50)     # Nhiều khóa trùng: kiểm tra thứ tự vào hàng
+            handles[step] = heap.push(key, step)
+            reference[step] = [key, step]
+        elif op < 0.65:
+            key, item = heap.pop()
+            expected = min(reference, key=lambda i: reference[i])
+            assert (key, item) == (reference.pop(expected)[0], expected)
+        elif op < 0.85:
+            item = rng.choice(list(handles))
+            assert heap.remove(handles.pop(item)) == (item in reference)
+            reference.pop(item, None)
+        else:
+            item = rng.choice(list(reference))
+            key = rng.randint(0, 50)
+            heap.update(handles[item], key)
+            reference[item][0] = key
+        assert len(heap) == len(reference)
+        assert sorted(heap) == sorted(reference)
+        if reference:
+            expected = min(reference, key=lambda i: reference[i])
+            assert heap.peek() == (reference[expected][0], expected)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_bag_matches_list(seed):
+    rng = random.Random(seed)
+    bag = RandomBag()
+    reference = set()
+    handles = {}
+    popped = []
+    for step in range(2000):
+        op = rng.random()
+        if op < 0.5 or not reference:
+            handles[step] = bag.add(step)
+            reference.add(step)
+        elif op < 0.75:
+            item = bag.pop_random(rng)
+            assert item in reference
+            reference.remove(item)
+            popped.append(item)
+        else:
+            item = rng.choice(list(handles))
+            assert bag.remove(handles.pop(item)) == (item in reference)
+            reference.discard(item)
+        assert len(bag) == len(reference)
+        assert set(bag) == reference
+    # Phần tử đã lấy ra không quay lại được
+    assert not any(bag.remove(handles[item]) for item in popped if item in handles)
+
+
+def test_random_bag_pops_uniformly():
+    rng = random.Random(7)
+    counts = [0] * 4
+    for _ in range(8000):
+        bag = RandomBag()
+        for item in range(4):
+            bag.add(item)
+        counts[bag.pop_random(rng)] += 1
+    assert all(abs(count - 2000) < 200 for count in counts)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_shifted_priority_queue_matches_list(seed):
+    rng = random.Random(seed)
+    queue = ShiftedPriorityQueue()
+    reference = []      # [base, scale, thứ tự vào, item]
+    handles = {}
+    offset = 0.0
+    for step in range(2000):
+        op = rng.random()
+        if op < 0.45 or not reference:
+            base, scale = rng.uniform(0, 5), rng.choice([0, 1, 1, 2])
+            handles[step] = queue.push(base, scale, step)
+            reference.append([base, scale, step, step])
+        elif op < 0.7:
+            # Độ ưu tiên scale * (base + offset), scale = 0 → base; trùng → vào trước lấy trước
+            expected = min(reference, key=lambda e: (e[1] * (e[0] + offset) if e[1] else e[0], e[2]))
+            assert queue.pop(offset) == expected[3]
+            reference.remove(expected)
+        elif op < 0.85:
+            item = rng.choice(list(handles))
+            in_queue = any(e[3] == item for e in reference)
+            assert queue.remove(handles.pop(item)) == in_queue
+            reference = [e for e in reference if e[3] != item]
+        else:
+            offset += rng.uniform(0, 1)      # Độ trễ erratic cộng dồn
+        assert len(queue) == len(reference)
+        assert sorted(queue) == sorted(e[3] for e in reference)
+
+
+def run_models(config_name, until_time=200.0, **overrides):
+    """Chạy ngắn và trả về {quầy: model kỷ luật} (còn nguyên trạng thái cuối)."""
+    config = config_to_namespace(load_config(config_name), **overrides)
+    buffet = BuffetSystem(simpy.Environment(), Analysis(streaming=True), config)
+    buffet.run(until_time=until_time, verbose=False)
+    return {name: station.discipline_model for name, station in buffet.stations.items()}
+
+
+@pytest.mark.parametrize('config_name', ['all_fcfs', 'all_sjf', 'all_ros'])
+def test_wait_list_holds_only_waiting_customers(config_name):
+    # Kiên nhẫn ngắn → reneging nhiều; khách rời hàng phải bị xóa khỏi hàng ngay
+    for model in run_models(config_name, DEFAULT_PATIENCE_TIME=0.5).values():
+        assert not any(customer.reneged for customer in model.wait_list)
+        assert model.queue_length.level == len(model.wait_list)
+
+
+@pytest.mark.parametrize('config_name', ['all_fcfs', 'all_sjf', 'all_ros'])
+def test_erratic_delay_reaches_waiting_customers(config_name):
+    # Quầy nào đã phục vụ khách 'erratic' thì offset tăng đúng bội số của erratic_delay
+    models = run_models(config_name, ERRATIC_DELAY_AMOUNT=0.3)
+    assert any(model.erratic_offset > 0 for model in models.values())
+    for model in models.values():
+        assert model.erratic_delay == 0.3
+        steps = model.erratic_offset / 0.3
+        assert steps == pytest.approx(round(steps))
+
+
+@pytest.mark.parametrize('config_name', ['all_fcfs', 'all_sjf', 'all_ros'])
+def test_dispatch_never_leaves_a_server_idle_with_customers_waiting(config_name):
+    for model in run_models(config_name).values():
+        assert model.free_servers == model.num_servers - model.busy_servers.level
+        assert model.free_servers == 0 or len(model.wait_list) == 0